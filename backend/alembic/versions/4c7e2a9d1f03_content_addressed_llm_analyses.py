@@ -0,0 +1,79 @@
+"""content addressed llm analyses
+
+Revision ID: 4c7e2a9d1f03
+Revises: b1adc11bbec4
+Create Date: 2026-10-18 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '4c7e2a9d1f03'
+down_revision: Union[str, Sequence[str], None] = 'b1adc11bbec4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'resume_versions',
+        sa.Column('content_hash', sa.Text(), nullable=True)
+    )
+    op.create_index(
+        op.f('ix_resume_versions_content_hash'),
+        'resume_versions',
+        ['content_hash'],
+        unique=False
+    )
+
+    # backfill parsed versions with the same hash the app computes
+    op.execute(
+        """
+        UPDATE resume_versions
+        SET content_hash = encode(
+            sha256(convert_to(
+                coalesce(
+                    nullif(parsed_data->>'raw_text', ''),
+                    parsed_data->>'cleaned_text'
+                ),
+                'UTF8'
+            )),
+            'hex'
+        )
+        WHERE status = 'PARSED'
+        """
+    )
+
+    op.create_table(
+        'llm_analyses',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('resume_hash', sa.Text(), nullable=False),
+        sa.Column('jd_hash', sa.Text(), nullable=False),
+        sa.Column('prompt_version', sa.String(), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'resume_hash',
+            'jd_hash',
+            'prompt_version',
+            'model',
+            name='uq_llm_analysis_content'
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('llm_analyses')
+    op.drop_index(
+        op.f('ix_resume_versions_content_hash'),
+        table_name='resume_versions'
+    )
+    op.drop_column('resume_versions', 'content_hash')
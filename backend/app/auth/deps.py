@@ -1,33 +1,34 @@
+import uuid
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.model import User
-from app.auth.jwt import SECRET_KEY, ALGORITHM
+from app.auth.user_cache import user_exists, verify_access_token
 from app.db.session import get_session
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/verify-otp")
 
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    The authenticated user as far as the token and the user cache know;
+    routes that need more of the row load it themselves.
+    """
+    id: uuid.UUID
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_session)
-):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if payload.get("type") != "access":
-            raise HTTPException(status_code=401, detail="Invalid token type")
+) -> CurrentUser:
+    user_id = verify_access_token(token)
 
-        user_id = payload.get("sub")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    res = await db.execute(select(User).where(User.id == user_id))
-    user = res.scalar_one_or_none()
-
-    if not user:
+    # answered from cache for known users; db is only used on a miss
+    if not await user_exists(user_id, db):
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user
+    return CurrentUser(id=uuid.UUID(user_id))
+
@@ -15,7 +15,7 @@ from app.auth.jwt import (
     create_access_token,
     create_refresh_token
 )
-from app.auth.deps import get_current_user
+from app.auth.deps import CurrentUser, get_current_user
 from app.auth.schema import EmailInput, OTPVerifyInput
 from app.utils.email import send_otp_email
 
@@ -153,7 +153,7 @@ async def refresh(
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     res = await db.execute(
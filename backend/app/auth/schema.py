@@ -1,4 +1,5 @@
-from typing import List, Optional, Dict
+from typing import List, Literal, Optional, Dict
+from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -40,6 +41,11 @@ class JDInput(BaseModel):
     content: str = Field(min_length=50)
 
 
+class BatchScoreInput(BaseModel):
+    job_description_ids: List[UUID] = Field(min_length=1, max_length=50)
+    mode: Literal["llm", "fast"] = "llm"
+
+
 class JDSkill(BaseModel):
     name: str
     confidence: float
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+
+import redis
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.auth.jwt import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
+from app.cache.invalidation import (
+    INVALIDATION_CHANNEL,
+    invalidation_message,
+    register_local_tier
+)
+from app.cache.local_cache import TTLCache
+from app.cache.redis import get_async_redis, redis_client
+from app.db.model import User
+from app.metrics.registry import get_counter, incr, ratio, register_gauge
+
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+
+# users known to exist: per worker for USER_LOCAL_CACHE_TTL, in Redis
+# for USER_CACHE_TTL. Deleting a user clears both tiers everywhere
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 3600))
+USER_LOCAL_CACHE_TTL = int(os.getenv("USER_LOCAL_CACHE_TTL", 300))
+USER_LOCAL_CACHE_SIZE = int(os.getenv("USER_LOCAL_CACHE_SIZE", 10000))
+
+# session.info key for users deleted in the current transaction
+DELETED_USERS = "deleted_users"
+
+logger = logging.getLogger("auth")
+
+# token digest -> user id, never kept past the token's own exp
+_tokens = TTLCache(AUTH_TOKEN_CACHE_SIZE, None, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# invalidations started by commits, kept until they finish
+_forgetting: set[asyncio.Task] = set()
+
+_users = register_local_tier(
+    "user_cache",
+    TTLCache(USER_LOCAL_CACHE_SIZE, None, USER_LOCAL_CACHE_TTL)
+)
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _user_key(user_id: str) -> str:
+    return f"user:exists:{user_id}"
+
+
+def verify_access_token(token: str) -> str:
+    """
+    User id of a valid access token. The signature is checked once per
+    token; repeats are answered from memory until the token expires.
+    """
+    digest = _token_digest(token)
+    user_id = _tokens.get(digest)
+    if user_id is not None:
+        incr("auth.token_cache.hits")
+        return user_id
+
+    incr("auth.token_cache.misses")
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if payload.get("type") != "access":
+        raise HTTPException(status_code=401, detail="Invalid token type")
+
+    user_id = payload.get("sub")
+    try:
+        uuid.UUID(user_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    expires = payload.get("exp")
+    _tokens.set(digest, user_id, ttl=expires - time.time() if expires else None)
+    return user_id
+
+
+async def user_exists(user_id: str, db: AsyncSession) -> bool:
+    """
+    Local tier, then Redis, then Postgres. Only positive answers are
+    cached, so a deleted or unknown user always reaches the database.
+    """
+    if _users.get(user_id):
+        incr("auth.user_cache.hits.local")
+        return True
+
+    key = _user_key(user_id)
+    redis_up = True
+    try:
+        found = await get_async_redis().exists(key)
+    except (redis.RedisError, OSError):
+        incr("auth.user_cache.redis_errors")
+        found = redis_up = False
+
+    if found:
+        incr("auth.user_cache.hits.redis")
+        _users.set(user_id, True)
+        return True
+
+    incr("auth.user_cache.misses")
+    res = await db.execute(select(User.id).where(User.id == uuid.UUID(user_id)))
+    if res.scalar_one_or_none() is None:
+        return False
+
+    _users.set(user_id, True)
+    if redis_up:
+        try:
+            await get_async_redis().setex(key, USER_CACHE_TTL, 1)
+        except (redis.RedisError, OSError):
+            incr("auth.user_cache.redis_errors")
+    return True
+
+
+async def forget_users(user_ids: list[str]):
+    """
+    Drops user_ids from this worker, Redis and every other worker.
+    Runs after commits that ORM-deleted a User; call it after committing
+    bulk DELETE statements.
+    """
+    for user_id in user_ids:
+        _users.delete(user_id)
+
+    try:
+        async with get_async_redis().pipeline(transaction=False) as pipe:
+            pipe.delete(*[_user_key(user_id) for user_id in user_ids])
+            pipe.publish(INVALIDATION_CHANNEL, invalidation_message("user_cache", user_ids))
+            await pipe.execute()
+    except (redis.RedisError, OSError) as e:
+        incr("auth.user_cache.redis_errors")
+        logger.warning(f"Could not invalidate cached users {user_ids}: {e!r}")
+
+
+def forget_users_blocking(user_ids: list[str]):
+    """
+    forget_users for code without an event loop (scripts, sync sessions).
+    """
+    for user_id in user_ids:
+        _users.delete(user_id)
+
+    try:
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.delete(*[_user_key(user_id) for user_id in user_ids])
+            pipe.publish(INVALIDATION_CHANNEL, invalidation_message("user_cache", user_ids))
+            pipe.execute()
+    except (redis.RedisError, OSError) as e:
+        incr("auth.user_cache.redis_errors")
+        logger.warning(f"Could not invalidate cached users {user_ids}: {e!r}")
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    # flush time, before commit: a request checking this user now would
+    # still find the row and cache it again, so only note it down
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(DELETED_USERS, set()).add(str(target.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_deleted_users(session):
+    user_ids = session.info.pop(DELETED_USERS, None)
+    if not user_ids:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # a sync session outside the app: nothing to block but ourselves
+        forget_users_blocking(sorted(user_ids))
+        return
+
+    # the row is gone for everyone now; no Redis I/O inside the commit
+    task = loop.create_task(forget_users(sorted(user_ids)))
+    _forgetting.add(task)
+    task.add_done_callback(_forgetting.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_deleted_users(session):
+    # the deletes never happened
+    session.info.pop(DELETED_USERS, None)
+
+
+def _hit_rate() -> float:
+    hits = get_counter("auth.user_cache.hits.local") + get_counter("auth.user_cache.hits.redis")
+    return ratio(hits, hits + get_counter("auth.user_cache.misses"))
+
+
+register_gauge("auth.user_cache.hit_rate", _hit_rate)
+register_gauge("auth.user_cache.local_entries", lambda: len(_users))
+register_gauge("auth.token_cache.entries", lambda: len(_tokens))
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+
+import redis
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.redis import get_async_redis
+from app.db.model import LLMAnalysis
+from app.db.session import AsyncSessionLocal
+from app.llm.backends import MODEL_NAME
+from app.llm.prompt_builder import PROMPT_JD_TOKENS, PROMPT_RESUME_TOKENS
+from app.llm.prompts import (
+    ATS_ANALYSIS_PROMPT,
+    ATS_JUDGMENT_PROMPT,
+    LLM_HYBRID,
+    PROMPT_VERSION
+)
+from app.metrics.registry import incr
+
+ANALYSIS_STORE_TTL = int(os.getenv("ANALYSIS_STORE_TTL", 7 * 24 * 3600))
+
+logger = logging.getLogger("cache")
+
+
+def prompt_version() -> str:
+    # the token budgets change what the model sees just like the template;
+    # hybrid mode stores only the judgment blocks. The template digest
+    # catches prompt edits that forgot to bump PROMPT_VERSION
+    prompt = "judgment" if LLM_HYBRID else "full"
+    template = ATS_JUDGMENT_PROMPT if LLM_HYBRID else ATS_ANALYSIS_PROMPT
+    digest = hashlib.sha256(template.encode("utf-8")).hexdigest()[:8]
+    return f"{PROMPT_VERSION}.{digest}:{prompt}:{PROMPT_RESUME_TOKENS}:{PROMPT_JD_TOKENS}"
+
+
+def make_analysis_key(resume_hash: str, jd_hash: str) -> str:
+    """
+    Content-addressed, user-independent: identical resume + JD text
+    share one LLM analysis.
+    """
+    return f"analysis:{prompt_version()}:{MODEL_NAME}:{resume_hash}:{jd_hash}"
+
+
+async def _select(db: AsyncSession, resume_hash: str, jd_hash: str) -> dict | None:
+    result = await db.execute(
+        select(LLMAnalysis.result).where(
+            LLMAnalysis.resume_hash == resume_hash,
+            LLMAnalysis.jd_hash == jd_hash,
+            LLMAnalysis.prompt_version == prompt_version(),
+            LLMAnalysis.model == MODEL_NAME
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_analysis(
+    resume_hash: str,
+    jd_hash: str,
+    db: AsyncSession | None = None
+) -> dict | None:
+    """
+    Redis first, then Postgres (backfilling Redis on a hit).
+    Opens its own session when db is None. The store only saves LLM
+    calls: if Postgres fails too, this is a miss rather than an error.
+    """
+    key = make_analysis_key(resume_hash, jd_hash)
+
+    try:
+        data = await get_async_redis().get(key)
+    except (redis.RedisError, OSError):
+        incr("analysis_store.redis_errors")
+        data = None
+
+    if data:
+        incr("analysis_store.hits.redis")
+        return json.loads(data)
+
+    try:
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                value = await _select(session, resume_hash, jd_hash)
+        else:
+            value = await _select(db, resume_hash, jd_hash)
+    except (SQLAlchemyError, OSError) as e:
+        incr("analysis_store.db_errors")
+        logger.warning(f"Analysis store lookup failed, treating as a miss: {e!r}")
+        if db is not None:
+            # the caller keeps using the session
+            await db.rollback()
+        return None
+
+    if value is None:
+        incr("analysis_store.misses")
+        return None
+
+    incr("analysis_store.hits.db")
+    try:
+        await get_async_redis().setex(key, ANALYSIS_STORE_TTL, json.dumps(value))
+    except (redis.RedisError, OSError):
+        incr("analysis_store.redis_errors")
+
+    return value
+
+
+async def _insert(db: AsyncSession, resume_hash: str, jd_hash: str, analysis: dict):
+    stmt = insert(LLMAnalysis).values(
+        resume_hash=resume_hash,
+        jd_hash=jd_hash,
+        prompt_version=prompt_version(),
+        model=MODEL_NAME,
+        result=analysis
+    ).on_conflict_do_nothing(constraint="uq_llm_analysis_content")
+
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def save_analysis(
+    resume_hash: str,
+    jd_hash: str,
+    analysis: dict,
+    db: AsyncSession | None = None
+):
+    """
+    Writes through to Postgres and Redis. The first writer wins for a
+    given content key; later identical analyses are dropped.
+    """
+    if db is None:
+        async with AsyncSessionLocal() as session:
+            await _insert(session, resume_hash, jd_hash, analysis)
+    else:
+        await _insert(db, resume_hash, jd_hash, analysis)
+
+    try:
+        await get_async_redis().setex(
+            make_analysis_key(resume_hash, jd_hash),
+            ANALYSIS_STORE_TTL,
+            json.dumps(analysis)
+        )
+    except (redis.RedisError, OSError):
+        incr("analysis_store.redis_errors")
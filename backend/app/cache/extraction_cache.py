@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import redis
+
+from app.cache.redis import get_async_redis, redis_client
+from app.metrics.registry import get_counter, incr, ratio, register_gauge
+from app.nlp.candidate_extractor import MODE_GAZETTEER
+from app.nlp.model import SPACY_MODEL
+from app.nlp.taxonomy import get_taxonomy
+
+# bump whenever extraction or skill scoring changes its output
+PIPELINE_VERSION = "4"
+
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", 512))
+EXTRACTION_CACHE_TTL = int(os.getenv("EXTRACTION_CACHE_TTL", 7 * 24 * 3600))
+
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = LRUCache(EXTRACTION_CACHE_SIZE)
+
+
+def _normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _pipeline_version(mode: str) -> str:
+    version = f"v{PIPELINE_VERSION}:{mode}:{SPACY_MODEL}"
+    if mode == MODE_GAZETTEER:
+        version += f":{get_taxonomy().version}"
+    return version
+
+
+def make_extraction_key(
+    kind: str,
+    text: str,
+    mode: str,
+    extra: dict | None = None
+) -> str:
+    """
+    kind: "resume" | "jd". extra carries any other input that changes
+    the output (e.g. the resume's detected sections).
+    """
+    digest = hashlib.sha256(_normalize_text(text).encode("utf-8"))
+    if extra:
+        digest.update(json.dumps(extra, sort_keys=True).encode("utf-8"))
+
+    return f"extract:{kind}:{_pipeline_version(mode)}:{digest.hexdigest()}"
+
+
+def _copy(value: list[dict]) -> list[dict]:
+    # callers get their own skill dicts; the local tier's stay untouched
+    return [dict(skill) for skill in value]
+
+
+def _get_local(key: str):
+    value = _local.get(key)
+    if value is None:
+        return None
+    incr("extraction_cache.hits.local")
+    return _copy(value)
+
+
+def _from_redis(key: str, data: str | None):
+    if not data:
+        incr("extraction_cache.misses")
+        return None
+
+    value = json.loads(data)
+    _local.set(key, value)
+    incr("extraction_cache.hits.redis")
+    return _copy(value)
+
+
+def get_cached_extraction(key: str):
+    value = _get_local(key)
+    if value is not None:
+        return value
+
+    try:
+        data = redis_client.get(key)
+    except (redis.RedisError, OSError):
+        incr("extraction_cache.redis_errors")
+        data = None
+    return _from_redis(key, data)
+
+
+def set_cached_extraction(key: str, value: list[dict]):
+    _local.set(key, _copy(value))
+
+    try:
+        redis_client.setex(key, EXTRACTION_CACHE_TTL, json.dumps(value))
+    except (redis.RedisError, OSError):
+        incr("extraction_cache.redis_errors")
+
+
+async def get_cached_extraction_async(key: str):
+    value = _get_local(key)
+    if value is not None:
+        return value
+
+    try:
+        data = await get_async_redis().get(key)
+    except (redis.RedisError, OSError):
+        incr("extraction_cache.redis_errors")
+        data = None
+    return _from_redis(key, data)
+
+
+async def set_cached_extraction_async(key: str, value: list[dict]):
+    _local.set(key, _copy(value))
+
+    try:
+        await get_async_redis().setex(key, EXTRACTION_CACHE_TTL, json.dumps(value))
+    except (redis.RedisError, OSError):
+        incr("extraction_cache.redis_errors")
+
+
+def _hit_rate() -> float:
+    hits = (
+        get_counter("extraction_cache.hits.local")
+        + get_counter("extraction_cache.hits.redis")
+    )
+    return ratio(hits, hits + get_counter("extraction_cache.misses"))
+
+
+register_gauge("extraction_cache.hit_rate", _hit_rate)
+register_gauge("extraction_cache.local_entries", lambda: len(_local))
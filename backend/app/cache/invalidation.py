@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+import redis
+
+from app.cache.local_cache import TTLCache
+from app.cache.redis import get_async_redis
+from app.metrics.registry import incr
+
+# every write to a shared key publishes it here; other workers drop it
+# from their in-process tier
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+INVALIDATION_RETRY_SECONDS = float(os.getenv("CACHE_INVALIDATION_RETRY_SECONDS", 5))
+
+# tells this worker's own messages apart from other workers'
+WORKER_ID = uuid.uuid4().hex
+
+logger = logging.getLogger("cache")
+
+_tiers: dict[str, TTLCache] = {}
+_listener: asyncio.Task | None = None
+
+
+def register_local_tier(name: str, cache: TTLCache) -> TTLCache:
+    """
+    Makes cache a target of invalidation messages for name.
+    """
+    _tiers[name] = cache
+    return cache
+
+
+def invalidation_message(tier: str, keys: list[str]) -> str:
+    """
+    Payload to PUBLISH on INVALIDATION_CHANNEL, normally in the same
+    pipeline as the write it announces.
+    """
+    return json.dumps({"origin": WORKER_ID, "tier": tier, "keys": keys})
+
+
+def _apply(data: str):
+    message = json.loads(data)
+    if message["origin"] == WORKER_ID:
+        return
+
+    cache = _tiers.get(message["tier"])
+    if cache is None:
+        return
+
+    for key in message["keys"]:
+        cache.delete(key)
+    incr(f"{message['tier']}.invalidations", len(message["keys"]))
+
+
+async def _listen():
+    subscribed_before = False
+
+    while True:
+        try:
+            async with get_async_redis().pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+
+                # anything published while we were disconnected is lost
+                if subscribed_before:
+                    for name, cache in _tiers.items():
+                        cache.clear()
+                        incr(f"{name}.local_flushes")
+                subscribed_before = True
+
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _apply(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except (redis.RedisError, OSError) as e:
+            incr("cache.invalidation.redis_errors")
+            logger.warning(f"Cache invalidation listener disconnected: {e!r}")
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener failed: {e!r}")
+
+        await asyncio.sleep(INVALIDATION_RETRY_SECONDS)
+
+
+def start_invalidation_listener():
+    """
+    Subscribes this worker to other workers' cache writes. Started with
+    the app; scripts running a single process can skip it.
+    """
+    global _listener
+
+    if _listener is None or _listener.done():
+        _listener = asyncio.create_task(_listen())
+
+
+async def stop_invalidation_listener():
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.cancel()
+    try:
+        await _listener
+    except asyncio.CancelledError:
+        pass
+    _listener = None
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    In-process LRU bounded by entry count and, if max_bytes is set, by
+    approximate bytes (the caller passes each value's size, normally its
+    serialized length). Entries expire ttl seconds after they were set.
+
+    Values are returned as stored, not copied: treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int | None, ttl: float):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._data: OrderedDict[str, tuple[object, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            value, size, expires = entry
+            if expires <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, size: int = 0, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0 or self._too_big(size):
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, size, time.monotonic() + ttl)
+            self.bytes += size
+
+            while len(self._data) > self.maxsize or self._too_big(self.bytes):
+                _, (_, evicted, _) = self._data.popitem(last=False)
+                self.bytes -= evicted
+
+    def delete(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def _too_big(self, size: int) -> bool:
+        return self.max_bytes is not None and size > self.max_bytes
+
+    def _remove(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def __len__(self):
+        return len(self._data)
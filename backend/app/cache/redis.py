@@ -1,14 +1,131 @@
+import asyncio
 import os
+import time
+
 import redis
+import redis.asyncio as aioredis
+
+from app.metrics.registry import incr, observe, ratio, register_gauge
 
 redis_url = os.getenv("REDIS_URL")
 
-if redis_url:
-    redis_client = redis.from_url(redis_url, decode_responses=True)
-else:
-    redis_client = redis.Redis(
+# async pool: at most this many connections per worker; callers beyond
+# it wait up to REDIS_POOL_TIMEOUT seconds for one to free up
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 32))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 2))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2))
+
+# an unreachable Redis fails fast instead of stalling callers, which
+# then carry on without their cache
+def _create_sync_client(decode_responses: bool) -> redis.Redis:
+    options = dict(
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        decode_responses=decode_responses,
+    )
+
+    if redis_url:
+        return redis.from_url(redis_url, **options)
+
+    return redis.Redis(
         host=os.getenv("REDIS_HOST", "localhost"),
         port=int(os.getenv("REDIS_PORT", 6379)),
         db=int(os.getenv("REDIS_DB", 0)),
-        decode_responses=True
-    )
\ No newline at end of file
+        **options
+    )
+
+
+redis_client = _create_sync_client(decode_responses=True)
+
+# values stored by app.cache.serializer are binary
+redis_bytes_client = _create_sync_client(decode_responses=False)
+
+
+class InstrumentedPool(aioredis.BlockingConnectionPool):
+    """
+    Bounded pool that records how long callers wait for a connection.
+    """
+
+    waiting = 0
+
+    async def get_connection(self, *args, **kwargs):
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            return await super().get_connection(*args, **kwargs)
+        except redis.ConnectionError as e:
+            # the pool raises ConnectionError from a TimeoutError when no
+            # connection freed up in time; anything else is Redis itself
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                incr("redis.pool.timeouts")
+            else:
+                incr("redis.connect_errors")
+            raise
+        finally:
+            self.waiting -= 1
+            observe("redis.pool.wait_seconds", time.perf_counter() - started)
+
+
+def _create_pool(decode_responses: bool) -> InstrumentedPool:
+    options = dict(
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        decode_responses=decode_responses,
+    )
+
+    if redis_url:
+        return InstrumentedPool.from_url(redis_url, **options)
+
+    return InstrumentedPool(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        db=int(os.getenv("REDIS_DB", 0)),
+        **options
+    )
+
+
+# one pool per response mode: str for most callers, bytes for
+# serialized cache values
+_pools: dict[bool, InstrumentedPool] = {}
+_async_clients: dict[bool, aioredis.Redis] = {}
+
+
+def get_async_redis(decode_responses: bool = True) -> aioredis.Redis:
+    """
+    The worker's shared async client. Created at startup by
+    init_async_redis; scripts that skip the app lifespan get it lazily.
+    """
+    client = _async_clients.get(decode_responses)
+    if client is None:
+        pool = _pools[decode_responses] = _create_pool(decode_responses)
+        client = _async_clients[decode_responses] = aioredis.Redis(connection_pool=pool)
+    return client
+
+
+async def init_async_redis():
+    get_async_redis()
+    get_async_redis(decode_responses=False)
+
+
+async def close_async_redis():
+    for decode_responses, client in list(_async_clients.items()):
+        await client.aclose()
+        await _pools[decode_responses].disconnect()
+    _pools.clear()
+    _async_clients.clear()
+
+
+def _in_use() -> int:
+    return sum(len(pool._in_use_connections) for pool in _pools.values())
+
+
+def _capacity() -> int:
+    return REDIS_MAX_CONNECTIONS * len(_pools)
+
+
+register_gauge("redis.pool.in_use", _in_use)
+register_gauge("redis.pool.idle", lambda: sum(len(pool._available_connections) for pool in _pools.values()))
+register_gauge("redis.pool.waiting", lambda: sum(pool.waiting for pool in _pools.values()))
+register_gauge("redis.pool.utilization", lambda: ratio(_in_use(), _capacity()))
@@ -1,25 +1,329 @@
-import json
+import asyncio
 import hashlib
-from app.cache.redis import redis_client
+import logging
+import os
+import time
+
+import redis
+
+from app.cache.analysis_store import prompt_version
+from app.cache.invalidation import (
+    INVALIDATION_CHANNEL,
+    invalidation_message,
+    register_local_tier
+)
+from app.cache.local_cache import TTLCache
+from app.cache.redis import get_async_redis, redis_bytes_client
+from app.cache.serializer import json_size, serializer
+from app.llm.backends import MODEL_NAME
+from app.metrics.registry import get_counter, incr, ratio, register_gauge
+
+# bump when aggregation or the response shape changes; prompt and model
+# changes roll the namespace on their own
+SCORE_CACHE_VERSION = "1"
+
+# entries are fresh for CACHE_TTL, then served stale (and refreshed in
+# the background) for up to SCORE_CACHE_STALE_TTL more before Redis
+# drops them
+CACHE_TTL = int(os.getenv("SCORE_CACHE_TTL", 3600))
+SCORE_CACHE_STALE_TTL = int(os.getenv("SCORE_CACHE_STALE_TTL", 24 * 3600))
+
+# in-process tier in front of Redis; its TTL bounds how long a worker
+# can serve an entry it missed the invalidation for (Redis outage)
+SCORE_LOCAL_CACHE_SIZE = int(os.getenv("SCORE_LOCAL_CACHE_SIZE", 2048))
+SCORE_LOCAL_CACHE_MAX_BYTES = int(os.getenv("SCORE_LOCAL_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+SCORE_LOCAL_CACHE_TTL = int(os.getenv("SCORE_LOCAL_CACHE_TTL", 300))
+
+# after a Redis error, serve from the local tier only for this long
+# instead of paying a timeout on every request
+SCORE_CACHE_REDIS_BACKOFF = float(os.getenv("SCORE_CACHE_REDIS_BACKOFF", 5))
+
+# every worker heartbeats the namespace it serves; entries of a namespace
+# no worker has heartbeated for SCORE_NAMESPACE_LIVE_TTL are purged, so
+# old and new workers in a rolling deploy keep each other's entries
+LIVE_NAMESPACE_PREFIX = "score_cache:live:"
+SCORE_NAMESPACE_HEARTBEAT_SECONDS = float(os.getenv("SCORE_NAMESPACE_HEARTBEAT_SECONDS", 60))
+SCORE_NAMESPACE_LIVE_TTL = max(int(3 * SCORE_NAMESPACE_HEARTBEAT_SECONDS), 1)
+
+# at most one purge per SCORE_CACHE_PURGE_INTERVAL across all workers
+PURGE_LOCK_KEY = "score_cache:purge_lock"
+SCORE_CACHE_PURGE_INTERVAL = int(os.getenv("SCORE_CACHE_PURGE_INTERVAL", 3600))
+PURGE_BATCH_SIZE = 1000
+
+
+def score_namespace() -> str:
+    version = f"{SCORE_CACHE_VERSION}:{prompt_version()}:{MODEL_NAME}"
+    return hashlib.sha256(version.encode("utf-8")).hexdigest()[:12]
+
+
+SCORE_NAMESPACE = score_namespace()
+
+logger = logging.getLogger("scoring")
+
+_local = register_local_tier(
+    "score_cache",
+    TTLCache(SCORE_LOCAL_CACHE_SIZE, SCORE_LOCAL_CACHE_MAX_BYTES, SCORE_LOCAL_CACHE_TTL)
+)
+_redis_retry_at = 0.0
+_heartbeat: asyncio.Task | None = None
 
-CACHE_TTL = 3600
 
 def generate_content_hash(text: str) -> str:
-    return hashlib.md5(text.encode('utf-8')).hexdigest()
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def make_score_key(user_id: str, resume_hash: str, jd_hash: str) -> str:
+    return f"score:{SCORE_NAMESPACE}:{user_id}:{resume_hash}:{jd_hash}"
+
+def _dumps(entry: dict) -> bytes:
+    return serializer.dumps(entry)
 
-def make_score_key(user_id: str, resume_text: str, jd_text: str) -> str:
-    resume_hash = generate_content_hash(resume_text)
-    jd_hash = generate_content_hash(jd_text)
-    
-    return f"score:{user_id}:{resume_hash}:{jd_hash}"
+def _entry(value: dict) -> dict:
+    return {"cached_at": time.time(), "score": value}
 
-def get_cached_score(key: str):
-    data = redis_client.get(key)
-    return json.loads(data) if data else None
+def _unwrap(entry: dict | None) -> tuple[dict | None, bool]:
+    """
+    (score, fresh); fresh is False once the entry is older than CACHE_TTL.
+    """
+    if entry is None:
+        return None, False
+
+    fresh = time.time() - entry["cached_at"] < CACHE_TTL
+    if not fresh:
+        incr("score_cache.stale_hits")
+    return entry["score"], fresh
+
+def _invalidation(keys: list[str]) -> str:
+    return invalidation_message("score_cache", keys)
+
+
+def _redis_up() -> bool:
+    return time.monotonic() >= _redis_retry_at
+
+def _redis_failed(e: Exception):
+    global _redis_retry_at
+
+    incr("score_cache.redis_errors")
+    if _redis_up():
+        logger.warning(f"Score cache Redis unavailable, local tier only: {e!r}")
+    _redis_retry_at = time.monotonic() + SCORE_CACHE_REDIS_BACKOFF
+
+
+def _get_local(key: str) -> dict | None:
+    entry = _local.get(key)
+    incr("score_cache.hits.local" if entry is not None else "score_cache.misses.local")
+    return entry
+
+def _from_redis(key: str, data: bytes | None) -> dict | None:
+    if not data:
+        incr("score_cache.misses.redis")
+        return None
+
+    try:
+        entry = serializer.loads(data)
+    except ValueError:
+        # unreadable entry (e.g. written by a newer format): rescore
+        incr("score_cache.decode_errors")
+        incr("score_cache.misses.redis")
+        return None
+
+    _local.set(key, entry, json_size(entry["score"]))
+    incr("score_cache.hits.redis")
+    return entry
+
+
+def get_cached_score(key: str) -> tuple[dict | None, bool]:
+    entry = _get_local(key)
+    if entry is not None or not _redis_up():
+        return _unwrap(entry)
+
+    try:
+        data = redis_bytes_client.get(key)
+    except (redis.RedisError, OSError) as e:
+        _redis_failed(e)
+        return None, False
+    return _unwrap(_from_redis(key, data))
 
 def set_cached_score(key: str, value: dict):
-    redis_client.setex(
-        key,
-        CACHE_TTL,
-        json.dumps(value, default=str)
-    )
\ No newline at end of file
+    entry = _entry(value)
+    data = _dumps(entry)
+    _local.set(key, entry, json_size(value))
+    if not _redis_up():
+        return
+
+    try:
+        pipe = redis_bytes_client.pipeline(transaction=False)
+        pipe.setex(key, CACHE_TTL + SCORE_CACHE_STALE_TTL, data)
+        pipe.publish(INVALIDATION_CHANNEL, _invalidation([key]))
+        pipe.execute()
+    except (redis.RedisError, OSError) as e:
+        _redis_failed(e)
+
+async def get_cached_score_async(key: str) -> tuple[dict | None, bool]:
+    """
+    (score, fresh), or (None, False) on a miss. Stale scores are still
+    returned; refreshing them is up to the caller.
+    """
+    entry = _get_local(key)
+    if entry is not None or not _redis_up():
+        return _unwrap(entry)
+
+    try:
+        data = await get_async_redis(decode_responses=False).get(key)
+    except (redis.RedisError, OSError) as e:
+        _redis_failed(e)
+        return None, False
+    return _unwrap(_from_redis(key, data))
+
+async def set_cached_score_async(key: str, value: dict):
+    await set_cached_scores_async({key: value})
+
+async def get_cached_scores_async(keys: list[str]) -> list[tuple[dict | None, bool]]:
+    """
+    Local tier first, then one MGET for the rest; (score, fresh) per
+    key, in keys order.
+    """
+    entries = [_get_local(key) for key in keys]
+    missing = [i for i, entry in enumerate(entries) if entry is None]
+
+    if missing and _redis_up():
+        try:
+            found = await get_async_redis(decode_responses=False).mget(
+                [keys[i] for i in missing]
+            )
+        except (redis.RedisError, OSError) as e:
+            _redis_failed(e)
+        else:
+            for i, data in zip(missing, found):
+                entries[i] = _from_redis(keys[i], data)
+
+    return [_unwrap(entry) for entry in entries]
+
+async def set_cached_scores_async(items: dict[str, dict]):
+    """
+    Writes both tiers: SETEX for every key -> value plus one
+    invalidation message, pipelined in one round trip.
+    """
+    if not items:
+        return
+
+    serialized = {}
+    for key, value in items.items():
+        entry = _entry(value)
+        serialized[key] = _dumps(entry)
+        _local.set(key, entry, json_size(value))
+    if not _redis_up():
+        return
+
+    try:
+        async with get_async_redis(decode_responses=False).pipeline(transaction=False) as pipe:
+            for key, data in serialized.items():
+                pipe.setex(key, CACHE_TTL + SCORE_CACHE_STALE_TTL, data)
+            pipe.publish(INVALIDATION_CHANNEL, _invalidation(list(items)))
+            await pipe.execute()
+    except (redis.RedisError, OSError) as e:
+        _redis_failed(e)
+
+
+async def live_namespaces() -> set[str]:
+    """
+    Namespaces some worker has heartbeated within SCORE_NAMESPACE_LIVE_TTL,
+    this worker's included.
+    """
+    live = {SCORE_NAMESPACE}
+    async for key in get_async_redis().scan_iter(match=f"{LIVE_NAMESPACE_PREFIX}*"):
+        live.add(key[len(LIVE_NAMESPACE_PREFIX):])
+    return live
+
+
+async def purge_old_namespaces() -> int:
+    """
+    Deletes every score entry whose namespace (an older prompt, model or
+    SCORE_CACHE_VERSION) no running worker serves any more, so dead
+    entries don't sit in Redis until their TTL. Returns the number of
+    keys removed.
+    """
+    client = get_async_redis()
+    try:
+        live = await live_namespaces()
+
+        removed = 0
+        batch = []
+        async for key in client.scan_iter(match="score:*", count=PURGE_BATCH_SIZE):
+            if key.split(":", 2)[1] not in live:
+                batch.append(key)
+            if len(batch) >= PURGE_BATCH_SIZE:
+                removed += await client.unlink(*batch)
+                batch = []
+        if batch:
+            removed += await client.unlink(*batch)
+    except (redis.RedisError, OSError) as e:
+        _redis_failed(e)
+        return 0
+
+    incr("score_cache.purged", removed)
+    if removed:
+        logger.info(f"Score cache: purged {removed} keys outside live namespaces {sorted(live)}")
+    return removed
+
+
+async def _namespace_loop():
+    client = get_async_redis()
+
+    while True:
+        try:
+            await client.setex(
+                f"{LIVE_NAMESPACE_PREFIX}{SCORE_NAMESPACE}",
+                SCORE_NAMESPACE_LIVE_TTL,
+                1
+            )
+            if await client.set(PURGE_LOCK_KEY, SCORE_NAMESPACE, nx=True, ex=SCORE_CACHE_PURGE_INTERVAL):
+                await purge_old_namespaces()
+        except asyncio.CancelledError:
+            raise
+        except (redis.RedisError, OSError) as e:
+            _redis_failed(e)
+
+        await asyncio.sleep(SCORE_NAMESPACE_HEARTBEAT_SECONDS)
+
+
+def start_namespace_heartbeat():
+    """
+    Marks this worker's namespace live and, once per
+    SCORE_CACHE_PURGE_INTERVAL across workers, purges dead ones.
+    Started with the app.
+    """
+    global _heartbeat
+
+    if _heartbeat is None or _heartbeat.done():
+        _heartbeat = asyncio.create_task(_namespace_loop())
+
+
+async def stop_namespace_heartbeat():
+    global _heartbeat
+
+    if _heartbeat is None:
+        return
+    _heartbeat.cancel()
+    try:
+        await _heartbeat
+    except asyncio.CancelledError:
+        pass
+    _heartbeat = None
+
+
+def _hit_rate(tier: str) -> float:
+    hits = get_counter(f"score_cache.hits.{tier}")
+    return ratio(hits, hits + get_counter(f"score_cache.misses.{tier}"))
+
+
+def _overall_hit_rate() -> float:
+    hits = get_counter("score_cache.hits.local") + get_counter("score_cache.hits.redis")
+    lookups = get_counter("score_cache.hits.local") + get_counter("score_cache.misses.local")
+    return ratio(hits, lookups)
+
+
+register_gauge("score_cache.hit_rate", _overall_hit_rate)
+register_gauge("score_cache.hit_rate.local", lambda: _hit_rate("local"))
+register_gauge("score_cache.hit_rate.redis", lambda: _hit_rate("redis"))
+register_gauge("score_cache.local_entries", lambda: len(_local))
+register_gauge("score_cache.local_bytes", lambda: _local.bytes)
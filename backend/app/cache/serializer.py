@@ -0,0 +1,138 @@
+import json
+import os
+import zlib
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# what new cache entries are written with; every format below stays
+# readable, so switching these only changes the writers
+CACHE_CODEC = os.getenv("CACHE_CODEC", "orjson")
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib")
+
+# smaller payloads are stored uncompressed: the header and the CPU
+# cost more than they save
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 512))
+CACHE_ZLIB_LEVEL = int(os.getenv("CACHE_ZLIB_LEVEL", 1))
+CACHE_ZSTD_LEVEL = int(os.getenv("CACHE_ZSTD_LEVEL", 3))
+
+# first byte of every encoded value: low nibble codec, high nibble
+# compression. Legacy entries are plain JSON text and start with "{"
+# (0x7b), which no header byte below can produce.
+CODECS = {"orjson": 0x01, "msgpack": 0x02}
+COMPRESSIONS = {"none": 0x00, "zlib": 0x10, "zstd": 0x20}
+LEGACY_JSON = ord("{")
+
+
+def _orjson_dumps(value) -> bytes:
+    return orjson.dumps(value, default=str)
+
+
+def _msgpack_dumps(value) -> bytes:
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes):
+    return msgpack.unpackb(data, raw=False)
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=CACHE_ZSTD_LEVEL).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+_encoders = {
+    0x01: (_orjson_dumps, orjson.loads),
+    0x02: (_msgpack_dumps, _msgpack_loads),
+}
+
+_compressors = {
+    0x00: (lambda data: data, lambda data: data),
+    0x10: (lambda data: zlib.compress(data, CACHE_ZLIB_LEVEL), zlib.decompress),
+    0x20: (_zstd_compress, _zstd_decompress),
+}
+
+
+class Serializer:
+    """
+    Versioned binary encoding for cached values: one header byte naming
+    the codec and compression, then the payload. Readers accept every
+    known header (and legacy JSON text), so a new format can be rolled
+    out one worker at a time.
+    """
+
+    def __init__(
+        self,
+        codec: str = CACHE_CODEC,
+        compression: str = CACHE_COMPRESSION,
+        compress_min_bytes: int = CACHE_COMPRESS_MIN_BYTES
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown cache codec: {codec}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+
+        # optional dependencies: fall back rather than fail at import
+        if codec == "msgpack" and msgpack is None:
+            codec = "orjson"
+        if compression == "zstd" and zstandard is None:
+            compression = "zlib"
+
+        self.codec = codec
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+
+    def dumps(self, value) -> bytes:
+        codec = CODECS[self.codec]
+        data = _encoders[codec][0](value)
+
+        compression = COMPRESSIONS[self.compression]
+        if compression and len(data) >= self.compress_min_bytes:
+            data = _compressors[compression][0](data)
+        else:
+            compression = COMPRESSIONS["none"]
+
+        return bytes((codec | compression,)) + data
+
+    def loads(self, data: bytes | str):
+        if isinstance(data, str) or data[0] == LEGACY_JSON:
+            return json.loads(data)
+
+        header = data[0]
+        codec, compression = header & 0x0F, header & 0xF0
+        if codec not in _encoders or compression not in _compressors:
+            raise ValueError(f"Unknown cache header: {header:#04x}")
+
+        if compression == COMPRESSIONS["zstd"] and zstandard is None:
+            raise ValueError("zstd cache entry but zstandard is not installed")
+        if codec == CODECS["msgpack"] and msgpack is None:
+            raise ValueError("msgpack cache entry but msgpack is not installed")
+
+        try:
+            payload = _compressors[compression][1](data[1:])
+            return _encoders[codec][1](payload)
+        except Exception as e:
+            raise ValueError(f"Corrupt cache entry: {e!r}") from e
+
+
+def json_size(value) -> int:
+    """
+    Length of value as compact JSON: a codec-independent estimate of
+    what it takes once decoded, used to bound in-process caches.
+    """
+    return len(_orjson_dumps(value))
+
+
+serializer = Serializer()
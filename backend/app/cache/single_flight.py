@@ -0,0 +1,129 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Awaitable, Callable
+
+import redis
+
+from app.cache.redis import get_async_redis
+from app.metrics.registry import incr
+
+SINGLE_FLIGHT_LOCK_TTL = int(os.getenv("SINGLE_FLIGHT_LOCK_TTL", 60))
+SINGLE_FLIGHT_POLL_SECONDS = float(os.getenv("SINGLE_FLIGHT_POLL_SECONDS", 0.1))
+
+# delete the lock only if we still own it
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key so only one of them does
+    the work.
+
+    Within a worker, followers await the leader's future. Across workers,
+    the leader holds a short Redis lock and followers poll `lookup`
+    (normally the shared cache the leader writes to) until the result
+    shows up or the lock goes away.
+    """
+
+    def __init__(self, name: str, client=None):
+        self.name = name
+        self._client = client
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @property
+    def client(self):
+        # the async pool is created in the app lifespan, after import
+        return self._client or get_async_redis()
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[dict]],
+        lookup: Callable[[], Awaitable[dict | None]]
+    ) -> dict:
+        while (future := self._inflight.get(key)) is not None:
+            incr(f"single_flight.{self.name}.coalesced_local")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # only the leader was cancelled: take over (or follow
+                # whoever did first) instead of failing with it
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                incr(f"single_flight.{self.name}.leader_cancelled")
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            result = await self._run_once(key, fn, lookup)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # mark retrieved so an unobserved failure doesn't warn
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _run_once(self, key, fn, lookup) -> dict:
+        lock_key = f"lock:{self.name}:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self.client.set(
+                lock_key, token, nx=True, ex=SINGLE_FLIGHT_LOCK_TTL
+            )
+        except (redis.RedisError, OSError):
+            incr(f"single_flight.{self.name}.redis_errors")
+            return await fn()
+
+        if not acquired:
+            result = await self._wait_for_leader(lock_key, lookup)
+            if result is not None:
+                incr(f"single_flight.{self.name}.coalesced_remote")
+                return result
+            # leader died or produced nothing shareable, do it ourselves
+            return await fn()
+
+        try:
+            return await fn()
+        finally:
+            try:
+                await self.client.eval(RELEASE_SCRIPT, 1, lock_key, token)
+            except (redis.RedisError, OSError):
+                incr(f"single_flight.{self.name}.redis_errors")
+
+    async def _wait_for_leader(self, lock_key, lookup) -> dict | None:
+        deadline = time.monotonic() + SINGLE_FLIGHT_LOCK_TTL
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(SINGLE_FLIGHT_POLL_SECONDS)
+
+            try:
+                result = await lookup()
+                if result is not None:
+                    return result
+
+                if not await self.client.exists(lock_key):
+                    return await lookup()
+            except (redis.RedisError, OSError):
+                incr(f"single_flight.{self.name}.redis_errors")
+                return None
+
+        return None
+
+
+score_flight = SingleFlight("score")
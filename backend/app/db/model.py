@@ -75,6 +75,8 @@ class ResumeVersion(Base):
 
     file_path = Column(Text, nullable=False)
     file_hash = Column(Text, nullable=False)
+    # sha256 of the parsed text the LLM prompt is built from
+    content_hash = Column(Text, nullable=True, index=True)
     parsed_data = Column(JSONB, nullable=True)
 
     status = Column(String, nullable=False, default="PENDING")
@@ -146,3 +148,32 @@ class AnalysisResult(Base):
             name="uq_resume_jd_result"
         ),
     )
+
+
+class LLMAnalysis(Base):
+    """
+    Content-addressed LLM output, shared across users and kept when the
+    resume versions / JDs that produced it are deleted.
+    """
+    __tablename__ = "llm_analyses"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    resume_hash = Column(Text, nullable=False)
+    jd_hash = Column(Text, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+
+    result = Column(JSONB, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint(
+            "resume_hash",
+            "jd_hash",
+            "prompt_version",
+            "model",
+            name="uq_llm_analysis_content"
+        ),
+    )
@@ -0,0 +1,74 @@
+import os
+
+from app.cache.extraction_cache import LRUCache
+from app.db.model import JobDescription
+from app.llm.prompt_builder import PROMPT_JD_TOKENS, compact_jd, jd_requirements
+from app.metrics.registry import incr, register_gauge
+from app.scoring.local_engine import jd_skill_weights
+
+# bump whenever a profile field changes; the JD budget changes prompt_text
+JD_PROFILE_VERSION = f"1:{PROMPT_JD_TOKENS}"
+
+JD_PROFILE_CACHE_SIZE = int(os.getenv("JD_PROFILE_CACHE_SIZE", 256))
+
+# how many of the heaviest skills the judgment prompt lists
+PROMPT_KEYWORDS = 12
+
+_profiles = LRUCache(JD_PROFILE_CACHE_SIZE)
+
+
+def build_jd_profile(content: str, analyzed_data: dict) -> dict:
+    """
+    Everything scoring needs from a JD that doesn't depend on the resume,
+    computed once instead of once per resume scored against it:
+        {
+            "version": JD_PROFILE_VERSION,
+            "requirements": [requirement line, ...],
+            "keywords": [{"name", "weight"}, ...],   # in JD order
+            "prompt_text": compacted JD for the LLM prompt,
+        }
+    keywords is a list because JSONB doesn't keep object key order.
+    """
+    weights = jd_skill_weights(analyzed_data or {})
+
+    return {
+        "version": JD_PROFILE_VERSION,
+        "requirements": jd_requirements(content),
+        "keywords": [{"name": name, "weight": weight} for name, weight in weights.items()],
+        "prompt_text": compact_jd(content),
+    }
+
+
+def get_jd_profile(jd: JobDescription) -> dict:
+    """
+    The profile stored with the JD at analysis time, else one built once
+    per worker (JDs analyzed before profiles existed or under another
+    version).
+    """
+    stored = (jd.analyzed_data or {}).get("profile")
+    if stored and stored.get("version") == JD_PROFILE_VERSION:
+        incr("jd_profile.hits.stored")
+        return stored
+
+    key = f"{jd.id}:{JD_PROFILE_VERSION}"
+    profile = _profiles.get(key)
+    if profile is not None:
+        incr("jd_profile.hits.local")
+        return profile
+
+    incr("jd_profile.builds")
+    profile = build_jd_profile(jd.content, jd.analyzed_data)
+    _profiles.set(key, profile)
+    return profile
+
+
+def keyword_weights(profile: dict) -> dict[str, float]:
+    return {k["name"]: k["weight"] for k in profile["keywords"]}
+
+
+def top_keywords(profile: dict, n: int = PROMPT_KEYWORDS) -> list[str]:
+    ranked = sorted(profile["keywords"], key=lambda k: -k["weight"])
+    return [k["name"] for k in ranked[:n]]
+
+
+register_gauge("jd_profile.local_entries", lambda: len(_profiles))
@@ -1,9 +1,33 @@
 import re
-from app.nlp.candidate_extractor import extract_candidates
+from bisect import bisect_left
+
+from app.cache.extraction_cache import (
+    get_cached_extraction,
+    get_cached_extraction_async,
+    make_extraction_key,
+    set_cached_extraction,
+    set_cached_extraction_async
+)
+from app.nlp.aho_corasick import AhoCorasick
+from app.nlp.candidate_extractor import (
+    MODE_GAZETTEER,
+    extract_candidates,
+    extract_candidates_batch,
+    resolve_mode
+)
+from app.nlp.batcher import candidate_batcher
+from app.nlp.document_index import TOKEN_SPLIT, tokenize
 from app.nlp.normalizer import is_valid_candidate, normalize
+from app.nlp.taxonomy import get_taxonomy
 
 
 REQUIRED_KEYWORDS = ("must", "required", "requirement", "mandatory")
+REQUIRED_WINDOW = 50
+
+# REQUIRED_WINDOW in tokens, for scoring taxonomy hits, where keywords
+# match whole words only
+REQUIRED_WINDOW_TOKENS = 8
+REQUIRED_TOKENS = frozenset(REQUIRED_KEYWORDS + ("requirements",))
 
 
 def count_occurrences(text: str, skill: str) -> int:
@@ -12,7 +36,7 @@ def count_occurrences(text: str, skill: str) -> int:
 
 
 def is_required_skill(text: str, skill: str) -> bool:
-    window = 50
+    window = REQUIRED_WINDOW
     match = re.search(rf"\b{re.escape(skill)}\b", text)
     if not match:
         return False
@@ -26,35 +50,229 @@ def is_required_skill(text: str, skill: str) -> bool:
     return any(k in snippet for k in REQUIRED_KEYWORDS)
 
 
-def extract_jd_skills(text: str) -> list[dict]:
-    raw_candidates = extract_candidates(text)
-    lowered = text.lower()
+def _word_boundaries(text: str) -> bytearray:
+    """
+    boundary[i] == 1 iff regex \\b matches at position i of text.
+    """
+    is_word = bytearray(len(text) + 2)
+    for m in re.finditer(r"\w+", text):
+        is_word[m.start() + 1:m.end() + 1] = b"\x01" * (m.end() - m.start())
+
+    return bytearray(
+        is_word[i] ^ is_word[i + 1] for i in range(len(text) + 1)
+    )
+
+
+def scan_skills(text: str, skills: list[str]) -> dict[str, dict]:
+    """
+    Single pass over the (lowered) text for all skills at once.
+
+    Returns, per skill, the same values count_occurrences and
+    is_required_skill would compute:
+        {"count": int, "positions": list[int], "required": bool}
+    where positions are the non-overlapping whole-word match starts.
+    """
+    skills = list(dict.fromkeys(skills))
+    keywords = list(REQUIRED_KEYWORDS)
+    automaton = AhoCorasick(skills + keywords)
+    boundary = _word_boundaries(text)
+
+    hits = [[] for _ in skills]
+    keyword_positions = [[] for _ in keywords]
+    n_skills = len(skills)
+
+    for start, idx in automaton.iter_matches(text):
+        if idx >= n_skills:
+            keyword_positions[idx - n_skills].append(start)
+        elif boundary[start] and boundary[start + len(skills[idx])]:
+            hits[idx].append(start)
+
+    results = {}
+
+    for skill, starts in zip(skills, hits):
+        # mirror re.findall: leftmost match first, resume after its end
+        starts.sort()
+        positions = []
+        next_free = 0
+        for start in starts:
+            if start >= next_free:
+                positions.append(start)
+                next_free = start + len(skill)
+
+        required = False
+        if positions:
+            idx = positions[0]
+            lo = max(0, idx - REQUIRED_WINDOW)
+            hi = min(len(text), idx + REQUIRED_WINDOW)
+            required = any(
+                _occurs_within(kw_starts, len(kw), lo, hi)
+                for kw, kw_starts in zip(keywords, keyword_positions)
+            )
+
+        results[skill] = {
+            "count": len(positions),
+            "positions": positions,
+            "required": required
+        }
+
+    return results
+
+
+def _occurs_within(starts: list[int], length: int, lo: int, hi: int) -> bool:
+    # starts are already sorted by the automaton (same-length pattern)
+    i = bisect_left(starts, lo)
+    return i < len(starts) and starts[i] + length <= hi
+
+
+def _confidence(count: int, required: bool) -> float:
+    confidence = 0.4
+
+    if count >= 2:
+        confidence += 0.3
+
+    if required:
+        confidence += 0.2
+
+    return min(confidence, 1.0)
 
-    skill_map = {}
 
-    for cand in raw_candidates:
-        normalized = normalize(cand)
-        if not is_valid_candidate(normalized):
-            continue
+def _keyword_positions(text: str) -> list[int]:
+    """
+    Token offsets of the required keywords in text. Whole words only:
+    neither "mustard" nor the "requirement" in "requirement-free" counts.
+    """
+    positions = []
+    offset = 0
+    for chunk in TOKEN_SPLIT.split(text):
+        if normalize(chunk) in REQUIRED_TOKENS:
+            positions.append(offset)
+        offset += len(tokenize(chunk))
+    return positions
 
-        confidence = 0.4
 
-        if count_occurrences(lowered, normalized) >= 2:
-            confidence += 0.3
+def _scan_taxonomy(text: str) -> dict[str, dict]:
+    """
+    Counts and requiredness of every taxonomy skill in text, from the
+    same token spans the gazetteer found them by, so "Node.js", "CI/CD"
+    and their aliases count under their canonical name.
+    """
+    tokens = tokenize(text)
+    keyword_positions = _keyword_positions(text)
 
-        if is_required_skill(lowered, normalized):
-            confidence += 0.2
+    results = {}
+    for start, end, name in get_taxonomy().find(tokens):
+        match = results.setdefault(name, {"count": 0, "required": False, "start": start, "end": end})
+        match["count"] += 1
 
-        confidence = min(confidence, 1.0)
+    for match in results.values():
+        lo = match["start"] - REQUIRED_WINDOW_TOKENS
+        hi = match["end"] + REQUIRED_WINDOW_TOKENS
+        match["required"] = any(lo <= i < hi for i in keyword_positions)
 
-        if confidence < 0.5:
-            continue
+    return results
 
-        # keep highest confidence per skill
-        if normalized not in skill_map or confidence > skill_map[normalized]:
-            skill_map[normalized] = confidence
+
+def _score_jd_candidates(
+    raw_candidates: set[str],
+    text: str,
+    mode: str
+) -> list[dict]:
+    skill_map = {}
+
+    if mode == MODE_GAZETTEER:
+        # the candidates are these same taxonomy hits; score them from
+        # their spans rather than re-scanning raw text for the
+        # normalized names ("nodejs" never occurs in "node.js")
+        for name, match in _scan_taxonomy(text).items():
+            confidence = _confidence(match["count"], match["required"])
+            if confidence >= 0.5:
+                skill_map[normalize(name)] = confidence
+    else:
+        normalized_candidates = [
+            normalized
+            for normalized in (normalize(cand) for cand in raw_candidates)
+            if is_valid_candidate(normalized)
+        ]
+        matches = scan_skills(text.lower(), normalized_candidates)
+
+        for normalized in normalized_candidates:
+            match = matches[normalized]
+            confidence = _confidence(match["count"], match["required"])
+
+            if confidence < 0.5:
+                continue
+
+            # keep highest confidence per skill
+            if normalized not in skill_map or confidence > skill_map[normalized]:
+                skill_map[normalized] = confidence
 
     return [
         {"name": name, "confidence": round(conf, 2)}
         for name, conf in skill_map.items()
     ]
+
+
+def extract_jd_skills(text: str, mode: str | None = None) -> list[dict]:
+    mode = resolve_mode(mode)
+    cache_key = make_extraction_key("jd", text, mode)
+
+    cached = get_cached_extraction(cache_key)
+    if cached is not None:
+        return cached
+
+    raw_candidates = extract_candidates(text, mode=mode)
+    skills = _score_jd_candidates(raw_candidates, text, mode)
+
+    set_cached_extraction(cache_key, skills)
+    return skills
+
+
+async def extract_jd_skills_async(
+    text: str,
+    mode: str | None = None
+) -> list[dict]:
+    """
+    Same as extract_jd_skills, but batched with concurrent submissions
+    and run off the event loop.
+    """
+    mode = resolve_mode(mode)
+    cache_key = make_extraction_key("jd", text, mode)
+
+    cached = await get_cached_extraction_async(cache_key)
+    if cached is not None:
+        return cached
+
+    raw_candidates = await candidate_batcher.extract(text, mode=mode)
+    skills = _score_jd_candidates(raw_candidates, text, mode)
+
+    await set_cached_extraction_async(cache_key, skills)
+    return skills
+
+
+def extract_jd_skills_batch(
+    texts: list[str],
+    n_process: int | None = None,
+    batch_size: int | None = None,
+    mode: str | None = None
+) -> list[list[dict]]:
+    """
+    Batch variant of extract_jd_skills, results keep input order.
+    Only cache misses go through spaCy.
+    """
+    mode = resolve_mode(mode)
+    keys = [make_extraction_key("jd", text, mode) for text in texts]
+    results = [get_cached_extraction(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    candidate_sets = extract_candidates_batch(
+        [texts[i] for i in missing],
+        n_process=n_process,
+        batch_size=batch_size,
+        mode=mode
+    )
+
+    for i, raw_candidates in zip(missing, candidate_sets):
+        results[i] = _score_jd_candidates(raw_candidates, texts[i], mode)
+        set_cached_extraction(keys[i], results[i])
+
+    return results
@@ -2,8 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.deps import get_current_user
-from app.db.model import User
+from app.auth.deps import CurrentUser, get_current_user
 from app.db.session import get_session
 from app.jobs.service import analyze_job_description
 from app.auth.schema import JDInput
@@ -14,7 +13,7 @@ router = APIRouter(prefix="/jobs", tags=["Jobs"])
 @router.post("/analyze")
 async def analyze_jd(
     payload: JDInput,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     if not payload:
@@ -5,7 +5,8 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.model import JobDescription
-from app.jobs.jd_skill_pipeline import extract_jd_skills
+from app.jobs.jd_profile import build_jd_profile, get_jd_profile
+from app.jobs.jd_skill_pipeline import extract_jd_skills_async
 
 async def analyze_job_description(
     content: str,
@@ -26,16 +27,20 @@ async def analyze_job_description(
     if jd:
         return {
             "job_description_id": str(jd.id),
-            "skills": jd.analyzed_data["skills"]
+            "skills": jd.analyzed_data["skills"],
+            "requirements": get_jd_profile(jd)["requirements"]
         }
 
-    skills = extract_jd_skills(content)
+    skills = await extract_jd_skills_async(content)
+
+    # scoring reuses the profile for every resume scored against this JD
+    profile = build_jd_profile(content, {"skills": skills})
 
     jd = JobDescription(
         user_id=user_id,
         content=content,
         content_hash=content_hash,
-        analyzed_data={"skills": skills}
+        analyzed_data={"skills": skills, "profile": profile}
     )
 
     db.add(jd)
@@ -43,5 +48,6 @@ async def analyze_job_description(
 
     return {
         "job_description_id": str(jd.id),
-        "skills": skills
+        "skills": skills,
+        "requirements": profile["requirements"]
     }
@@ -0,0 +1,440 @@
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+from dotenv import load_dotenv
+from google import genai
+from google.genai import errors, types
+
+from app.llm.context_cache import prefix_cache
+from app.llm.debug_log import log_llm_call
+from app.metrics.registry import observe
+
+load_dotenv()
+
+MODEL_NAME = "gemini-2.5-flash"
+
+# gemini (default) | record | replay
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+
+# point the SDK at a stand-in server, e.g. benchmarks/fake_gemini.py
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+LLM_FIXTURES_DIR = Path(os.getenv("LLM_FIXTURES_DIR", "benchmarks/fixtures/llm"))
+
+# replayed streams are cut into chunks of this many characters
+REPLAY_CHUNK_CHARS = 64
+
+
+def generation_config(
+    timeout: float | None = None,
+    schema: type | None = None,
+    cached_content: str | None = None
+) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        temperature=0.1,
+        response_mime_type="application/json",
+        response_schema=schema,
+        cached_content=cached_content,
+        http_options=types.HttpOptions(timeout=int(timeout * 1000)) if timeout else None
+    )
+
+
+def response_text(response) -> str:
+    if not response or not response.text:
+        raise RuntimeError("Empty response from Gemini")
+
+    return response.text.strip()
+
+
+def record_usage(response) -> dict:
+    """
+    Token counts of a response (empty when it carries none), also
+    recorded as metrics.
+    """
+    # cached_content_token_count covers explicit caches and Gemini's
+    # implicit prefix caching alike
+    usage = getattr(response, "usage_metadata", None)
+    if not usage or not usage.prompt_token_count:
+        return {}
+
+    observe("llm.input_tokens", usage.prompt_token_count)
+    observe("llm.cached_input_tokens", usage.cached_content_token_count or 0)
+
+    return {
+        "input_tokens": usage.prompt_token_count,
+        "cached_input_tokens": usage.cached_content_token_count or 0,
+        "output_tokens": usage.candidates_token_count or 0,
+    }
+
+
+def _log_call(
+    kind: str,
+    schema: type | None,
+    started: float,
+    cache_name: str | None,
+    response=None,
+    error: Exception | None = None,
+    **fields
+):
+    log_llm_call(
+        model=MODEL_NAME,
+        kind=kind,
+        schema=schema.__name__ if schema else None,
+        cached_prefix=cache_name is not None,
+        latency_ms=round((time.perf_counter() - started) * 1000, 1),
+        outcome="error" if error else "ok",
+        error=repr(error) if error else None,
+        **record_usage(response),
+        **fields
+    )
+
+
+def _stale_cache(e: Exception) -> bool:
+    # the provider dropped the cache before our TTL ran out: a 404, or
+    # a 400 / 403 about the cached content ("CachedContent not found (or
+    # permission denied)"). Other client errors are the request's own
+    if not isinstance(e, errors.ClientError):
+        return False
+    if e.code == 404:
+        return True
+
+    text = f"{e.status or ''} {e.message or ''}".lower().replace("_", "")
+    return e.code in (400, 403) and "cachedcontent" in text
+
+
+class LLMBackend(ABC):
+    """
+    What gemini_client needs from a model provider: one blocking call,
+    one async call and one async text stream. Concurrency limits,
+    resilience and metrics stay in gemini_client.
+
+    schema is a pydantic model the output must conform to; backends
+    that can't enforce it ignore it.
+
+    prefix is the leading part of prompt that many calls share (the
+    instructions and JD). Backends with provider-side context caching
+    send it once and reference it afterwards; the rest send prompt
+    whole. Either way the model sees the same text.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def generate(
+        self,
+        prompt: str,
+        timeout: float | None = None,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> str:
+        ...
+
+    @abstractmethod
+    async def generate_async(
+        self,
+        prompt: str,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> str:
+        ...
+
+    @abstractmethod
+    def generate_stream(
+        self,
+        prompt: str,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> AsyncIterator[str]:
+        ...
+
+
+class GeminiBackend(LLMBackend):
+    """
+    google-genai SDK. The client is created on first use, so importing
+    the app without GEMINI_API_KEY works (fast mode, replay, tooling).
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str | None = None, base_url: str | None = GEMINI_BASE_URL):
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> genai.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> genai.Client:
+        api_key = self.api_key or os.getenv("GEMINI_API_KEY")
+
+        if self.base_url:
+            # stand-in servers don't check the key
+            return genai.Client(
+                api_key=api_key or "local",
+                http_options=types.HttpOptions(base_url=self.base_url, api_version="v1beta")
+            )
+
+        if not api_key:
+            raise RuntimeError("GEMINI_API_KEY not set in environment")
+
+        return genai.Client(api_key=api_key)
+
+    async def _create_cache(self, prefix: str, ttl: int) -> str:
+        cache = await self.client.aio.caches.create(
+            model=MODEL_NAME,
+            config=types.CreateCachedContentConfig(
+                contents=prefix,
+                ttl=f"{ttl}s",
+                display_name="ats-prompt-prefix"
+            ),
+        )
+        return cache.name
+
+    async def _cached(self, prompt: str, prefix: str | None) -> tuple[str, str | None]:
+        """
+        (contents to send, cache handle or None)
+        """
+        name = await prefix_cache.handle(MODEL_NAME, prefix, self._create_cache)
+        if name is None:
+            return prompt, None
+        return prompt[len(prefix):], name
+
+    def generate(
+        self,
+        prompt: str,
+        timeout: float | None = None,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> str:
+        # the blocking path only reuses caches the async paths created
+        name = prefix_cache.lookup(MODEL_NAME, prefix)
+        contents = prompt[len(prefix):] if name else prompt
+        started = time.perf_counter()
+
+        try:
+            response = self.client.models.generate_content(
+                model=MODEL_NAME,
+                contents=contents,
+                config=generation_config(timeout, schema, name),
+            )
+        except Exception as e:
+            _log_call("generate", schema, started, name, error=e)
+            if not (name and _stale_cache(e)):
+                raise
+            prefix_cache.invalidate(MODEL_NAME, prefix)
+            return self.generate(prompt, timeout, schema)
+
+        _log_call("generate", schema, started, name, response)
+        return response_text(response)
+
+    async def generate_async(
+        self,
+        prompt: str,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> str:
+        contents, name = await self._cached(prompt, prefix)
+        started = time.perf_counter()
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=MODEL_NAME,
+                contents=contents,
+                config=generation_config(schema=schema, cached_content=name),
+            )
+        except Exception as e:
+            _log_call("generate", schema, started, name, error=e)
+            if not (name and _stale_cache(e)):
+                raise
+            await prefix_cache.invalidate_async(MODEL_NAME, prefix)
+            return await self.generate_async(prompt, schema)
+
+        _log_call("generate", schema, started, name, response)
+        return response_text(response)
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> AsyncIterator[str]:
+        contents, name = await self._cached(prompt, prefix)
+        started = time.perf_counter()
+
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=MODEL_NAME,
+                contents=contents,
+                config=generation_config(schema=schema, cached_content=name),
+            )
+        except Exception as e:
+            _log_call("stream", schema, started, name, error=e)
+            if not (name and _stale_cache(e)):
+                raise
+            await prefix_cache.invalidate_async(MODEL_NAME, prefix)
+            name = None
+            started = time.perf_counter()
+            stream = await self.client.aio.models.generate_content_stream(
+                model=MODEL_NAME,
+                contents=prompt,
+                config=generation_config(schema=schema),
+            )
+
+        last = None
+        first_chunk_ms = None
+        try:
+            async for chunk in stream:
+                if first_chunk_ms is None:
+                    first_chunk_ms = round((time.perf_counter() - started) * 1000, 1)
+                last = chunk
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            _log_call("stream", schema, started, name, error=e, first_chunk_ms=first_chunk_ms)
+            raise
+
+        # usage totals arrive with the final chunk
+        _log_call("stream", schema, started, name, last, first_chunk_ms=first_chunk_ms)
+
+
+def fixture_key(prompt: str) -> str:
+    return hashlib.sha256(f"{MODEL_NAME}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+class RecordingBackend(LLMBackend):
+    """
+    Passes calls through to `inner` and saves every response under
+    LLM_FIXTURES_DIR, keyed by model + prompt hash, for ReplayBackend.
+    """
+
+    name = "record"
+
+    def __init__(self, inner: LLMBackend, fixtures_dir: Path = LLM_FIXTURES_DIR):
+        self.inner = inner
+        self.fixtures_dir = fixtures_dir
+
+    def _save(self, prompt: str, text: str):
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        path = self.fixtures_dir / f"{fixture_key(prompt)}.json"
+        path.write_text(
+            json.dumps({"model": MODEL_NAME, "prompt": prompt, "text": text}, indent=2),
+            encoding="utf-8"
+        )
+
+    def generate(
+        self,
+        prompt: str,
+        timeout: float | None = None,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> str:
+        text = self.inner.generate(prompt, timeout, schema, prefix)
+        self._save(prompt, text)
+        return text
+
+    async def generate_async(
+        self,
+        prompt: str,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> str:
+        text = await self.inner.generate_async(prompt, schema, prefix)
+        self._save(prompt, text)
+        return text
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> AsyncIterator[str]:
+        chunks = []
+        async for chunk in self.inner.generate_stream(prompt, schema, prefix):
+            chunks.append(chunk)
+            yield chunk
+        self._save(prompt, "".join(chunks))
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Serves responses captured by RecordingBackend. An unrecorded prompt
+    is an error, not a live call.
+    """
+
+    name = "replay"
+
+    def __init__(self, fixtures_dir: Path = LLM_FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+
+    def _load(self, prompt: str) -> str:
+        path = self.fixtures_dir / f"{fixture_key(prompt)}.json"
+        if not path.exists():
+            raise RuntimeError(f"No recorded LLM response for prompt {path.stem}")
+        return json.loads(path.read_text(encoding="utf-8"))["text"]
+
+    def generate(
+        self,
+        prompt: str,
+        timeout: float | None = None,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> str:
+        return self._load(prompt)
+
+    async def generate_async(
+        self,
+        prompt: str,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> str:
+        return self._load(prompt)
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        schema: type | None = None,
+        prefix: str | None = None
+    ) -> AsyncIterator[str]:
+        text = self._load(prompt)
+        for i in range(0, len(text), REPLAY_CHUNK_CHARS):
+            yield text[i:i + REPLAY_CHUNK_CHARS]
+
+
+def create_backend(name: str = LLM_BACKEND) -> LLMBackend:
+    if name == "gemini":
+        return GeminiBackend()
+    if name == "record":
+        return RecordingBackend(GeminiBackend())
+    if name == "replay":
+        return ReplayBackend()
+    raise ValueError(f"Unknown LLM_BACKEND: {name}")
+
+
+_backend: LLMBackend | None = None
+
+
+def get_backend() -> LLMBackend:
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend: LLMBackend):
+    """
+    Swaps the process-wide backend (benchmarks, load tests).
+    """
+    global _backend
+    _backend = backend
@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Awaitable, Callable
+
+import redis
+
+from app.cache.redis import get_async_redis, redis_client
+from app.llm.prompt_builder import estimate_tokens
+from app.metrics.registry import get_counter, incr, ratio, register_gauge
+
+PREFIX_CACHE_ENABLED = os.getenv("LLM_PREFIX_CACHE", "true").lower() == "true"
+PREFIX_CACHE_TTL = int(os.getenv("LLM_PREFIX_CACHE_TTL", 3600))
+
+# Gemini rejects explicit caches smaller than this (2.5 Flash); shorter
+# prefixes are sent inline and left to the provider's implicit caching
+PREFIX_CACHE_MIN_TOKENS = int(os.getenv("LLM_PREFIX_CACHE_MIN_TOKENS", 1024))
+
+# stop handing out a handle this long before the provider expires it,
+# so a call started just before expiry doesn't reference a dead cache
+PREFIX_CACHE_MARGIN = 60
+
+logger = logging.getLogger("gemini")
+
+
+class PrefixCache:
+    """
+    Provider-side context cache handles for stable prompt prefixes
+    (instructions + one JD), so scoring many resumes against one JD
+    sends and bills the JD once per TTL instead of once per resume.
+
+    Handles live in the worker and in Redis, so every worker reuses the
+    cache the first one created. Concurrent misses for one prefix in a
+    worker share a single create call.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = PREFIX_CACHE_ENABLED,
+        ttl: int = PREFIX_CACHE_TTL,
+        min_tokens: int = PREFIX_CACHE_MIN_TOKENS,
+        client=redis_client,
+        async_client=None
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.client = client
+        self._async_client = async_client
+        self._local: dict[str, tuple[str, float]] = {}
+        self._creating: dict[str, asyncio.Future] = {}
+
+    @property
+    def async_client(self):
+        # the async pool is created in the app lifespan, after import
+        return self._async_client or get_async_redis()
+
+    def key(self, model: str, prefix: str) -> str:
+        digest = hashlib.sha256(f"{model}\n{prefix}".encode("utf-8")).hexdigest()
+        return f"llm_prefix:{digest}"
+
+    def eligible(self, prefix: str | None) -> bool:
+        return (
+            self.enabled
+            and bool(prefix)
+            and estimate_tokens(prefix) >= self.min_tokens
+        )
+
+    def _get_local(self, key: str) -> str | None:
+        local = self._local.get(key)
+        if local and local[1] > time.monotonic():
+            return local[0]
+        return None
+
+    def _from_redis(self, key: str, name: str | None, ttl: int) -> str | None:
+        if not name or ttl <= 0:
+            return None
+
+        self._local[key] = (name, time.monotonic() + ttl)
+        return name
+
+    def lookup(self, model: str, prefix: str | None) -> str | None:
+        """
+        Existing handle for prefix, or None. Never creates one.
+        Blocking; the async paths use lookup_async.
+        """
+        if not self.eligible(prefix):
+            return None
+
+        key = self.key(model, prefix)
+        name = self._get_local(key)
+        if name:
+            return name
+
+        try:
+            name = self.client.get(key)
+            ttl = self.client.ttl(key) if name else 0
+        except (redis.RedisError, OSError):
+            incr("llm.prefix_cache.redis_errors")
+            return None
+
+        return self._from_redis(key, name, ttl)
+
+    async def lookup_async(self, model: str, prefix: str | None) -> str | None:
+        if not self.eligible(prefix):
+            return None
+
+        key = self.key(model, prefix)
+        name = self._get_local(key)
+        if name:
+            return name
+
+        try:
+            async with self.async_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.ttl(key)
+                name, ttl = await pipe.execute()
+        except (redis.RedisError, OSError):
+            incr("llm.prefix_cache.redis_errors")
+            return None
+
+        return self._from_redis(key, name, ttl)
+
+    async def _store(self, key: str, name: str):
+        usable = max(self.ttl - PREFIX_CACHE_MARGIN, 1)
+        self._local[key] = (name, time.monotonic() + usable)
+
+        try:
+            await self.async_client.setex(key, usable, name)
+        except (redis.RedisError, OSError):
+            incr("llm.prefix_cache.redis_errors")
+
+    def invalidate(self, model: str, prefix: str):
+        key = self.key(model, prefix)
+        self._local.pop(key, None)
+
+        try:
+            self.client.delete(key)
+        except (redis.RedisError, OSError):
+            incr("llm.prefix_cache.redis_errors")
+
+    async def invalidate_async(self, model: str, prefix: str):
+        key = self.key(model, prefix)
+        self._local.pop(key, None)
+
+        try:
+            await self.async_client.delete(key)
+        except (redis.RedisError, OSError):
+            incr("llm.prefix_cache.redis_errors")
+
+    async def handle(
+        self,
+        model: str,
+        prefix: str | None,
+        create: Callable[[str, int], Awaitable[str]]
+    ) -> str | None:
+        """
+        Handle for prefix, creating the provider cache on a miss with
+        create(prefix, ttl_seconds). None when the prefix isn't worth
+        caching or creation failed; the caller then sends it inline.
+        """
+        if not self.eligible(prefix):
+            incr("llm.prefix_cache.skipped")
+            return None
+
+        name = await self.lookup_async(model, prefix)
+        if name:
+            incr("llm.prefix_cache.hits")
+            return name
+
+        key = self.key(model, prefix)
+        future = self._creating.get(key)
+        if future is not None:
+            incr("llm.prefix_cache.hits")
+            return await asyncio.shield(future)
+
+        incr("llm.prefix_cache.misses")
+        future = asyncio.get_running_loop().create_future()
+        self._creating[key] = future
+
+        try:
+            name = await create(prefix, self.ttl)
+        except asyncio.CancelledError:
+            # followers fall back to the inline prompt
+            future.set_result(None)
+            raise
+        except Exception as e:
+            logger.warning(f"Prefix cache create failed, sending prompt inline: {e!r}")
+            incr("llm.prefix_cache.errors")
+            name = None
+        else:
+            incr("llm.prefix_cache.created")
+        finally:
+            self._creating.pop(key, None)
+
+        # followers get the handle before the Redis write, which can be
+        # slow or cancelled without leaving them waiting
+        future.set_result(name)
+        if name:
+            await self._store(key, name)
+        return name
+
+
+prefix_cache = PrefixCache()
+
+
+def _hit_rate() -> float:
+    hits = get_counter("llm.prefix_cache.hits")
+    return ratio(hits, hits + get_counter("llm.prefix_cache.misses"))
+
+
+register_gauge("llm.prefix_cache.hit_rate", _hit_rate)
@@ -0,0 +1,172 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from app.metrics.registry import incr, register_gauge
+
+LLM_DEBUG_LOG = os.getenv("LLM_DEBUG_LOG", "gemini_debug.log")
+
+# rotate on whichever comes first, keeping LLM_DEBUG_LOG_BACKUPS files
+LLM_DEBUG_LOG_MAX_BYTES = int(os.getenv("LLM_DEBUG_LOG_MAX_BYTES", 10 * 1024 * 1024))
+LLM_DEBUG_LOG_ROTATE_SECONDS = int(os.getenv("LLM_DEBUG_LOG_ROTATE_SECONDS", 24 * 3600))
+LLM_DEBUG_LOG_BACKUPS = int(os.getenv("LLM_DEBUG_LOG_BACKUPS", 5))
+
+# share of raw model outputs written out; failed and repaired outputs
+# are always kept
+LLM_RAW_OUTPUT_SAMPLE_RATE = float(os.getenv("LLM_RAW_OUTPUT_SAMPLE_RATE", 0.05))
+
+# records waiting for the writer thread; beyond this they are dropped
+# rather than blocking the request
+LLM_DEBUG_LOG_QUEUE_SIZE = int(os.getenv("LLM_DEBUG_LOG_QUEUE_SIZE", 10000))
+
+# raw outputs and per-call records; not echoed to the console
+debug_logger = logging.getLogger("gemini.debug")
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger, message and whatever
+    was passed as extra={"fields": {...}}.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that also rolls over once the current file is
+    older than max_age seconds.
+    """
+
+    def __init__(self, filename: str, max_bytes: int, max_age: int, backup_count: int):
+        super().__init__(
+            filename,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True
+        )
+        self.max_age = max_age
+        self.opened_at = time.time()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.max_age > 0 and time.time() - self.opened_at >= self.max_age:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.opened_at = time.time()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Never blocks the caller: a full queue drops the record.
+    """
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            incr("llm.debug_log.dropped")
+
+
+class _NotDebug(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not record.name.startswith(debug_logger.name)
+
+
+_queue: queue.Queue = queue.Queue(LLM_DEBUG_LOG_QUEUE_SIZE)
+_listener: QueueListener | None = None
+
+
+def configure_gemini_logging() -> logging.Logger:
+    """
+    Routes the "gemini" logger through a queue to a background thread
+    that writes the console and the rotating JSON log file, so request
+    latency never depends on disk (or stderr) speed.
+    Idempotent; returns the "gemini" logger.
+    """
+    global _listener
+
+    logger = logging.getLogger("gemini")
+    if _listener is not None:
+        return logger
+
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(asctime)s | GEMINI | %(message)s"))
+    console.addFilter(_NotDebug())
+
+    log_file = SizeAndTimeRotatingFileHandler(
+        LLM_DEBUG_LOG,
+        LLM_DEBUG_LOG_MAX_BYTES,
+        LLM_DEBUG_LOG_ROTATE_SECONDS,
+        LLM_DEBUG_LOG_BACKUPS
+    )
+    log_file.setFormatter(JSONFormatter())
+
+    logger.handlers = [DroppingQueueHandler(_queue)]
+
+    _listener = QueueListener(_queue, console, log_file)
+    _listener.start()
+    atexit.register(stop_gemini_logging)
+    return logger
+
+
+def stop_gemini_logging():
+    """
+    Flushes queued records and stops the writer thread.
+    """
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def log_llm_call(**fields):
+    """
+    One structured record per model call (backend, schema, latency,
+    token counts, outcome).
+    """
+    debug_logger.info("llm_call", extra={"fields": fields})
+
+
+def log_raw_output(text: str, always: bool = False, **fields):
+    """
+    Raw model output, sampled at LLM_RAW_OUTPUT_SAMPLE_RATE unless
+    always is set (failed / repaired parses).
+    """
+    if not always and random.random() >= LLM_RAW_OUTPUT_SAMPLE_RATE:
+        incr("llm.debug_log.raw_skipped")
+        return
+
+    debug_logger.info(
+        "llm_raw_output",
+        extra={"fields": {**fields, "chars": len(text), "text": text}}
+    )
+
+
+register_gauge("llm.debug_log.queue_depth", _queue.qsize)
@@ -1,28 +1,30 @@
 import json
-import logging
-from app.llm.gemini_client import gemini_generate
+from typing import AsyncIterator
+
+from app.jobs.jd_profile import top_keywords
+from app.llm.debug_log import configure_gemini_logging, log_raw_output
+from app.llm.gemini_client import (
+    gemini_generate,
+    gemini_generate_async,
+    gemini_generate_stream
+)
+from app.llm.prompt_builder import build_prompt
+from app.llm.schema import (
+    ATS_DEFAULTS,
+    JUDGMENT_DEFAULTS,
+    ATSAnalysis,
+    ATSJudgment,
+    repair_ats_output,
+    repair_judgment_output
+)
+from app.llm.stream_parser import IncrementalJSONParser, salvage_members
 from app.llm.prompts import (
-    ATS_ANALYSIS_PROMPT
+    ATS_ANALYSIS_PROMPT,
+    ATS_JUDGMENT_PROMPT
 )
+from app.metrics.registry import get_counter, incr, ratio, register_gauge
 
-logger = logging.getLogger("gemini")
-logger.setLevel(logging.INFO)
-
-if not logger.handlers:
-    formatter = logging.Formatter(
-        "%(asctime)s | GEMINI | %(message)s"
-    )
-
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
-
-    file_handler = logging.FileHandler(
-        "gemini_debug.log",
-        encoding="utf-8"
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+logger = configure_gemini_logging()
 
 
 def _safe_json_parse(text: str):
@@ -39,25 +41,298 @@ def _safe_json_parse(text: str):
         return json.loads(clean)
 
     except Exception as e:
-        logger.error(f"JSON Parsing Error. Raw text: {text}")
+        logger.error(f"JSON Parsing Error ({len(text)} chars of output)")
         raise ValueError(f"Invalid Gemini JSON output format.") from e
 
 
-def gemini_full_ats_analysis(resume_text: str, jd_text: str) -> dict:
+# response schema -> (local repair, blocks the old parser required)
+OUTPUT_REPAIRS = {
+    ATSAnalysis: (repair_ats_output, set(ATS_DEFAULTS) - {"formatting"}),
+    ATSJudgment: (repair_judgment_output, set(JUDGMENT_DEFAULTS)),
+}
+
+
+def _build_ats_prompt(
+    resume_text: str,
+    jd_text: str,
+    template: str = ATS_ANALYSIS_PROMPT,
+    jd_profile: dict | None = None,
+    extra: dict[str, str] | None = None
+) -> tuple[str, str]:
+    """
+    Returns (prompt, prefix): prefix is the JD-only start of the prompt
+    that the backend may serve from its context cache.
+    """
+    prompt, stats = build_prompt(
+        template,
+        resume_text,
+        jd_text,
+        jd_compact=jd_profile["prompt_text"] if jd_profile else None,
+        extra=extra
+    )
+    logger.info(
+        "Prompt tokens: resume %d -> %d, jd %d -> %d, total %d (prefix %d)",
+        stats["resume_tokens_before"],
+        stats["resume_tokens_after"],
+        stats["jd_tokens_before"],
+        stats["jd_tokens_after"],
+        stats["prompt_tokens"],
+        stats["prefix_tokens"],
+    )
+    return prompt, prompt[:stats["prefix_chars"]]
+
+
+def _load_ats_json(text: str) -> dict:
+    """
+    Strict parse first (schema-constrained output is plain JSON), then
+    the legacy first-{ to last-} slice, then whatever top-level blocks
+    survive in a truncated / malformed object.
+    """
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+
+    try:
+        data = _safe_json_parse(text)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+
+    data = salvage_members(text)
+    if not data:
+        raise ValueError("Invalid Gemini JSON output format.")
+
+    incr("llm.parse.salvaged")
+    return data
+
+
+def _missing_blocks(data: dict, required: set[str]) -> list[str]:
+    # blocks the model produced nothing usable for; their defaults would
+    # be made-up zero scores, not a repair
+    return sorted(
+        block for block in required
+        if data.get(block) is None
+        or (isinstance(ATS_DEFAULTS[block], dict) and not isinstance(data[block], dict))
+    )
+
+
+def _would_have_failed(text: str, required: set[str]) -> bool:
+    # the old path: slice-parse, then KeyError on any missing block
+    try:
+        data = json.loads(text[text.find("{"):text.rfind("}") + 1])
+    except ValueError:
+        return True
+    return not isinstance(data, dict) or not required <= data.keys()
+
+
+def _parse_ats_output(
+    text: str,
+    data: dict | None = None,
+    schema: type = ATSAnalysis
+) -> dict:
+    """
+    Validated, repaired ATS analysis. Missing fields inside a block are
+    repaired locally; a missing required block is an error (and a wasted
+    call), so synthesized scores are never stored or cached.
+    data: members already parsed by the streaming parser.
+    """
+    repair, required = OUTPUT_REPAIRS[schema]
+
+    incr("llm.parse.total")
+
+    if _would_have_failed(text, required):
+        incr("llm.parse.legacy_failures")
+
+    try:
+        if data is None:
+            data = _load_ats_json(text)
+
+        missing = _missing_blocks(data, required)
+        if missing:
+            incr("llm.parse.missing_blocks")
+            raise ValueError(f"Gemini output is missing blocks: {missing}")
+
+        analysis, repaired = repair(data)
+    except ValueError:
+        incr("llm.parse.failures")
+        incr("llm.wasted_calls")
+        log_raw_output(text, always=True, schema=schema.__name__, outcome="failed")
+        raise
+
+    if repaired:
+        logger.warning(f"Repaired ATS output blocks: {repaired}")
+        incr("llm.parse.repaired")
+
+    log_raw_output(
+        text,
+        always=bool(repaired),
+        schema=schema.__name__,
+        outcome="repaired" if repaired else "ok",
+        repaired=repaired
+    )
+    return analysis
+
+
+def gemini_full_ats_analysis(
+    resume_text: str,
+    jd_text: str,
+    jd_profile: dict | None = None
+) -> dict:
     """
     Performs full ATS analysis using Gemini. 
+    jd_profile: the JD's precomputed profile (app.jobs.jd_profile), so
+    the JD isn't compacted again for every resume.
+    """
+    logger.info("Calling Gemini ATS analysis...")
+
+    prompt, prefix = _build_ats_prompt(resume_text, jd_text, jd_profile=jd_profile)
+    text = gemini_generate(prompt, schema=ATSAnalysis, prefix=prefix)
+    return _parse_ats_output(text)
+
+
+async def gemini_full_ats_analysis_async(
+    resume_text: str,
+    jd_text: str,
+    jd_profile: dict | None = None
+) -> dict:
+    """
+    Async variant of gemini_full_ats_analysis, doesn't block the event loop.
     """
     logger.info("Calling Gemini ATS analysis...")
 
-    prompt = ATS_ANALYSIS_PROMPT \
-        .replace("<<<RESUME_TEXT>>>", resume_text[:5000]) \
-        .replace("<<<JD_TEXT>>>", jd_text[:5000])
+    prompt, prefix = _build_ats_prompt(resume_text, jd_text, jd_profile=jd_profile)
+    text = await gemini_generate_async(prompt, schema=ATSAnalysis, prefix=prefix)
+    return _parse_ats_output(text)
+
+
+async def _stream_analysis(
+    prompt: str,
+    prefix: str,
+    schema: type,
+    timeout: float | None = None
+) -> AsyncIterator[tuple[str, object]]:
+    parser = IncrementalJSONParser()
+    incremental = True
+
+    stream = gemini_generate_stream(prompt, schema=schema, prefix=prefix, timeout=timeout)
+    async for chunk in stream:
+        if not incremental:
+            parser.text += chunk
+            continue
+
+        try:
+            for block in parser.feed(chunk):
+                yield block
+        except ValueError:
+            # malformed member, keep collecting and parse the whole thing
+            incremental = False
+
+    if incremental and parser.done:
+        data = _parse_ats_output(parser.text, parser.members, schema)
+    else:
+        data = _parse_ats_output(parser.text, schema=schema)
+
+    yield "result", data
+
+
+async def gemini_full_ats_analysis_stream(
+    resume_text: str,
+    jd_text: str,
+    jd_profile: dict | None = None,
+    timeout: float | None = None
+) -> AsyncIterator[tuple[str, object]]:
+    """
+    Streaming variant of gemini_full_ats_analysis.
+    Yields (block name, value) as each top-level block of the JSON
+    completes, then ("result", full parsed dict). timeout bounds the
+    whole stream.
+    """
+    logger.info("Calling Gemini ATS analysis (stream)...")
+
+    prompt, prefix = _build_ats_prompt(resume_text, jd_text, jd_profile=jd_profile)
+    async for block in _stream_analysis(prompt, prefix, ATSAnalysis, timeout):
+        yield block
+
+
+def _skill_gaps(skills: dict) -> str:
+    lines = [
+        f"- Matched skills: {', '.join(skills.get('matched', [])) or 'none'}",
+        f"- Missing skills: {', '.join(skills.get('missing', [])) or 'none'}",
+    ]
+    if skills.get("weak"):
+        lines.append(f"- Mentioned only in passing: {', '.join(skills['weak'])}")
+    return "\n".join(lines)
+
+
+def _build_judgment_prompt(
+    resume_text: str,
+    jd_text: str,
+    skills: dict,
+    jd_profile: dict | None = None
+) -> tuple[str, str]:
+    if jd_profile:
+        keywords = top_keywords(jd_profile)
+    else:
+        # the local skills block lists every JD skill, in JD order
+        keywords = skills.get("matched", []) + skills.get("weak", []) + skills.get("missing", [])
+
+    return _build_ats_prompt(
+        resume_text,
+        jd_text,
+        ATS_JUDGMENT_PROMPT,
+        jd_profile,
+        extra={
+            "<<<JD_KEYWORDS>>>": ", ".join(keywords) or "none",
+            "<<<SKILL_GAPS>>>": _skill_gaps(skills),
+        }
+    )
+
+
+async def gemini_ats_judgment_async(
+    resume_text: str,
+    jd_text: str,
+    skills: dict,
+    jd_profile: dict | None = None
+) -> dict:
+    """
+    Hybrid mode: only the judgment blocks (experience, suggestions).
+    skills is the locally computed skills block, given to the model as
+    context instead of being asked for.
+    """
+    logger.info("Calling Gemini ATS judgment...")
+
+    prompt, prefix = _build_judgment_prompt(resume_text, jd_text, skills, jd_profile)
+    text = await gemini_generate_async(prompt, schema=ATSJudgment, prefix=prefix)
+    return _parse_ats_output(text, schema=ATSJudgment)
+
+
+async def gemini_ats_judgment_stream(
+    resume_text: str,
+    jd_text: str,
+    skills: dict,
+    jd_profile: dict | None = None,
+    timeout: float | None = None
+) -> AsyncIterator[tuple[str, object]]:
+    """
+    Streaming variant of gemini_ats_judgment_async.
+    """
+    logger.info("Calling Gemini ATS judgment (stream)...")
+
+    prompt, prefix = _build_judgment_prompt(resume_text, jd_text, skills, jd_profile)
+    async for block in _stream_analysis(prompt, prefix, ATSJudgment, timeout):
+        yield block
+
 
-    text = gemini_generate(prompt)
+def _parse_rate(name: str) -> float:
+    return ratio(get_counter(name), get_counter("llm.parse.total"))
 
-    logger.info("===== GEMINI RAW OUTPUT START =====")
-    logger.info(text)
-    logger.info("===== GEMINI RAW OUTPUT END =====")
 
-    data = _safe_json_parse(text)
-    return data
\ No newline at end of file
+# legacy_failure_rate: what the old slice-and-KeyError path would have
+# failed on for the same outputs, for a before / after comparison
+register_gauge("llm.parse.failure_rate", lambda: _parse_rate("llm.parse.failures"))
+register_gauge("llm.parse.legacy_failure_rate", lambda: _parse_rate("llm.parse.legacy_failures"))
+register_gauge("llm.parse.repair_rate", lambda: _parse_rate("llm.parse.repaired"))
@@ -1,38 +1,148 @@
+import asyncio
 import os
-from google import genai
-from google.genai import types
-from dotenv import load_dotenv 
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-load_dotenv()
+from app.llm.backends import get_backend
+from app.llm.resilience import (
+    call_with_resilience,
+    call_with_resilience_sync,
+    is_transient,
+    llm_breaker
+)
+from app.metrics.registry import incr, observe, register_gauge
+from app.utils.deadline import remaining
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    raise RuntimeError("GEMINI_API_KEY not set in environment")
+# caps in-flight LLM calls per worker; the rest wait on the semaphore
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
 
+_llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+_queued = 0
+_in_flight = 0
 
-client = genai.Client(api_key=API_KEY)
+register_gauge("llm.queue_depth", lambda: _queued)
+register_gauge("llm.in_flight", lambda: _in_flight)
 
-MODEL_NAME = "gemini-2.5-flash"
 
-
-def gemini_generate(prompt: str) -> str:
+def gemini_generate(
+    prompt: str,
+    schema: type | None = None,
+    prefix: str | None = None
+) -> str:
     """
     Single safe Gemini call.
     - Low temperature
     - Deterministic output
     - Always returns text or raises
+    - Retried on transient errors, bounded by the request deadline
+    """
+
+    def once() -> str:
+        return get_backend().generate(
+            prompt,
+            timeout=remaining(),
+            schema=schema,
+            prefix=prefix
+        )
+
+    return call_with_resilience_sync(once)
+
+
+@asynccontextmanager
+async def _llm_slot(timeout: float | None = None):
+    """
+    Waits (at most timeout seconds) for one of the LLM_MAX_CONCURRENCY
+    slots and tracks queue depth, wait time, in-flight count and call
+    duration.
+    """
+    global _queued, _in_flight
+
+    queued_at = time.perf_counter()
+    _queued += 1
+    try:
+        await asyncio.wait_for(_llm_slots.acquire(), timeout=timeout)
+    finally:
+        _queued -= 1
+
+    observe("llm.queue_wait_seconds", time.perf_counter() - queued_at)
+
+    _in_flight += 1
+    started = time.perf_counter()
+    finished = True
+    try:
+        yield
+    except (asyncio.CancelledError, GeneratorExit):
+        # hedge losers and abandoned calls never finished: their time
+        # would skew the latencies hedge_delay() is computed from
+        finished = False
+        raise
+    except Exception:
+        incr("llm.errors")
+        raise
+    finally:
+        _in_flight -= 1
+        _llm_slots.release()
+        if finished:
+            observe("llm.call_seconds", time.perf_counter() - started)
+
+    incr("llm.calls")
+
+
+async def gemini_generate_async(
+    prompt: str,
+    schema: type | None = None,
+    prefix: str | None = None
+) -> str:
+    """
+    Non-blocking gemini_generate on the backend's async call.
+    At most LLM_MAX_CONCURRENCY calls run at once per worker. Slow calls
+    are hedged and transient failures retried (see app.llm.resilience).
+    prefix: leading part of prompt shared across calls, which the
+    backend may serve from a provider-side context cache.
+    """
+    async def once() -> str:
+        async with _llm_slot():
+            return await get_backend().generate_async(prompt, schema, prefix)
+
+    return await call_with_resilience(once)
+
+
+async def gemini_generate_stream(
+    prompt: str,
+    schema: type | None = None,
+    prefix: str | None = None,
+    timeout: float | None = None
+) -> AsyncIterator[str]:
+    """
+    Streams the response text chunk by chunk as the model produces it.
+    Holds an LLM slot for the whole stream. Goes through the circuit
+    breaker but is neither hedged nor retried: chunks may already have
+    reached the client.
+    timeout: budget for the whole stream, slot wait included. Running
+    out raises asyncio.TimeoutError and counts against the breaker.
     """
+    deadline = None if timeout is None else time.monotonic() + timeout
 
-    response = client.models.generate_content(
-        model=MODEL_NAME,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            temperature=0.1,
-            response_mime_type="application/json"
-        ),
-    )
+    def left() -> float | None:
+        return None if deadline is None else max(deadline - time.monotonic(), 0)
 
-    if not response or not response.text:
-        raise RuntimeError("Empty response from Gemini")
+    llm_breaker.before_call()
+    try:
+        async with _llm_slot(left()):
+            chunks = get_backend().generate_stream(prompt, schema, prefix)
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=left())
+                except StopAsyncIteration:
+                    break
+                yield chunk
+    except Exception as e:
+        llm_breaker.record(not is_transient(e))
+        raise
+    except BaseException:
+        # cancelled or closed early by the consumer
+        llm_breaker.abandon()
+        raise
 
-    return response.text.strip()
+    llm_breaker.record(True)
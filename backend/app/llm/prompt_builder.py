@@ -0,0 +1,268 @@
+import os
+import re
+
+from app.metrics.registry import observe
+
+# input token budgets for the two documents in the ATS prompt
+PROMPT_RESUME_TOKENS = int(os.getenv("PROMPT_RESUME_TOKENS", 1500))
+PROMPT_JD_TOKENS = int(os.getenv("PROMPT_JD_TOKENS", 900))
+
+# Gemini averages ~4 characters per token on English prose; close enough
+# for budgeting without a network round trip to count_tokens
+CHARS_PER_TOKEN = 4
+
+# heading -> (section, priority); lower priority survives a tight budget
+RESUME_SECTIONS = {
+    "skills": ("skills", 0),
+    "technical skills": ("skills", 0),
+    "core competencies": ("skills", 0),
+    "experience": ("experience", 1),
+    "work experience": ("experience", 1),
+    "professional experience": ("experience", 1),
+    "employment history": ("experience", 1),
+    "work history": ("experience", 1),
+    "projects": ("projects", 2),
+    "summary": ("summary", 3),
+    "professional summary": ("summary", 3),
+    "profile": ("summary", 3),
+    "objective": ("summary", 3),
+    "certifications": ("certifications", 4),
+    "education": ("education", 5),
+}
+
+JD_SECTIONS = {
+    "requirements": ("requirements", 0),
+    "qualifications": ("requirements", 0),
+    "minimum qualifications": ("requirements", 0),
+    "required skills": ("requirements", 0),
+    "what you bring": ("requirements", 0),
+    "responsibilities": ("responsibilities", 1),
+    "what you will do": ("responsibilities", 1),
+    "what you'll do": ("responsibilities", 1),
+    "the role": ("responsibilities", 1),
+    "preferred qualifications": ("preferred", 2),
+    "nice to have": ("preferred", 2),
+    "bonus points": ("preferred", 2),
+    "about us": ("company", 4),
+    "about the company": ("company", 4),
+    "who we are": ("company", 4),
+    "benefits": ("benefits", 5),
+    "perks": ("benefits", 5),
+    "what we offer": ("benefits", 5),
+}
+
+# text before the first heading: name / headline on a resume, intro on a JD
+PREAMBLE_PRIORITY = 3
+
+CONTACT_PATTERNS = re.compile(
+    # email
+    r"[\w.+-]+@[\w-]+\.[\w.-]+"
+    # urls / profile links
+    r"|(?:https?://|www\.)\S+"
+    r"|\b(?:linkedin|github)\.com/\S*"
+    # phone numbers, international and NANP style
+    r"|\+\d{1,3}[\s.-]?\d{4,5}[\s.-]?\d{5,6}\b"
+    r"|\+?\b(?:\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b",
+    re.IGNORECASE,
+)
+
+# equal-opportunity / legal / application boilerplate in job postings
+JD_BOILERPLATE = re.compile(
+    r"equal (?:employment )?opportunity"
+    r"|without regard to"
+    r"|race, colou?r, religion"
+    r"|sexual orientation|gender identity|veteran status"
+    r"|reasonable accommodation"
+    r"|e-verify|background check"
+    r"|privacy (?:notice|policy)"
+    r"|apply now|click apply|to apply,"
+    r"|recruitment agencies|unsolicited resumes",
+    re.IGNORECASE,
+)
+
+LINE_SPLIT = re.compile(r"(?<=[.!?])\s+|\s+(?=[-•]\s)")
+
+# <<<JD_...>>> placeholders depend on the JD only; the first other one
+# starts the per-resume part of the prompt
+PER_RESUME_PLACEHOLDER = re.compile(r"<<<(?!JD_)\w+>>>")
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _lines(text: str) -> list[str]:
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    lines = [line for line in lines if line]
+
+    # flattened text (cleaned_text is one line): fall back to
+    # sentence / bullet boundaries
+    if len(lines) <= 1 and lines:
+        lines = [part.strip() for part in LINE_SPLIT.split(lines[0]) if part.strip()]
+
+    return lines
+
+
+def _heading(line: str, headings: dict) -> tuple[str, int] | None:
+    key = line.lower().rstrip(":").strip()
+    return headings.get(key)
+
+
+def _sections(lines: list[str], headings: dict) -> list[dict]:
+    """
+    Groups lines under the heading that precedes them.
+    Each section: {"name", "priority", "heading", "lines", "order"}.
+    """
+    sections = [{
+        "name": "preamble",
+        "priority": PREAMBLE_PRIORITY,
+        "heading": None,
+        "lines": [],
+        "order": 0,
+    }]
+
+    for line in lines:
+        match = _heading(line, headings)
+        if match:
+            name, priority = match
+            sections.append({
+                "name": name,
+                "priority": priority,
+                "heading": line,
+                "lines": [],
+                "order": len(sections),
+            })
+        else:
+            sections[-1]["lines"].append(line)
+
+    return [s for s in sections if s["lines"]]
+
+
+def _clean_lines(lines: list[str], drop: re.Pattern | None = None) -> list[str]:
+    seen = set()
+    kept = []
+
+    for line in lines:
+        if drop and drop.search(line):
+            continue
+
+        line = " ".join(CONTACT_PATTERNS.sub(" ", line).split()).strip(" |,;-")
+        if not line:
+            continue
+
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+
+    return kept
+
+
+def _fit(sections: list[dict], budget: int) -> str:
+    """
+    Fills the token budget section by section in priority order, keeping
+    each section's leading lines, then restores document order.
+    """
+    remaining = budget
+    chosen = []
+
+    for section in sorted(sections, key=lambda s: (s["priority"], s["order"])):
+        if remaining <= 0:
+            break
+
+        block = [section["heading"]] if section["heading"] else []
+        cost = estimate_tokens(section["heading"] or "")
+
+        for line in section["lines"]:
+            line_cost = estimate_tokens(line) + 1
+            if cost + line_cost > remaining:
+                break
+            block.append(line)
+            cost += line_cost
+
+        if len(block) > (1 if section["heading"] else 0):
+            remaining -= cost
+            chosen.append((section["order"], block))
+
+    chosen.sort()
+    return "\n".join(line for _, block in chosen for line in block)
+
+
+def compact_resume(text: str, budget: int = PROMPT_RESUME_TOKENS) -> str:
+    sections = _sections(_lines(text), RESUME_SECTIONS)
+    for section in sections:
+        section["lines"] = _clean_lines(section["lines"])
+    return _fit(sections, budget)
+
+
+def compact_jd(text: str, budget: int = PROMPT_JD_TOKENS) -> str:
+    sections = _sections(_lines(text), JD_SECTIONS)
+    for section in sections:
+        section["lines"] = _clean_lines(section["lines"], drop=JD_BOILERPLATE)
+    return _fit(sections, budget)
+
+
+def jd_requirements(text: str) -> list[str]:
+    """
+    Lines under the JD's requirements / qualifications headings.
+    """
+    return [
+        line
+        for section in _sections(_lines(text), JD_SECTIONS)
+        if section["name"] == "requirements"
+        for line in _clean_lines(section["lines"], drop=JD_BOILERPLATE)
+    ]
+
+
+def _fill(text: str, values: dict[str, str]) -> str:
+    for placeholder, value in values.items():
+        text = text.replace(placeholder, value)
+    return text
+
+
+def build_prompt(
+    template: str,
+    resume_text: str,
+    jd_text: str,
+    resume_budget: int = PROMPT_RESUME_TOKENS,
+    jd_budget: int = PROMPT_JD_TOKENS,
+    jd_compact: str | None = None,
+    extra: dict[str, str] | None = None
+) -> tuple[str, dict]:
+    """
+    Fills the ATS template with section-ranked, de-duplicated resume and
+    JD text trimmed to their token budgets, and any extra placeholders.
+    jd_compact: the JD already compacted (see app.jobs.jd_profile).
+
+    Returns (prompt, token stats). prompt[:stats["prefix_chars"]] is the
+    part shared by every resume scored against this JD.
+    """
+    resume = compact_resume(resume_text, resume_budget)
+    jd = jd_compact if jd_compact is not None else compact_jd(jd_text, jd_budget)
+
+    values = {"<<<RESUME_TEXT>>>": resume, "<<<JD_TEXT>>>": jd, **(extra or {})}
+    split = PER_RESUME_PLACEHOLDER.search(template)
+    split_at = split.start() if split else len(template)
+
+    prefix = _fill(template[:split_at], values)
+    prompt = prefix + _fill(template[split_at:], values)
+
+    stats = {
+        "resume_tokens_before": estimate_tokens(resume_text),
+        "resume_tokens_after": estimate_tokens(resume),
+        "jd_tokens_before": estimate_tokens(jd_text),
+        "jd_tokens_after": estimate_tokens(jd),
+        "prompt_tokens": estimate_tokens(prompt),
+        "prefix_chars": len(prefix),
+        "prefix_tokens": estimate_tokens(prefix),
+    }
+
+    observe("llm.prompt_tokens", stats["prompt_tokens"])
+    observe(
+        "llm.prompt_tokens_saved",
+        stats["resume_tokens_before"] - stats["resume_tokens_after"]
+        + stats["jd_tokens_before"] - stats["jd_tokens_after"]
+    )
+
+    return prompt, stats
@@ -1,3 +1,17 @@
+import os
+
+# bump whenever a prompt, its response schema or the prompt builder
+# changes what the model sees; stored analyses are keyed by it
+PROMPT_VERSION = "5"
+
+# hybrid: skills, keywords, sections and formatting are computed locally
+# and the model is only asked for ATS_JUDGMENT_PROMPT; off sends the
+# full ATS_ANALYSIS_PROMPT
+LLM_HYBRID = os.getenv("LLM_HYBRID", "true").lower() == "true"
+
+# everything before the first per-resume placeholder is the same for
+# every resume scored against one JD and can be served from the
+# provider's context cache: JD first, resume-specific parts last
 ATS_ANALYSIS_PROMPT = """
 You are an ATS engine.
 
@@ -14,12 +28,6 @@ All numbers should be on the scale of 0-100
 
 Also give suggestions if resume is lacking numerical values
 
-Resume:
-<<<RESUME_TEXT>>>
-
-Job Description:
-<<<JD_TEXT>>>
-
 Return ONLY valid JSON in this format:
 {
   "skills": {
@@ -53,4 +61,41 @@ Return ONLY valid JSON in this format:
 END_OF_JSON
 
 The JSON MUST end immediately before the token END_OF_JSON.
+
+Job Description:
+<<<JD_TEXT>>>
+
+Resume:
+<<<RESUME_TEXT>>>
+"""
+
+
+ATS_JUDGMENT_PROMPT = """
+You are an experienced technical recruiter reviewing a resume against a job description.
+
+Skills, keywords, sections and formatting are checked separately. Judge only:
+- how relevant the candidate's experience and projects are to this job (0-100)
+- concrete improvements to the experience bullets
+- the most important overall suggestions (numbers / impact, missing evidence for required skills)
+
+Return ONLY a valid JSON object. No markdown, no explanations, in this format:
+{
+  "experience": {
+    "relevance_score": number,
+    "experience_suggestion": []
+  },
+  "suggestions": []
+}
+
+Job Description:
+<<<JD_TEXT>>>
+
+Skills the job weights most:
+<<<JD_KEYWORDS>>>
+
+Skill check for this resume:
+<<<SKILL_GAPS>>>
+
+Resume:
+<<<RESUME_TEXT>>>
 """
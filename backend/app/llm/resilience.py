@@ -0,0 +1,286 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from google.genai import errors as genai_errors
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential
+)
+
+from app.metrics.registry import get_counter, incr, percentile, ratio, register_gauge
+from app.utils.deadline import remaining
+
+T = TypeVar("T")
+
+# retries (attempts include the first call)
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", 3))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", 0.5))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", 4))
+
+# hedging: fire a second identical request once the first has run past
+# the observed p95 call latency
+LLM_HEDGING = os.getenv("LLM_HEDGING", "true").lower() == "true"
+LLM_HEDGE_DEFAULT_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_SECONDS", 8))
+LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", 1))
+LLM_HEDGE_MIN_SAMPLES = 20
+
+# circuit breaker over a sliding window of recent calls
+BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", 50))
+BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", 10))
+BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", 0.5))
+BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", 30))
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class DeadlineExceededError(asyncio.TimeoutError):
+    pass
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Worth retrying: rate limits, upstream 5xx, timeouts and dropped
+    connections. Bad requests / auth errors are not.
+    """
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code == 429 or exc.code >= 500
+    return isinstance(
+        exc,
+        (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError, ConnectionError)
+    )
+
+
+class CircuitBreaker:
+    """
+    Opens when at least BREAKER_FAILURE_RATE of the last BREAKER_WINDOW
+    calls failed (once BREAKER_MIN_CALLS were seen), rejects calls for
+    BREAKER_OPEN_SECONDS, then lets a single probe through (half open)
+    and closes again if it succeeds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        open_seconds: float = BREAKER_OPEN_SECONDS
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+
+        self._results = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+        register_gauge(f"{name}.breaker.state", lambda: STATE_VALUES[self.state])
+        register_gauge(f"{name}.breaker.failure_rate", self._failure_rate)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+                self._probing = False
+            return self._state
+
+    def _failure_rate(self) -> float:
+        results = list(self._results)
+        return ratio(results.count(False), len(results))
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError when the call should not be attempted.
+        """
+        state = self.state
+        with self._lock:
+            if state == OPEN or (state == HALF_OPEN and self._probing):
+                incr(f"{self.name}.breaker.rejected")
+                raise CircuitOpenError(f"{self.name} circuit breaker is open")
+            if state == HALF_OPEN:
+                self._probing = True
+
+    def abandon(self):
+        """
+        The call was cancelled before it could tell us anything; let the
+        next one probe instead.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record(self, success: bool):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._state = CLOSED
+                    self._results.clear()
+                else:
+                    self._trip()
+                return
+
+            self._results.append(success)
+            if (
+                self._state == CLOSED
+                and len(self._results) >= self.min_calls
+                and self._results.count(False) / len(self._results) >= self.failure_rate
+            ):
+                self._trip()
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        incr(f"{self.name}.breaker.opened")
+
+
+llm_breaker = CircuitBreaker("llm")
+
+
+def hedge_delay() -> float:
+    """
+    p95 of recent call latencies, or LLM_HEDGE_DEFAULT_SECONDS until
+    there are enough samples.
+    """
+    p95 = percentile("llm.call_seconds", 0.95)
+    if p95 is None or get_counter("llm.calls") < LLM_HEDGE_MIN_SAMPLES:
+        return LLM_HEDGE_DEFAULT_SECONDS
+    return max(p95, LLM_HEDGE_MIN_SECONDS)
+
+
+async def _hedged(call: Callable[[], Awaitable[T]]) -> T:
+    """
+    Runs call(); if it hasn't finished after hedge_delay(), starts a
+    second one and returns whichever succeeds first. The loser is
+    cancelled. Fails only when both attempts fail.
+    """
+    primary = asyncio.create_task(call())
+    hedge = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay())
+        if done:
+            return primary.result()
+
+        incr("llm.hedge.fired")
+        hedge = asyncio.create_task(call())
+        pending = {primary, hedge}
+        error = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    incr("llm.hedge.wins" if task is hedge else "llm.hedge.primary_wins")
+                    return task.result()
+                error = task.exception()
+
+        raise error
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+def _deadline_stop(retry_state) -> bool:
+    left = remaining()
+    return left is not None and left <= LLM_RETRY_BASE_SECONDS
+
+
+async def call_with_resilience(call: Callable[[], Awaitable[T]]) -> T:
+    """
+    One logical LLM call: circuit breaker check, bounded retries with
+    jittered exponential backoff on transient errors, hedging on each
+    attempt, all inside the current request deadline.
+    """
+    retrying = AsyncRetrying(
+        stop=stop_after_attempt(LLM_MAX_ATTEMPTS) | _deadline_stop,
+        wait=wait_random_exponential(
+            multiplier=LLM_RETRY_BASE_SECONDS,
+            max=LLM_RETRY_MAX_SECONDS
+        ),
+        retry=retry_if_exception(is_transient),
+        reraise=True,
+    )
+
+    async for attempt in retrying:
+        with attempt:
+            if attempt.retry_state.attempt_number > 1:
+                incr("llm.retries")
+
+            # before the breaker check: a half-open breaker hands out its
+            # single probe there, and an expired request would never use it
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceededError("request deadline exceeded before LLM call")
+
+            llm_breaker.before_call()
+
+            try:
+                run = _hedged(call) if LLM_HEDGING else call()
+                result = await asyncio.wait_for(run, timeout=left)
+            except asyncio.CancelledError:
+                llm_breaker.abandon()
+                raise
+            except Exception as e:
+                # only upstream trouble counts against the breaker; a
+                # rejected prompt means the service itself is healthy
+                llm_breaker.record(not is_transient(e))
+                raise
+
+            llm_breaker.record(True)
+            return result
+
+
+def call_with_resilience_sync(call: Callable[[], T]) -> T:
+    """
+    Blocking counterpart for gemini_generate: breaker and retries, no
+    hedging (the per-attempt timeout goes through the SDK's http options).
+    """
+    retrying = Retrying(
+        stop=stop_after_attempt(LLM_MAX_ATTEMPTS) | _deadline_stop,
+        wait=wait_random_exponential(
+            multiplier=LLM_RETRY_BASE_SECONDS,
+            max=LLM_RETRY_MAX_SECONDS
+        ),
+        retry=retry_if_exception(is_transient),
+        reraise=True,
+    )
+
+    for attempt in retrying:
+        with attempt:
+            if attempt.retry_state.attempt_number > 1:
+                incr("llm.retries")
+
+            llm_breaker.before_call()
+            try:
+                result = call()
+            except Exception as e:
+                llm_breaker.record(not is_transient(e))
+                raise
+
+            llm_breaker.record(True)
+            return result
+
+
+def _hedge_win_rate() -> float:
+    return ratio(get_counter("llm.hedge.wins"), get_counter("llm.hedge.fired"))
+
+
+register_gauge("llm.hedge.win_rate", _hedge_win_rate)
+register_gauge("llm.hedge.delay_seconds", hedge_delay)
@@ -1,5 +1,7 @@
 from typing import List, TypedDict
 
+from pydantic import BaseModel, field_validator
+
 
 class SkillMatchResult(TypedDict):
     match_percent: float
@@ -24,3 +26,168 @@ class SectionDetectionResult(TypedDict):
 
 class SuggestionResult(TypedDict):
     suggestions: List[str]
+
+
+def _number(value) -> float:
+    # "85", "85%", None, out-of-range -> 0..100
+    if isinstance(value, str):
+        value = value.strip().rstrip("%")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, min(value, 100.0))
+
+
+def _strings(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, (str, dict)):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("skill") or item.get("text")
+        if item is not None and str(item).strip():
+            items.append(str(item).strip())
+    return items
+
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "yes", "present", "1")
+    return bool(value)
+
+
+class ATSSkills(BaseModel):
+    match_percent: float
+    matched: List[str]
+    missing: List[str]
+    weak: List[str]
+
+    _number = field_validator("match_percent", mode="before")(_number)
+    _strings = field_validator("matched", "missing", "weak", mode="before")(_strings)
+
+
+class ATSExperience(BaseModel):
+    relevance_score: float
+    experience_suggestion: List[str]
+
+    _number = field_validator("relevance_score", mode="before")(_number)
+    _strings = field_validator("experience_suggestion", mode="before")(_strings)
+
+
+class ATSKeywords(BaseModel):
+    matched: List[str]
+    weak: List[str]
+    missing: List[str]
+
+    _strings = field_validator("matched", "weak", "missing", mode="before")(_strings)
+
+
+class ATSFormatting(BaseModel):
+    score: float
+    feedback: List[str]
+
+    _number = field_validator("score", mode="before")(_number)
+    _strings = field_validator("feedback", mode="before")(_strings)
+
+
+class ATSSections(BaseModel):
+    skills: bool
+    experience: bool
+    projects: bool
+    education: bool
+    certifications: bool
+
+    _flag = field_validator("*", mode="before")(_flag)
+
+
+# Response schemas: sent to Gemini as response_schema (every field
+# required) and used to validate and coerce what comes back. No
+# docstrings on these, the SDK forwards them to the model as
+# descriptions.
+
+class ATSAnalysis(BaseModel):
+    # shape of ATS_ANALYSIS_PROMPT's output
+    skills: ATSSkills
+    experience: ATSExperience
+    keywords: ATSKeywords
+    formatting: ATSFormatting
+    sections: ATSSections
+    suggestions: List[str]
+
+    _strings = field_validator("suggestions", mode="before")(_strings)
+
+
+class ATSJudgment(BaseModel):
+    # shape of ATS_JUDGMENT_PROMPT's output
+    experience: ATSExperience
+    suggestions: List[str]
+
+    _strings = field_validator("suggestions", mode="before")(_strings)
+
+
+# what a missing block / field is repaired to
+ATS_DEFAULTS = {
+    "skills": {"match_percent": 0, "matched": [], "missing": [], "weak": []},
+    "experience": {"relevance_score": 0, "experience_suggestion": []},
+    "keywords": {"matched": [], "weak": [], "missing": []},
+    "formatting": {"score": 0, "feedback": []},
+    "sections": {
+        "skills": False,
+        "experience": False,
+        "projects": False,
+        "education": False,
+        "certifications": False,
+    },
+    "suggestions": [],
+}
+
+
+JUDGMENT_DEFAULTS = {
+    block: ATS_DEFAULTS[block] for block in ATSJudgment.model_fields
+}
+
+
+def _repair(data: dict, defaults: dict, model: type[BaseModel]) -> tuple[dict, list[str]]:
+    merged = {}
+    repaired = []
+
+    for block, default in defaults.items():
+        value = data.get(block)
+
+        if isinstance(default, dict):
+            if not isinstance(value, dict):
+                repaired.append(block)
+                value = {}
+            elif not default.keys() <= value.keys():
+                repaired.append(block)
+            value = {**default, **value}
+        elif value is None:
+            repaired.append(block)
+            value = default
+
+        merged[block] = value
+
+    return model.model_validate(merged).model_dump(), repaired
+
+
+def repair_ats_output(data: dict) -> tuple[dict, list[str]]:
+    """
+    Fills missing blocks / fields with ATS_DEFAULTS and coerces the rest
+    through ATSAnalysis. Never calls the model again. Callers decide
+    whether a whole missing block is acceptable.
+    Returns (valid analysis dict, names of the blocks that were repaired).
+    """
+    return _repair(data, ATS_DEFAULTS, ATSAnalysis)
+
+
+def repair_judgment_output(data: dict) -> tuple[dict, list[str]]:
+    """
+    repair_ats_output for ATS_JUDGMENT_PROMPT's output.
+    """
+    return _repair(data, JUDGMENT_DEFAULTS, ATSJudgment)
@@ -0,0 +1,113 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Consumes a JSON object in arbitrary text chunks and reports each
+    top-level member as soon as its value is complete.
+
+    Text before the first "{" (e.g. a stray ```json fence) is ignored,
+    like _safe_json_parse does for full responses.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.members: dict = {}
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        self.text += chunk
+        completed = []
+
+        while self._pos < len(self.text) and not self._done:
+            ch = self.text[self._pos]
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None:
+                        self._key = json.loads(
+                            self.text[self._key_start:self._pos + 1]
+                        )
+                self._pos += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = self._pos
+                elif self._value_start is None:
+                    self._value_start = self._pos
+            elif ch == ":" and self._depth == 1:
+                # key / value separator, the value starts after it
+                pass
+            elif ch in "{[":
+                if self._value_start is None:
+                    self._value_start = self._pos
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._close_member(self._pos))
+                    self._done = True
+            elif ch == "," and self._depth == 1:
+                completed.extend(self._close_member(self._pos))
+            elif not ch.isspace() and self._value_start is None and self._key is not None:
+                # start of a bare literal: number, true, false, null
+                self._value_start = self._pos
+
+            self._pos += 1
+
+        return completed
+
+    def _close_member(self, end: int) -> list[tuple[str, object]]:
+        key, start = self._key, self._value_start
+        self._key = None
+        self._value_start = None
+
+        if key is None or start is None:
+            return []
+
+        value = json.loads(self.text[start:end])
+        self.members[key] = value
+        return [(key, value)]
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+
+def salvage_members(text: str) -> dict:
+    """
+    Every top-level member of a possibly malformed or truncated JSON
+    object that parses on its own. Broken members are skipped.
+    """
+    parser = IncrementalJSONParser()
+    chunk = text
+
+    while True:
+        try:
+            parser.feed(chunk)
+            return parser.members
+        except ValueError:
+            # the bad member is already dropped, resume after it
+            chunk = ""
@@ -8,9 +8,16 @@ from app.auth.router import router as auth_router
 from app.resume.routers import router as resume_router
 from app.jobs.router import router as jobs_router
 from app.scoring.router import router as scoring_router
+from app.metrics.router import router as metrics_router
 
 import asyncio
 from app.maintenance.scheduler import cleanup_loop
+from app.cache.redis import close_async_redis, init_async_redis
+from app.cache.invalidation import start_invalidation_listener, stop_invalidation_listener
+from app.cache.score_cache import start_namespace_heartbeat, stop_namespace_heartbeat
+from app.llm.debug_log import stop_gemini_logging
+from app.nlp.model import NLP_WARMUP, warmup
+from app.utils.deadline import DeadlineMiddleware
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -32,11 +39,14 @@ def create_app() -> FastAPI:
     allow_headers=["*"],
     )
 
+    app.add_middleware(DeadlineMiddleware)
+
     # Routers
     app.include_router(auth_router)
     app.include_router(resume_router)
     app.include_router(jobs_router)
     app.include_router(scoring_router)
+    app.include_router(metrics_router)
 
     return app
 
@@ -50,9 +60,32 @@ async def init_tables():
         await conn.run_sync(Base.metadata.create_all)
     print("Tables check/creation complete.")
 
+    await init_async_redis()
+    start_invalidation_listener()
+
+    # keeps this worker's score cache namespace live and purges the ones
+    # no worker serves any more (older prompt / model)
+    start_namespace_heartbeat()
+
     asyncio.create_task(cleanup_loop())
     print("Cleanup scheduler started.")
-    
+
+    if NLP_WARMUP:
+        # load spaCy in the background so /health answers immediately
+        asyncio.create_task(asyncio.to_thread(warmup))
+        print("NLP warmup started.")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_invalidation_listener()
+    await stop_namespace_heartbeat()
+    await close_async_redis()
+
+    # write out LLM log records still queued for the writer thread
+    stop_gemini_logging()
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
@@ -0,0 +1,77 @@
+import threading
+from collections import defaultdict, deque
+from typing import Callable
+
+# recent observations kept per histogram for percentiles
+WINDOW_SIZE = 1024
+
+_lock = threading.Lock()
+_counters: dict[str, float] = defaultdict(float)
+_gauges: dict[str, Callable[[], float]] = {}
+_histograms: dict[str, deque] = defaultdict(lambda: deque(maxlen=WINDOW_SIZE))
+
+
+def incr(name: str, value: float = 1):
+    with _lock:
+        _counters[name] += value
+
+
+def get_counter(name: str) -> float:
+    return _counters.get(name, 0)
+
+
+def observe(name: str, value: float):
+    with _lock:
+        _histograms[name].append(value)
+
+
+def _pick(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def percentile(name: str, q: float) -> float | None:
+    with _lock:
+        values = sorted(_histograms.get(name, ()))
+    return _pick(values, q) if values else None
+
+
+def _summary(values: list[float]) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "avg": round(sum(values) / len(values), 4),
+        "p50": _pick(values, 0.50),
+        "p95": _pick(values, 0.95),
+        "p99": _pick(values, 0.99),
+        "max": values[-1],
+    }
+
+
+def register_gauge(name: str, fn: Callable[[], float]):
+    """
+    fn is evaluated lazily whenever a snapshot is taken.
+    """
+    _gauges[name] = fn
+
+
+def ratio(numerator: float, denominator: float) -> float:
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+def snapshot() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        histograms = {
+            name: _summary(list(values))
+            for name, values in _histograms.items()
+            if values
+        }
+
+    gauges = {}
+    for name, fn in _gauges.items():
+        try:
+            gauges[name] = fn()
+        except Exception:
+            gauges[name] = None
+
+    return {"counters": counters, "gauges": gauges, "histograms": histograms}
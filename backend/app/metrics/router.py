@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from app.metrics.registry import snapshot
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("")
+async def metrics():
+    return snapshot()
@@ -0,0 +1,65 @@
+from collections import deque
+from typing import Iterator
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring automaton. One pass over the text reports
+    every (possibly overlapping) occurrence of every pattern.
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = patterns
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+
+        for idx, pattern in enumerate(patterns):
+            self._add(pattern, idx)
+
+        self._build_links()
+
+    def _add(self, pattern: str, idx: int):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state].append(idx)
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+
+                self._fail[nxt] = fail
+                self._out[nxt] = self._out[nxt] + self._out[fail]
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Yields (start, pattern_index) in order of match end position.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        lengths = [len(p) for p in self.patterns]
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for idx in out[state]:
+                yield i - lengths[idx] + 1, idx
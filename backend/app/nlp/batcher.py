@@ -0,0 +1,94 @@
+import asyncio
+import os
+
+from app.nlp.candidate_extractor import (
+    MODE_GAZETTEER,
+    extract_candidates,
+    extract_candidates_batch,
+    resolve_mode
+)
+
+NLP_BATCH_WINDOW_MS = int(os.getenv("NLP_BATCH_WINDOW_MS", 20))
+NLP_MAX_BATCH = int(os.getenv("NLP_MAX_BATCH", 64))
+
+
+class CandidateBatcher:
+    """
+    Collects extraction requests arriving within a short window and runs
+    them through one nlp.pipe call off the event loop, so bursts of
+    uploads / JD submissions share a batch instead of queueing behind
+    each other one document at a time. Batches are kept per mode.
+    """
+
+    def __init__(
+        self,
+        window_ms: int = NLP_BATCH_WINDOW_MS,
+        max_batch: int = NLP_MAX_BATCH
+    ):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: dict[str, list[tuple[str, asyncio.Future]]] = {}
+        self._flush_tasks: dict[str, asyncio.Task] = {}
+        # full batches flushed right away; the loop only keeps weak
+        # references to tasks
+        self._running: set[asyncio.Task] = set()
+
+    async def extract(self, text: str, mode: str | None = None) -> set[str]:
+        mode = resolve_mode(mode)
+
+        # taxonomy lookup is cheap and needs no model, skip the queue
+        if mode == MODE_GAZETTEER:
+            return extract_candidates(text, mode=mode)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(mode, [])
+        pending.append((text, future))
+
+        if len(pending) >= self.max_batch:
+            self._flush_now(mode)
+        elif mode not in self._flush_tasks:
+            self._flush_tasks[mode] = loop.create_task(self._flush_later(mode))
+
+        return await future
+
+    async def _flush_later(self, mode: str):
+        await asyncio.sleep(self.window)
+        self._flush_tasks.pop(mode, None)
+        await self._run(mode, self._take(mode))
+
+    def _flush_now(self, mode: str):
+        task = self._flush_tasks.pop(mode, None)
+        if task is not None:
+            task.cancel()
+        task = asyncio.get_running_loop().create_task(
+            self._run(mode, self._take(mode))
+        )
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    def _take(self, mode: str) -> list[tuple[str, asyncio.Future]]:
+        return self._pending.pop(mode, [])
+
+    async def _run(self, mode: str, batch: list[tuple[str, asyncio.Future]]):
+        if not batch:
+            return
+
+        try:
+            results = await asyncio.to_thread(
+                extract_candidates_batch,
+                [text for text, _ in batch],
+                mode=mode
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), candidates in zip(batch, results):
+            if not future.done():
+                future.set_result(candidates)
+
+
+candidate_batcher = CandidateBatcher()
@@ -1,13 +1,35 @@
-import spacy
+import os
+from typing import Iterable
 
-nlp = spacy.load("en_core_web_sm")
+from app.nlp.model import get_nlp
+from app.nlp.taxonomy import get_taxonomy
 
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", 1))
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", 32))
 
-def extract_candidates(text: str) -> set[str]:
-    """
-    Broad extraction: noun phrases + named entities
-    """
-    doc = nlp(text)
+# noun_chunks: full spaCy pipeline, broad but noisy
+# fast:        tagger-only POS chunking, no dependency parser
+# gazetteer:   skill taxonomy lookup, no spaCy at all
+MODE_NOUN_CHUNKS = "noun_chunks"
+MODE_FAST = "fast"
+MODE_GAZETTEER = "gazetteer"
+EXTRACTION_MODES = (MODE_NOUN_CHUNKS, MODE_FAST, MODE_GAZETTEER)
+
+NLP_EXTRACTION_MODE = os.getenv("NLP_EXTRACTION_MODE", MODE_NOUN_CHUNKS)
+NLP_FAST_NER = os.getenv("NLP_FAST_NER", "false").lower() == "true"
+
+CHUNK_POS = {"ADJ", "NOUN", "PROPN"}
+HEAD_POS = {"NOUN", "PROPN"}
+
+
+def resolve_mode(mode: str | None) -> str:
+    mode = mode or NLP_EXTRACTION_MODE
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode: {mode}")
+    return mode
+
+
+def _candidates_from_doc(doc) -> set[str]:
     candidates = set()
 
     # noun phrases (1–3 words)
@@ -22,3 +44,95 @@ def extract_candidates(text: str) -> set[str]:
             candidates.add(ent.text.lower().strip())
 
     return candidates
+
+
+def _disabled_components(mode: str) -> list[str]:
+    if mode != MODE_FAST:
+        return []
+    return ["parser"] if NLP_FAST_NER else ["parser", "ner"]
+
+
+def _candidates_from_tags(doc) -> set[str]:
+    """
+    Parser-free stand-in for noun_chunks: maximal runs of ADJ/NOUN/PROPN
+    ending in a noun, cut to their last 3 words.
+    """
+    candidates = set()
+    run = []
+
+    for token in [*doc, None]:
+        if token is not None and token.pos_ in CHUNK_POS:
+            run.append(token)
+            continue
+
+        while run and run[-1].pos_ not in HEAD_POS:
+            run.pop()
+        if run:
+            candidates.add(" ".join(t.text for t in run[-3:]).lower().strip())
+        run = []
+
+    if doc.has_annotation("ENT_IOB"):
+        for ent in doc.ents:
+            if ent.label_ in {"PRODUCT", "ORG", "LANGUAGE"}:
+                candidates.add(ent.text.lower().strip())
+
+    return candidates
+
+
+def _candidates(doc, mode: str) -> set[str]:
+    if mode == MODE_FAST:
+        return _candidates_from_tags(doc)
+    return _candidates_from_doc(doc)
+
+
+def _candidates_from_taxonomy(text: str) -> set[str]:
+    return {surface for surface, _ in get_taxonomy().match(text)}
+
+
+def extract_candidates(text: str, mode: str | None = None) -> set[str]:
+    """
+    Broad extraction: noun phrases + named entities,
+    POS-pattern chunks in fast mode, taxonomy hits in gazetteer mode
+    """
+    mode = resolve_mode(mode)
+    if mode == MODE_GAZETTEER:
+        return _candidates_from_taxonomy(text)
+
+    doc = get_nlp()(text, disable=_disabled_components(mode))
+    return _candidates(doc, mode)
+
+
+def extract_candidates_batch(
+    texts: Iterable[str],
+    n_process: int | None = None,
+    batch_size: int | None = None,
+    mode: str | None = None
+) -> list[set[str]]:
+    """
+    Same as extract_candidates, but streams the documents through
+    nlp.pipe so bursts are batched and optionally spread over worker
+    processes. Output order matches input order.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    mode = resolve_mode(mode)
+    if mode == MODE_GAZETTEER:
+        return [_candidates_from_taxonomy(text) for text in texts]
+
+    n_process = n_process or NLP_N_PROCESS
+    batch_size = batch_size or NLP_BATCH_SIZE
+
+    # spawning workers costs more than it saves on tiny bursts
+    n_process = max(1, min(n_process, len(texts)))
+
+    return [
+        _candidates(doc, mode)
+        for doc in get_nlp().pipe(
+            texts,
+            n_process=n_process,
+            batch_size=batch_size,
+            disable=_disabled_components(mode)
+        )
+    ]
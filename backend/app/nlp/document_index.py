@@ -0,0 +1,130 @@
+import re
+from collections import Counter
+
+from app.nlp.normalizer import normalize
+
+MAX_NGRAM = 3
+
+SECTION_HEADINGS = (
+    "skills",
+    "experience",
+    "projects",
+    "education",
+    "certifications",
+)
+
+# a heading is a line of its own this short ("Work Experience",
+# "TECHNICAL SKILLS:"), not a heading word inside a sentence
+HEADING_MAX_TOKENS = 3
+
+# separators between tokens; other punctuation is dropped inside a token
+# the same way normalize() drops it from candidates ("node.js" -> "nodejs")
+TOKEN_SPLIT = re.compile(r"[\s,;|()\[\]]+")
+
+# "/" and "-" join the parts of a compound ("python/django",
+# "react-native", "ci/cd"): each part is a token of its own
+COMPOUND_SPLIT = re.compile(r"[/\-]+")
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for chunk in TOKEN_SPLIT.split(text):
+        for part in COMPOUND_SPLIT.split(chunk):
+            token = normalize(part)
+            if token:
+                tokens.extend(token.split())
+    return tokens
+
+
+def compounds(text: str) -> list[str]:
+    """
+    Joined forms of the compounds in text, as normalize() writes them
+    ("ci/cd" -> "cicd"), so names normalized that way still count.
+    """
+    joined = []
+    for chunk in TOKEN_SPLIT.split(text):
+        if COMPOUND_SPLIT.search(chunk):
+            token = normalize(chunk)
+            if token:
+                joined.append(token)
+    return joined
+
+
+def _heading(line_tokens: list[str]) -> str | None:
+    if len(line_tokens) > HEADING_MAX_TOKENS:
+        return None
+    return next((token for token in line_tokens if token in SECTION_HEADINGS), None)
+
+
+class DocumentIndex:
+    """
+    Built once per document: token n-gram counts (1..MAX_NGRAM) and the
+    token spans of the section headings found in the text.
+
+    Headings are only recognized on short lines of their own. text that
+    was flattened to one line (a resume's cleaned_text) has none; pass
+    the same document with its line breaks (raw_text) as layout to find
+    them.
+
+    Counts are whole-token, so "java" no longer matches inside
+    "javascript". Compounds count as their parts and as their joined
+    form: "python/django" counts for "python", "django" and
+    "pythondjango".
+    """
+
+    def __init__(self, text: str, layout: str | None = None):
+        self.tokens = tokenize(text)
+        self.ngram_counts = Counter(compounds(text))
+
+        for n in range(1, MAX_NGRAM + 1):
+            for i in range(len(self.tokens) - n + 1):
+                self.ngram_counts[" ".join(self.tokens[i:i + n])] += 1
+
+        self.section_spans = self._find_sections(text if layout is None else layout)
+
+    def _find_sections(self, layout: str) -> dict[str, tuple[int, int]]:
+        # first heading line of each section opens it, and it runs until
+        # the next one. layout's lines tokenize to the same token stream
+        # as text, so a line's offset is the token count before it
+        starts = {}
+        offset = 0
+        for line in layout.splitlines():
+            line_tokens = tokenize(line)
+            heading = _heading(line_tokens)
+            if heading and heading not in starts and offset < len(self.tokens):
+                starts[heading] = offset
+            offset += len(line_tokens)
+
+        ordered = sorted(starts.items(), key=lambda item: item[1])
+        spans = {}
+        for j, (name, start) in enumerate(ordered):
+            end = ordered[j + 1][1] if j + 1 < len(ordered) else len(self.tokens)
+            spans[name] = (start, end)
+
+        return spans
+
+    def count(self, phrase: str) -> int:
+        phrase_tokens = phrase.split()
+        if len(phrase_tokens) <= MAX_NGRAM:
+            return self.ngram_counts.get(" ".join(phrase_tokens), 0)
+
+        n = len(phrase_tokens)
+        return sum(
+            1
+            for i in range(len(self.tokens) - n + 1)
+            if self.tokens[i:i + n] == phrase_tokens
+        )
+
+    def count_in_section(self, phrase: str, section: str) -> int:
+        span = self.section_spans.get(section)
+        if not span:
+            return 0
+
+        phrase_tokens = phrase.split()
+        n = len(phrase_tokens)
+        start, end = span
+        return sum(
+            1
+            for i in range(start, end - n + 1)
+            if self.tokens[i:i + n] == phrase_tokens
+        )
@@ -0,0 +1,43 @@
+import os
+import threading
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+NLP_WARMUP = os.getenv("NLP_WARMUP", "true").lower() == "true"
+
+# The extractor only reads noun_chunks and ents. The lemmatizer is never
+# used, so it is excluded outright. attribute_ruler stays: in the sm
+# pipeline it maps tagger output to token.pos_, which the English
+# noun_chunks iterator depends on.
+EXCLUDED_COMPONENTS = ["lemmatizer"]
+
+_models = {}
+_lock = threading.Lock()
+
+
+def get_nlp(name: str = SPACY_MODEL):
+    """
+    Returns the loaded pipeline, loading it on first use.
+    """
+    nlp = _models.get(name)
+    if nlp is not None:
+        return nlp
+
+    with _lock:
+        if name not in _models:
+            # imported here so that importing the app doesn't pay for spaCy
+            import spacy
+
+            _models[name] = spacy.load(name, exclude=EXCLUDED_COMPONENTS)
+        return _models[name]
+
+
+def is_loaded(name: str = SPACY_MODEL) -> bool:
+    return name in _models
+
+
+def warmup(name: str = SPACY_MODEL):
+    """
+    Loads the model and runs one tiny document through it so the first
+    real request doesn't pay for lazy initialisation.
+    """
+    get_nlp(name)("Warmup document for Python and FastAPI.")
@@ -1,29 +1,154 @@
-from app.nlp.candidate_extractor import extract_candidates
+from app.cache.extraction_cache import (
+    get_cached_extraction,
+    get_cached_extraction_async,
+    make_extraction_key,
+    set_cached_extraction,
+    set_cached_extraction_async
+)
+from app.nlp.candidate_extractor import (
+    MODE_GAZETTEER,
+    extract_candidates,
+    extract_candidates_batch,
+    resolve_mode
+)
+from app.nlp.batcher import candidate_batcher
+from app.nlp.document_index import DocumentIndex
 from app.nlp.normalizer import is_valid_candidate, normalize
-from app.nlp.skill_scorer import score_skill
+from app.nlp.skill_scorer import score_skills
+from app.nlp.taxonomy import get_taxonomy
 
 
-def extract_resume_skills_nlp(
+def _score_candidates(
+    raw_candidates: set[str],
     cleaned_text: str,
-    sections_detected: dict
+    sections_detected: dict,
+    mode: str
 ) -> list[dict]:
-    
-    raw_candidates = extract_candidates(cleaned_text)
-    skills = []
+    gazetteer = mode == MODE_GAZETTEER
 
+    normalized_candidates = []
     for cand in raw_candidates:
         normalized = normalize(cand)
         
-        if not is_valid_candidate(normalized):
+        # taxonomy hits are curated, the noise filter is for noun chunks
+        if not gazetteer and not is_valid_candidate(normalized):
             continue
 
-        scored = score_skill(
-            normalized,
-            cleaned_text,
-            sections_detected
-        )
+        normalized_candidates.append(normalized)
+
+    scored = score_skills(
+        normalized_candidates,
+        DocumentIndex(cleaned_text),
+        sections_detected
+    )
+
+    skills = [s for s in scored if s["confidence"] >= 0.5]
+
+    if gazetteer:
+        skills = _merge_aliases(skills)
+
+    return skills
+
+
+def _merge_aliases(skills: list[dict]) -> list[dict]:
+    # "js" and "javascript" hits collapse into one canonical entry
+    taxonomy = get_taxonomy()
+    merged = {}
+
+    for skill in skills:
+        name = taxonomy.canonicalize(skill["name"])
+        current = merged.get(name)
+        if current is None:
+            merged[name] = {**skill, "name": name}
+        else:
+            current["confidence"] = max(current["confidence"], skill["confidence"])
+            current["source"] = list(set(current["source"]) | set(skill["source"]))
+
+    return list(merged.values())
+
+
+def _cache_key(cleaned_text: str, sections_detected: dict, mode: str) -> str:
+    return make_extraction_key(
+        "resume",
+        cleaned_text,
+        mode,
+        extra={"sections": sections_detected}
+    )
+
+
+def extract_resume_skills_nlp(
+    cleaned_text: str,
+    sections_detected: dict,
+    mode: str | None = None
+) -> list[dict]:
+    
+    mode = resolve_mode(mode)
+    cache_key = _cache_key(cleaned_text, sections_detected, mode)
+
+    cached = get_cached_extraction(cache_key)
+    if cached is not None:
+        return cached
+
+    raw_candidates = extract_candidates(cleaned_text, mode=mode)
+    skills = _score_candidates(
+        raw_candidates, cleaned_text, sections_detected, mode
+    )
+
+    set_cached_extraction(cache_key, skills)
+    return skills
+
+
+async def extract_resume_skills_nlp_async(
+    cleaned_text: str,
+    sections_detected: dict,
+    mode: str | None = None
+) -> list[dict]:
+    """
+    Same as extract_resume_skills_nlp, but batched with concurrent
+    uploads and run off the event loop.
+    """
+    mode = resolve_mode(mode)
+    cache_key = _cache_key(cleaned_text, sections_detected, mode)
+
+    cached = await get_cached_extraction_async(cache_key)
+    if cached is not None:
+        return cached
+
+    raw_candidates = await candidate_batcher.extract(cleaned_text, mode=mode)
+    skills = _score_candidates(
+        raw_candidates, cleaned_text, sections_detected, mode
+    )
+
+    await set_cached_extraction_async(cache_key, skills)
+    return skills
+
+
+def extract_resume_skills_nlp_batch(
+    items: list[tuple[str, dict]],
+    n_process: int | None = None,
+    batch_size: int | None = None,
+    mode: str | None = None
+) -> list[list[dict]]:
+    """
+    Batch variant of extract_resume_skills_nlp.
+    items: (cleaned_text, sections_detected) pairs, results keep order.
+    Only cache misses go through spaCy.
+    """
+    mode = resolve_mode(mode)
+    keys = [_cache_key(text, sections, mode) for text, sections in items]
+    results = [get_cached_extraction(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    candidate_sets = extract_candidates_batch(
+        [items[i][0] for i in missing],
+        n_process=n_process,
+        batch_size=batch_size,
+        mode=mode
+    )
 
-        if scored["confidence"] >=0.5:
-            skills.append(scored)
+    for i, raw_candidates in zip(missing, candidate_sets):
+        text, sections = items[i]
+        results[i] = _score_candidates(raw_candidates, text, sections, mode)
+        set_cached_extraction(keys[i], results[i])
 
-    return skills
\ No newline at end of file
+    return results
@@ -1,12 +1,9 @@
-def score_skill(skill: str, text: str, sections: dict) -> dict:
-    confidence = 0.3
-    sources = []
+from app.nlp.document_index import DocumentIndex
 
-    lowered = text.lower()
 
-    occurrences = lowered.count(skill)
-    if occurrences >= 2:
-        confidence += 0.2
+def _section_bonus(sections: dict) -> tuple[float, list[str]]:
+    confidence = 0.0
+    sources = []
 
     if "skills" in sections:
         confidence += 0.2
@@ -16,10 +13,37 @@ def score_skill(skill: str, text: str, sections: dict) -> dict:
         confidence += 0.3
         sources.append("experience")
 
-    confidence = min(confidence, 1.0)
+    return confidence, sources
+
 
-    return {
-        "name": skill,
-        "confidence": round(confidence, 2),
-        "source": list(set(sources))
-    }
+def score_skills(
+    skills: list[str],
+    index: DocumentIndex,
+    sections: dict
+) -> list[dict]:
+    """
+    Scores every skill against one prebuilt index. The section part of
+    the score is the same for all skills, so it is computed once and
+    each skill only costs an n-gram lookup.
+    """
+    bonus, sources = _section_bonus(sections)
+    sources = list(set(sources))
+
+    base = 0.3 + bonus
+    repeated = min(base + 0.2, 1.0)
+    single = min(base, 1.0)
+
+    return [
+        {
+            "name": skill,
+            "confidence": round(
+                repeated if index.count(skill) >= 2 else single, 2
+            ),
+            "source": list(sources)
+        }
+        for skill in skills
+    ]
+
+
+def score_skill(skill: str, text: str, sections: dict) -> dict:
+    return score_skills([skill], DocumentIndex(text), sections)[0]
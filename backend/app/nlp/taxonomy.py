@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from app.nlp.document_index import tokenize
+from app.nlp.normalizer import normalize
+
+TAXONOMY_PATH = Path(
+    os.getenv(
+        "SKILL_TAXONOMY_PATH",
+        Path(__file__).parent / "data" / "skill_taxonomy.json"
+    )
+)
+
+# marks the end of a surface form inside the trie
+_END = ""
+
+
+class SkillTaxonomy:
+    """
+    Curated skill list with aliases, compiled into a token trie.
+
+    Surface forms (canonical names and aliases) are tokenized the same
+    way as documents, so "node.js", "nodejs" and "Node.JS" all hit the
+    same path.
+    """
+
+    def __init__(self, version: str, skills: dict[str, list[str]]):
+        self.version = version
+        self.canonical: dict[str, str] = {}
+        self.trie: dict = {}
+        self.max_len = 0
+
+        for name, aliases in skills.items():
+            for surface in [name, *aliases]:
+                tokens = tokenize(surface)
+                if not tokens:
+                    continue
+
+                self.canonical[" ".join(tokens)] = name
+                # compounds are looked up split ("ci cd") or joined ("cicd")
+                self.canonical.setdefault("".join(tokens), name)
+                self._insert(tokens, name)
+
+    def _insert(self, tokens: list[str], name: str):
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = name
+        self.max_len = max(self.max_len, len(tokens))
+
+    def match(self, text: str) -> list[tuple[str, str]]:
+        """
+        Longest-match scan over the document tokens.
+        Returns (surface form as written, canonical name) pairs.
+        """
+        tokens = tokenize(text)
+        return [
+            (" ".join(tokens[start:end]), name)
+            for start, end, name in self.find(tokens)
+        ]
+
+    def find(self, tokens: list[str]) -> list[tuple[int, int, str]]:
+        """
+        Same scan over already tokenized text; returns (start, end,
+        canonical name) token spans.
+        """
+        found = []
+        i = 0
+
+        while i < len(tokens):
+            node = self.trie
+            best = None
+            j = i
+
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if _END in node:
+                    best = (j, node[_END])
+
+            if best:
+                end, name = best
+                found.append((i, end, name))
+                i = end
+            else:
+                i += 1
+
+        return found
+
+    def canonicalize(self, skill: str) -> str:
+        """
+        Maps a normalized skill name to its canonical name, or returns
+        it unchanged when it isn't in the taxonomy.
+        """
+        name = self.canonical.get(" ".join(tokenize(skill)))
+        return normalize(name) if name else skill
+
+
+_taxonomy: SkillTaxonomy | None = None
+_lock = threading.Lock()
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    global _taxonomy
+
+    if _taxonomy is None:
+        with _lock:
+            if _taxonomy is None:
+                with open(TAXONOMY_PATH, encoding="utf-8") as f:
+                    data = json.load(f)
+                _taxonomy = SkillTaxonomy(data["version"], data["skills"])
+
+    return _taxonomy
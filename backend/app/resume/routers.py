@@ -3,9 +3,9 @@ from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
 
-from app.auth.deps import get_current_user
+from app.auth.deps import CurrentUser, get_current_user
 from app.auth.schema import ResumeHistoryResponse, ResumeUploadResponse
-from app.db.model import AnalysisResult, Resume, ResumeVersion, User
+from app.db.model import AnalysisResult, Resume, ResumeVersion
 from app.db.session import get_session
 from app.resume.services import handle_res_upload, parse_resume_job
 from fastapi.responses import FileResponse
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/resumes", tags=["Resumes"])
 async def upload_resume(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     existing_versions_query = await db.execute(
@@ -77,7 +77,7 @@ async def upload_resume(
 
 @router.get("/history", response_model=ResumeHistoryResponse)
 async def resume_history(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     res = await db.execute(
@@ -130,7 +130,7 @@ async def resume_history(
 
 @router.get("/latest-analyzed-file")
 async def get_latest_analyzed_resume(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     query = (
@@ -161,7 +161,7 @@ async def get_latest_analyzed_resume(
 
 @router.get("/latest/verify")
 async def verify_latest_upload(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     query = (
@@ -6,10 +6,11 @@ from pathlib import Path
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.score_cache import generate_content_hash
 from app.db.model import Resume, ResumeVersion
 from app.db.session import AsyncSessionLocal
 
-from app.nlp.resume_skill_pipeline import extract_resume_skills_nlp
+from app.nlp.resume_skill_pipeline import extract_resume_skills_nlp_async
 from app.scoring.formatting_rules import evaluate_formatting
 from app.utils.formatting_analyzer import analyze_formatting
 from app.utils.resume_parser import clean_text, extract_resume_text
@@ -17,6 +18,8 @@ from app.utils.resume_parser import clean_text, extract_resume_text
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+RAW_TEXT_LIMIT = 20000
+
 async def handle_res_upload(
     file,
     user_id: uuid.UUID,
@@ -107,13 +110,15 @@ async def parse_resume_job(resume_version_id: str):
                 "certifications": False,
             }
 
-            skills = extract_resume_skills_nlp(
+            skills = await extract_resume_skills_nlp_async(
                 cleaned_text,
                 sections,
             )
 
             resume_version.parsed_data = {
-                "raw_text": raw_text[:5000],
+                # the prompt builder trims this to a token budget by
+                # section, so keep enough for long resumes
+                "raw_text": raw_text[:RAW_TEXT_LIMIT],
                 "cleaned_text": cleaned_text[:5000],
                 "formatting": formatting_stats,
                 "formatting_violations": formatting_violations,
@@ -121,6 +126,10 @@ async def parse_resume_job(resume_version_id: str):
                 "skills": skills,
             }
 
+            resume_version.content_hash = generate_content_hash(
+                resume_version.parsed_data["raw_text"]
+                or resume_version.parsed_data["cleaned_text"]
+            )
             resume_version.status = "PARSED"
 
         except Exception as e:
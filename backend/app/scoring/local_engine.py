@@ -0,0 +1,179 @@
+import re
+
+from app.nlp.document_index import DocumentIndex
+from app.nlp.normalizer import normalize
+from app.utils.resume_parser import normalize_skills
+
+SECTION_NAMES = ("skills", "experience", "projects", "education", "certifications")
+
+FORMATTING_PENALTY = {"HIGH": 30, "MEDIUM": 15, "LOW": 5}
+
+FORMATTING_FEEDBACK = {
+    "no_bullets": "Use bullet points to list responsibilities and achievements.",
+    "long_paragraphs": "Break long paragraphs into short, scannable bullet points.",
+    "low_bullet_density": "Add more bullet points describing concrete results.",
+}
+
+NUMBER_PATTERN = re.compile(r"\d+(\.\d+)?\s*(%|x|k|m|\+)?")
+
+
+def jd_skill_weights(analyzed_data: dict) -> dict[str, float]:
+    weights = {}
+    for skill in analyzed_data.get("skills", []):
+        name = normalize(skill.get("name", ""))
+        if name:
+            weights[name] = max(weights.get(name, 0), skill.get("confidence", 0.5))
+    return weights
+
+
+def _skills_block(
+    jd_weights: dict[str, float],
+    resume_skills: set[str],
+    index: DocumentIndex
+) -> dict:
+    matched, weak, missing = [], [], []
+
+    for name in jd_weights:
+        if name in resume_skills:
+            matched.append(name)
+        elif index.count(name) > 0:
+            # in the text but not picked up as a skill: mentioned in passing
+            weak.append(name)
+        else:
+            missing.append(name)
+
+    total = sum(jd_weights.values())
+    earned = (
+        sum(jd_weights[n] for n in matched)
+        + 0.5 * sum(jd_weights[n] for n in weak)
+    )
+
+    return {
+        "match_percent": round(100 * earned / total, 2) if total else 0,
+        "matched": matched,
+        "missing": missing,
+        "weak": weak,
+    }
+
+
+def _keywords_block(jd_weights: dict[str, float], index: DocumentIndex) -> dict:
+    matched, weak, missing = [], [], []
+
+    for name in jd_weights:
+        count = index.count(name)
+        if count >= 2:
+            matched.append(name)
+        elif count == 1:
+            weak.append(name)
+        else:
+            missing.append(name)
+
+    return {"matched": matched, "weak": weak, "missing": missing}
+
+
+def _sections_block(index: DocumentIndex, sections_detected: dict) -> dict:
+    # headings found in the text win over the parser's static defaults
+    if index.section_spans:
+        return {s: s in index.section_spans for s in SECTION_NAMES}
+
+    return {s: bool(sections_detected.get(s)) for s in SECTION_NAMES}
+
+
+def _experience_block(
+    jd_weights: dict[str, float],
+    index: DocumentIndex,
+    skills_block: dict
+) -> dict:
+    has_spans = any(s in index.section_spans for s in ("experience", "projects"))
+
+    if has_spans and jd_weights:
+        applied = [
+            name for name in jd_weights
+            if index.count_in_section(name, "experience")
+            or index.count_in_section(name, "projects")
+        ]
+        relevance = 100 * sum(jd_weights[n] for n in applied) / sum(jd_weights.values())
+    else:
+        applied = skills_block["matched"]
+        relevance = skills_block["match_percent"]
+
+    suggestions = [
+        f"Show hands-on use of {name} in your experience or project bullets."
+        for name in jd_weights
+        if name not in applied
+    ][:3]
+
+    return {
+        "relevance_score": round(relevance, 2),
+        "experience_suggestion": suggestions,
+    }
+
+
+def _formatting_block(parsed_data: dict) -> dict:
+    violations = parsed_data.get("formatting_violations", [])
+
+    score = 100 - sum(
+        FORMATTING_PENALTY.get(v.get("severity"), 0) for v in violations
+    )
+
+    return {
+        "score": max(score, 0),
+        "feedback": [
+            FORMATTING_FEEDBACK[v["rule_key"]]
+            for v in violations
+            if v.get("rule_key") in FORMATTING_FEEDBACK
+        ],
+    }
+
+
+def local_ats_analysis(
+    parsed_data: dict,
+    analyzed_data: dict,
+    jd_weights: dict[str, float] | None = None
+) -> dict:
+    """
+    Deterministic ATS analysis from the data stored at parse / JD
+    analysis time. Returns the same shape as gemini_full_ats_analysis,
+    so aggregate_ats_score can consume either.
+    jd_weights: precomputed jd_skill_weights(analyzed_data), e.g. from
+    the JD's profile.
+    """
+    resume_text = parsed_data.get("cleaned_text", "")
+    # raw_text keeps the line breaks section headings are found by
+    index = DocumentIndex(resume_text, parsed_data.get("raw_text"))
+
+    if jd_weights is None:
+        jd_weights = jd_skill_weights(analyzed_data or {})
+    resume_skills = {
+        normalize(s) for s in normalize_skills(parsed_data.get("skills", []))
+    }
+
+    skills = _skills_block(jd_weights, resume_skills, index)
+    experience = _experience_block(jd_weights, index, skills)
+    keywords = _keywords_block(jd_weights, index)
+    sections = _sections_block(index, parsed_data.get("sections_detected", {}))
+    formatting = _formatting_block(parsed_data)
+
+    suggestions = []
+    if skills["missing"]:
+        suggestions.append(
+            "Add these job requirements if you have them: "
+            + ", ".join(skills["missing"][:5]) + "."
+        )
+    for name in ("skills", "experience", "education"):
+        if not sections[name]:
+            suggestions.append(f"Add a clear '{name.title()}' section.")
+    if not NUMBER_PATTERN.search(resume_text):
+        suggestions.append(
+            "Quantify your impact with numbers (e.g. % improvements, users, revenue)."
+        )
+    suggestions.extend(formatting["feedback"])
+
+    return {
+        "skills": skills,
+        "experience": experience,
+        "keywords": keywords,
+        "formatting": formatting,
+        "sections": sections,
+        "suggestions": suggestions,
+    }
@@ -1,36 +1,37 @@
+import json
 import os
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.deps import get_current_user
+from app.auth.deps import CurrentUser, get_current_user
+from app.auth.schema import BatchScoreInput
 from app.db.session import get_session
 from app.db.model import (
     Resume,
     ResumeVersion,
     JobDescription,
     AnalysisResult,
-    User,
 )
 
-from app.llm.gemini import gemini_full_ats_analysis
-from app.scoring.scoring import aggregate_ats_score
-from app.cache.score_cache import make_score_key, get_cached_score, set_cached_score
+from app.metrics.registry import incr
+from app.scoring.service import (
+    local_response,
+    score_batch,
+    score_stream,
+    score_with_llm
+)
 
 router = APIRouter(prefix="/ats", tags=["ATS"])
 
-@router.post("/score")
-async def score_resume(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
-):
+
+async def _latest_parsed_resume(db: AsyncSession, user_id) -> ResumeVersion:
     res_query = await db.execute(
         select(ResumeVersion)
         .join(Resume)
         .where(
-            Resume.user_id == current_user.id,
+            Resume.user_id == user_id,
             ResumeVersion.status == "PARSED"
         )
         .order_by(ResumeVersion.created_at.desc())
@@ -41,10 +42,14 @@ async def score_resume(
     if not resume:
         raise HTTPException(404, "No parsed resume found.")
 
+    return resume
+
+
+async def _latest_analyzed_jd(db: AsyncSession, user_id) -> JobDescription:
     jd_query = await db.execute(
         select(JobDescription)
         .where(
-            JobDescription.user_id == current_user.id,
+            JobDescription.user_id == user_id,
             JobDescription.analyzed_data.isnot(None)
         )
         .order_by(JobDescription.created_at.desc())
@@ -55,76 +60,109 @@ async def score_resume(
     if not jd:
         raise HTTPException(404, "No analyzed job description found.")
 
-    resume_text = resume.parsed_data.get("cleaned_text", "")
-    jd_text = jd.content
+    return jd
 
-    cache_key = make_score_key(
-        user_id=str(current_user.id),
-        resume_text=resume_text,
-        jd_text=jd_text
-    )
 
-    cached = get_cached_score(cache_key)
-    if cached:
-        return {**cached, "cached": True}
+@router.post("/score")
+async def score_resume(
+    mode: str = Query("llm", pattern="^(llm|fast)$"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    mode=llm  - Gemini analysis, falls back to the local engine when the
+                LLM is slow or failing (LLM_TIMEOUT_SECONDS)
+    mode=fast - local deterministic analysis only
+    """
+    resume = await _latest_parsed_resume(db, current_user.id)
+    jd = await _latest_analyzed_jd(db, current_user.id)
 
-    try:
-        gemini_result = gemini_full_ats_analysis(
-            resume_text=resume_text,
-            jd_text=jd.content
-        )
-    except Exception as e:
-        raise HTTPException(500, f"AI Analysis failed: {str(e)}")
+    if mode == "fast":
+        incr("scoring.mode.fast")
+        return local_response(resume, jd, "fast")
 
-    final = aggregate_ats_score(
-        gemini_result=gemini_result,
-        formatting={}
-    )
+    return await score_with_llm(resume, jd, str(current_user.id), db)
 
-    payload = {
-        "skills": gemini_result["skills"],
-        "experience": gemini_result["experience"],
-        "keywords": gemini_result["keywords"],
-        "sections": gemini_result["sections"],
-        "formatting": gemini_result.get("formatting", {}),
-        "suggestions": gemini_result["suggestions"]
-    }
-
-    stmt = insert(AnalysisResult).values(
-        resume_version_id=resume.id,
-        job_description_id=jd.id,
-        final_score=final["final_ats_score"],
-        breakdown=final["score_breakdown"],
-        result=payload
-    )
 
-    upsert_stmt = stmt.on_conflict_do_update(
-        constraint="uq_resume_jd_result", 
-        set_={
-            "final_score": stmt.excluded.final_score,
-            "breakdown": stmt.excluded.breakdown,
-            "result": stmt.excluded.result
-        }
+@router.post("/score/batch")
+async def score_resume_batch(
+    payload: BatchScoreInput,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Scores the latest parsed resume against several job descriptions.
+    Streams NDJSON: one "result" line per JD as it completes (with cache
+    and latency stats), then a "summary" line.
+    """
+    resume = await _latest_parsed_resume(db, current_user.id)
+
+    jd_ids = list(dict.fromkeys(payload.job_description_ids))
+
+    jd_query = await db.execute(
+        select(JobDescription)
+        .where(
+            JobDescription.id.in_(jd_ids),
+            JobDescription.user_id == current_user.id,
+            JobDescription.analyzed_data.isnot(None)
+        )
     )
+    jds = jd_query.scalars().all()
 
-    await db.execute(upsert_stmt)
-    await db.commit()
+    if not jds:
+        raise HTTPException(404, "No analyzed job description found.")
+
+    found = {jd.id for jd in jds}
+    missing = [str(jd_id) for jd_id in jd_ids if jd_id not in found]
+
+    async def stream():
+        for jd_id in missing:
+            item = {
+                "type": "result",
+                "jd_id": jd_id,
+                "result": None,
+                "error": "Job description not found."
+            }
+            yield json.dumps(item) + "\n"
+
+        async for item in score_batch(resume, jds, str(current_user.id), payload.mode):
+            yield json.dumps(item, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
-    response = {
-        **final,
-        **payload,
-        "cached": False,
-        "resume_id": str(resume.id),  
-        "jd_id": str(jd.id)           
-    }
 
-    set_cached_score(cache_key, response)
-    return response
+@router.post("/score/stream")
+async def score_resume_stream(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Server-Sent Events version of /ats/score. Emits one event per
+    analysis block (skills, experience, keywords, formatting, sections,
+    suggestions) as soon as the model has produced it, then a "result"
+    event with the same payload /ats/score returns.
+    """
+    resume = await _latest_parsed_resume(db, current_user.id)
+    jd = await _latest_analyzed_jd(db, current_user.id)
+
+    async def events():
+        try:
+            async for name, value in score_stream(resume, jd, str(current_user.id)):
+                yield f"event: {name}\ndata: {json.dumps(value, default=str)}\n\n"
+        except Exception as e:
+            error = {"detail": f"AI Analysis failed: {str(e)}"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/latest-analyzed-file")
 async def get_latest_analyzed_resume(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     """
@@ -156,7 +194,7 @@ async def get_latest_analyzed_resume(
 
 @router.get("/latest/verify")
 async def verify_latest_upload(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     """
@@ -0,0 +1,539 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.analysis_store import get_analysis, save_analysis
+from app.cache.score_cache import (
+    generate_content_hash,
+    get_cached_score_async,
+    get_cached_scores_async,
+    make_score_key,
+    set_cached_score_async
+)
+from app.cache.single_flight import score_flight
+from app.db.model import AnalysisResult, JobDescription, ResumeVersion
+from app.db.session import AsyncSessionLocal
+from app.jobs.jd_profile import get_jd_profile, keyword_weights
+from app.llm.gemini import (
+    gemini_ats_judgment_async,
+    gemini_ats_judgment_stream,
+    gemini_full_ats_analysis_async,
+    gemini_full_ats_analysis_stream
+)
+from app.llm.prompts import LLM_HYBRID
+from app.metrics.registry import incr
+from app.scoring.local_engine import local_ats_analysis
+from app.scoring.scoring import aggregate_ats_score
+from app.utils.deadline import bounded
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 25))
+LLM_FALLBACK_ENABLED = os.getenv("LLM_FALLBACK_ENABLED", "true").lower() == "true"
+SCORE_BATCH_CONCURRENCY = int(os.getenv("SCORE_BATCH_CONCURRENCY", 4))
+
+PAYLOAD_KEYS = ("skills", "experience", "keywords", "sections", "formatting", "suggestions")
+
+# blocks the model still judges in hybrid mode; the rest are local
+JUDGMENT_KEYS = ("experience", "suggestions")
+
+logger = logging.getLogger("scoring")
+
+# background refreshes of stale cache entries, by cache key
+_refreshing: dict[str, asyncio.Task] = {}
+
+# batch writes still running after their client went away
+_persisting: set[asyncio.Task] = set()
+
+
+def local_response(resume: ResumeVersion, jd: JobDescription, mode: str) -> dict:
+    result = _local_analysis(resume, jd)
+    final = aggregate_ats_score(gemini_result=result, formatting={})
+
+    return {
+        **final,
+        **result,
+        "cached": False,
+        "mode": mode,
+        "resume_id": str(resume.id),
+        "jd_id": str(jd.id)
+    }
+
+
+async def upsert_analysis_results(db: AsyncSession, responses: list[dict]):
+    """
+    Persists scored responses in a single INSERT .. ON CONFLICT statement.
+    """
+    if not responses:
+        return
+
+    stmt = insert(AnalysisResult).values([
+        {
+            "resume_version_id": uuid.UUID(response["resume_id"]),
+            "job_description_id": uuid.UUID(response["jd_id"]),
+            "final_score": response["final_ats_score"],
+            "breakdown": response["score_breakdown"],
+            "result": {key: response[key] for key in PAYLOAD_KEYS},
+        }
+        for response in responses
+    ])
+
+    upsert_stmt = stmt.on_conflict_do_update(
+        constraint="uq_resume_jd_result", 
+        set_={
+            "final_score": stmt.excluded.final_score,
+            "breakdown": stmt.excluded.breakdown,
+            "result": stmt.excluded.result
+        }
+    )
+
+    await db.execute(upsert_stmt)
+    await db.commit()
+
+
+def _prompt_resume_text(resume: ResumeVersion) -> str:
+    # raw_text keeps the line breaks and headings the prompt builder
+    # ranks sections by; cleaned_text is flattened to one line
+    return (
+        resume.parsed_data.get("raw_text")
+        or resume.parsed_data.get("cleaned_text", "")
+    )
+
+
+def _content_hashes(resume: ResumeVersion, jd: JobDescription) -> tuple[str, str]:
+    # rows parsed before content_hash existed fall back to hashing here
+    resume_hash = resume.content_hash or generate_content_hash(_prompt_resume_text(resume))
+    jd_hash = jd.content_hash or generate_content_hash(jd.content)
+    return resume_hash, jd_hash
+
+
+def _llm_result_response(
+    resume: ResumeVersion,
+    jd: JobDescription,
+    gemini_result: dict,
+    cached: bool = False
+) -> dict:
+    final = aggregate_ats_score(
+        gemini_result=gemini_result,
+        formatting={}
+    )
+
+    payload = {
+        "skills": gemini_result["skills"],
+        "experience": gemini_result["experience"],
+        "keywords": gemini_result["keywords"],
+        "sections": gemini_result["sections"],
+        "formatting": gemini_result.get("formatting", {}),
+        "suggestions": gemini_result["suggestions"]
+    }
+
+    return {
+        **final,
+        **payload,
+        "cached": cached,
+        "mode": "llm",
+        "resume_id": str(resume.id),  
+        "jd_id": str(jd.id)           
+    }
+
+
+def _local_analysis(resume: ResumeVersion, jd: JobDescription) -> dict:
+    return local_ats_analysis(
+        resume.parsed_data,
+        jd.analyzed_data,
+        keyword_weights(get_jd_profile(jd))
+    )
+
+
+def _hybrid_result(local: dict, judgment: dict) -> dict:
+    # model suggestions first, then the deterministic ones it didn't cover
+    suggestions = list(judgment["suggestions"])
+    suggestions += [s for s in local["suggestions"] if s not in suggestions]
+
+    return {**local, "experience": judgment["experience"], "suggestions": suggestions}
+
+
+def _full_analysis(resume: ResumeVersion, jd: JobDescription, llm_output: dict) -> dict:
+    """
+    Model output (full analysis, or judgment blocks in hybrid mode) as a
+    complete analysis in gemini_full_ats_analysis's shape.
+    """
+    if not LLM_HYBRID:
+        return llm_output
+    return _hybrid_result(_local_analysis(resume, jd), llm_output)
+
+
+async def _run_llm(resume: ResumeVersion, jd: JobDescription) -> tuple[dict, dict]:
+    """
+    Returns (model output to store, complete analysis).
+    """
+    resume_text = _prompt_resume_text(resume)
+    profile = get_jd_profile(jd)
+
+    if not LLM_HYBRID:
+        output = await gemini_full_ats_analysis_async(resume_text, jd.content, profile)
+        return output, output
+
+    local = _local_analysis(resume, jd)
+    output = await gemini_ats_judgment_async(
+        resume_text, jd.content, local["skills"], profile
+    )
+    return output, _hybrid_result(local, output)
+
+
+async def _save_analysis(
+    resume_hash: str,
+    jd_hash: str,
+    llm_output: dict,
+    db: AsyncSession | None
+):
+    """
+    save_analysis that doesn't fail the request: the response is still
+    returned and cached, only sharing it with other users is lost.
+    """
+    try:
+        await save_analysis(resume_hash, jd_hash, llm_output, db)
+    except Exception as e:
+        incr("analysis_store.save_failed")
+        logger.warning(f"Saving LLM analysis failed: {e!r}")
+        if db is not None:
+            # the session is still used for the upsert
+            await db.rollback()
+
+
+async def _llm_response(
+    resume: ResumeVersion,
+    jd: JobDescription,
+    db: AsyncSession | None,
+    cache_key: str
+) -> dict:
+    resume_hash, jd_hash = _content_hashes(resume, jd)
+
+    # another user (or an older version of this one) may already have
+    # paid for this exact resume / JD text
+    stored = await get_analysis(resume_hash, jd_hash, db)
+    if stored is not None:
+        incr("scoring.mode.stored")
+        response = _llm_result_response(
+            resume, jd, _full_analysis(resume, jd, stored), cached=True
+        )
+
+        if db is not None:
+            await upsert_analysis_results(db, [response])
+        await set_cached_score_async(cache_key, response)
+        return response
+
+    try:
+        llm_output, gemini_result = await asyncio.wait_for(
+            _run_llm(resume, jd),
+            timeout=bounded(LLM_TIMEOUT_SECONDS)
+        )
+    except Exception as e:
+        if not LLM_FALLBACK_ENABLED:
+            raise HTTPException(500, f"AI Analysis failed: {str(e)}")
+
+        # fallback results are neither cached nor persisted, so the next
+        # request tries the LLM again
+        logger.warning(f"LLM analysis failed, using local engine: {e!r}")
+        incr("scoring.mode.fallback")
+        return local_response(resume, jd, "fallback")
+
+    incr("scoring.mode.llm")
+    response = _llm_result_response(resume, jd, gemini_result)
+    await _save_analysis(resume_hash, jd_hash, llm_output, db)
+
+    # cached right away, so other workers waiting on this key see it;
+    # batch callers pass no session and persist everything at the end
+    if db is not None:
+        await upsert_analysis_results(db, [response])
+    await set_cached_score_async(cache_key, response)
+
+    return response
+
+
+async def _refresh(resume: ResumeVersion, jd: JobDescription, cache_key: str):
+    async def lookup():
+        # only a fresh entry means another worker finished the refresh
+        hit, fresh = await get_cached_score_async(cache_key)
+        return {**hit, "cached": True} if hit and fresh else None
+
+    async def rescore():
+        async with AsyncSessionLocal() as db:
+            return await _llm_response(resume, jd, db, cache_key)
+
+    try:
+        await score_flight.do(cache_key, rescore, lookup)
+        incr("scoring.refresh.done")
+    except Exception as e:
+        incr("scoring.refresh.failed")
+        logger.warning(f"Background score refresh failed: {e!r}")
+    finally:
+        _refreshing.pop(cache_key, None)
+
+
+def _schedule_refresh(resume: ResumeVersion, jd: JobDescription, cache_key: str):
+    """
+    Recomputes a stale cache entry in the background, once per key per
+    worker; the single-flight lock keeps it to one across workers.
+    """
+    if cache_key in _refreshing:
+        return
+
+    incr("scoring.refresh.started")
+    _refreshing[cache_key] = asyncio.create_task(_refresh(resume, jd, cache_key))
+
+
+async def score_with_llm(
+    resume: ResumeVersion,
+    jd: JobDescription,
+    user_id: str,
+    db: AsyncSession | None
+) -> dict:
+    """
+    Cached LLM scoring of one resume / JD pair. Concurrent identical
+    requests (double clicks, retries, other workers) share one LLM call,
+    and identical text across users shares one stored analysis.
+    Stale cache entries are returned immediately and refreshed in the
+    background. Fresh results are cached as soon as they are scored and
+    persisted through db unless it is None.
+    """
+    cache_key = make_score_key(user_id, *_content_hashes(resume, jd))
+
+    cached, fresh = await get_cached_score_async(cache_key)
+    if cached:
+        if not fresh:
+            _schedule_refresh(resume, jd, cache_key)
+        return {**cached, "cached": True}
+
+    async def lookup():
+        hit, _ = await get_cached_score_async(cache_key)
+        return {**hit, "cached": True} if hit else None
+
+    return await score_flight.do(
+        cache_key,
+        lambda: _llm_response(resume, jd, db, cache_key),
+        lookup
+    )
+
+
+async def _persist_batch(fresh: list[dict]) -> int:
+    async with AsyncSessionLocal() as db:
+        await upsert_analysis_results(db, fresh)
+    return len(fresh)
+
+
+def _persist_done(task: asyncio.Task):
+    _persisting.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        incr("scoring.batch.persist_failed")
+        logger.warning(f"Persisting batch results failed: {task.exception()!r}")
+
+
+def _persist_in_background(fresh: list[dict]) -> asyncio.Task:
+    """
+    Writes a batch's fresh results in a task of its own, so they are
+    kept even if the client disconnects and the batch is cancelled.
+    """
+    task = asyncio.create_task(_persist_batch(fresh))
+    _persisting.add(task)
+    task.add_done_callback(_persist_done)
+    return task
+
+
+async def score_batch(
+    resume: ResumeVersion,
+    jds: list[JobDescription],
+    user_id: str,
+    mode: str
+) -> AsyncIterator[dict]:
+    """
+    Scores one resume against many JDs with at most
+    SCORE_BATCH_CONCURRENCY in flight, yielding each item as soon as it
+    completes and a summary at the end. Per-user cache hits for all JDs
+    are read with one MGET up front; stale ones are served and refreshed
+    in the background. Fresh LLM results are cached as each one
+    completes, and persisted with one upsert (per-user cache hits
+    included, the upsert is idempotent) once all items are done, or when
+    the client disconnects, for whatever finished by then.
+    """
+    slots = asyncio.Semaphore(SCORE_BATCH_CONCURRENCY)
+    keys = {
+        str(jd.id): make_score_key(user_id, *_content_hashes(resume, jd))
+        for jd in jds
+    }
+
+    hits = {}
+    if mode != "fast":
+        entries = await get_cached_scores_async(list(keys.values()))
+        for jd, (value, fresh) in zip(jds, entries):
+            if value is None:
+                continue
+            hits[str(jd.id)] = value
+            if not fresh:
+                _schedule_refresh(resume, jd, keys[str(jd.id)])
+
+    async def score_one(jd: JobDescription):
+        async with slots:
+            started = time.perf_counter()
+            try:
+                if mode == "fast":
+                    result = local_response(resume, jd, "fast")
+                elif str(jd.id) in hits:
+                    result = {**hits[str(jd.id)], "cached": True}
+                else:
+                    result = await score_with_llm(resume, jd, user_id, None)
+                error = None
+            except Exception as e:
+                result = None
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+
+            return jd, result, error, time.perf_counter() - started
+
+    tasks = [asyncio.create_task(score_one(jd)) for jd in jds]
+    fresh = []
+    stats = {"total": len(jds), "cached": 0, "failed": 0, "persisted": 0}
+    batch_started = time.perf_counter()
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            jd, result, error, elapsed = await next_done
+
+            if result is None:
+                stats["failed"] += 1
+            else:
+                if result["cached"]:
+                    stats["cached"] += 1
+                if result.get("mode") == "llm":
+                    fresh.append(result)
+
+            yield {
+                "type": "result",
+                "jd_id": str(jd.id),
+                "result": result,
+                "error": error,
+                "stats": {
+                    "cached": bool(result and result["cached"]),
+                    "mode": result.get("mode", "llm") if result else None,
+                    "latency_ms": round(elapsed * 1000, 2),
+                },
+            }
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        persist = _persist_in_background(fresh)
+
+    try:
+        stats["persisted"] = await asyncio.shield(persist)
+    except Exception as e:
+        stats["persist_error"] = str(e)
+
+    stats["latency_ms"] = round((time.perf_counter() - batch_started) * 1000, 2)
+    yield {"type": "summary", "stats": stats}
+
+
+async def score_stream(
+    resume: ResumeVersion,
+    jd: JobDescription,
+    user_id: str
+) -> AsyncIterator[tuple[str, object]]:
+    """
+    Streaming LLM scoring. Yields (block, value) as each top-level block
+    of the analysis arrives, then ("result", full response) once it is
+    aggregated, persisted and cached. Cache and analysis store hits
+    replay their blocks immediately. A failure after model blocks were
+    sent raises rather than falling back to the local engine.
+    """
+    resume_hash, jd_hash = _content_hashes(resume, jd)
+    cache_key = make_score_key(user_id, resume_hash, jd_hash)
+
+    cached, fresh = await get_cached_score_async(cache_key)
+    if cached:
+        if not fresh:
+            _schedule_refresh(resume, jd, cache_key)
+        for key in PAYLOAD_KEYS:
+            yield key, cached.get(key)
+        yield "result", {**cached, "cached": True}
+        return
+
+    stored = await get_analysis(resume_hash, jd_hash)
+    if stored is not None:
+        incr("scoring.mode.stored")
+        response = _llm_result_response(
+            resume, jd, _full_analysis(resume, jd, stored), cached=True
+        )
+
+        async with AsyncSessionLocal() as db:
+            await upsert_analysis_results(db, [response])
+        await set_cached_score_async(cache_key, response)
+
+        for key in PAYLOAD_KEYS:
+            yield key, response[key]
+        yield "result", response
+        return
+
+    timeout = bounded(LLM_TIMEOUT_SECONDS)
+
+    if LLM_HYBRID:
+        # the local blocks are ready before the model starts
+        local = _local_analysis(resume, jd)
+        for key in PAYLOAD_KEYS:
+            if key not in JUDGMENT_KEYS:
+                yield key, local[key]
+
+        stream = gemini_ats_judgment_stream(
+            _prompt_resume_text(resume), jd.content, local["skills"], get_jd_profile(jd),
+            timeout=timeout
+        )
+    else:
+        stream = gemini_full_ats_analysis_stream(
+            resume_text=_prompt_resume_text(resume),
+            jd_text=jd.content,
+            jd_profile=get_jd_profile(jd),
+            timeout=timeout
+        )
+
+    llm_output = None
+    # once model blocks have reached the client, a local fallback would
+    # contradict them: fail the stream instead
+    streamed = False
+
+    try:
+        async for block, value in stream:
+            if block == "result":
+                llm_output = value
+            elif not (LLM_HYBRID and block == "suggestions"):
+                # hybrid suggestions are merged with the local ones below
+                streamed = True
+                yield block, value
+
+        gemini_result = _hybrid_result(local, llm_output) if LLM_HYBRID else llm_output
+        response = _llm_result_response(resume, jd, gemini_result)
+    except Exception as e:
+        if streamed:
+            incr("scoring.stream.failed_midway")
+        if streamed or not LLM_FALLBACK_ENABLED:
+            raise
+
+        logger.warning(f"LLM stream failed, using local engine: {e!r}")
+        incr("scoring.mode.fallback")
+        yield "result", local_response(resume, jd, "fallback")
+        return
+    finally:
+        await stream.aclose()
+
+    incr("scoring.mode.llm")
+
+    async with AsyncSessionLocal() as db:
+        await _save_analysis(resume_hash, jd_hash, llm_output, db)
+        await upsert_analysis_results(db, [response])
+    await set_cached_score_async(cache_key, response)
+
+    if LLM_HYBRID:
+        yield "suggestions", response["suggestions"]
+    yield "result", response
@@ -0,0 +1,93 @@
+import math
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# default end-to-end budget for one HTTP request; clients can ask for
+# less with the X-Request-Timeout header (seconds)
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 30))
+DEADLINE_HEADER = b"x-request-timeout"
+
+# long-running streams; each item is bounded by its own LLM timeout and
+# only an explicit X-Request-Timeout caps the whole request (at most
+# REQUEST_DEADLINE_SECONDS, like everywhere else)
+LONG_RUNNING_PATHS = ("/ats/score/batch",)
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+def remaining(default: float | None = None) -> float | None:
+    """
+    Seconds left before the current request's deadline (never negative),
+    or default when no deadline is set.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def bounded(timeout: float) -> float:
+    """
+    timeout capped by whatever is left of the request deadline.
+    """
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """
+    Sets a deadline for the enclosed code. Never extends an outer one.
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _requested_timeout(scope) -> float | None:
+    default = None if scope["path"] in LONG_RUNNING_PATHS else REQUEST_DEADLINE_SECONDS
+
+    for name, value in scope["headers"]:
+        if name.lower() == DEADLINE_HEADER:
+            try:
+                requested = float(value)
+            except ValueError:
+                break
+            # nan, inf, zero and negative values are ignored, not obeyed
+            if not math.isfinite(requested) or requested <= 0:
+                break
+            return min(requested, REQUEST_DEADLINE_SECONDS)
+
+    return default
+
+
+class DeadlineMiddleware:
+    """
+    Starts a deadline for every HTTP request. Plain ASGI rather than
+    BaseHTTPMiddleware so the deadline also covers streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = _requested_timeout(scope)
+        if timeout is None:
+            await self.app(scope, receive, send)
+            return
+
+        with deadline_scope(timeout):
+            await self.app(scope, receive, send)
@@ -0,0 +1,117 @@
+"""
+Per-request cost of get_current_user: the old path (JWT decode plus
+select(User) on every request) against the token / user-existence
+caches, with the number of database queries each one makes.
+
+Users live in a throwaway SQLite database, so query time here is a
+lower bound on a Postgres round trip. Pass --redis-url to include the
+Redis tier; without it the caches fall back to the local tier and the
+database.
+
+Run from backend/:
+    python -m benchmarks.auth_overhead --users 50 --requests 5000
+    python -m benchmarks.auth_overhead --redis-url redis://127.0.0.1:6379/0
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+# app.auth reads these at import time
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+
+async def legacy_get_current_user(token, db):
+    # get_current_user before the caches
+    from fastapi import HTTPException
+    from jose import JWTError, jwt
+    from sqlalchemy import select
+
+    from app.auth.jwt import ALGORITHM, SECRET_KEY
+    from app.db.model import User
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if payload.get("type") != "access":
+            raise HTTPException(status_code=401, detail="Invalid token type")
+        user_id = payload.get("sub")
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    res = await db.execute(select(User).where(User.id == uuid.UUID(user_id)))
+    user = res.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+async def run(args):
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from app.auth.deps import get_current_user
+    from app.auth.jwt import create_access_token
+    from app.db.model import User
+
+    path = os.path.join(tempfile.mkdtemp(), "auth.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+
+    queries = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(*_):
+        nonlocal queries
+        queries += 1
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        users = [User(id=uuid.uuid4(), email=f"user{i}@example.com") for i in range(args.users)]
+        db.add_all(users)
+        await db.commit()
+
+        tokens = [create_access_token({"sub": str(user.id)}) for user in users]
+        requests = [tokens[i % len(tokens)] for i in range(args.requests)]
+
+        async def measure(name, fn, rounds):
+            nonlocal queries
+            queries = 0
+            started = time.perf_counter()
+            for token in rounds:
+                await fn(token, db)
+            elapsed = time.perf_counter() - started
+            print(
+                f"  {name:<26} {elapsed * 1e6 / len(rounds):8.1f} us/request"
+                f"  {queries / len(rounds):5.2f} queries/request"
+            )
+
+        print(f"[auth] {args.users} users, {args.requests} requests")
+        await measure("legacy (decode + select)", legacy_get_current_user, requests)
+        # first request per token: decode and one existence query
+        await measure("cached, first request", lambda t, d: get_current_user(t, d), tokens)
+        await measure("cached, repeat requests", lambda t, d: get_current_user(t, d), requests)
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+    else:
+        # nothing listens here: the Redis tier fails fast and is skipped
+        os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
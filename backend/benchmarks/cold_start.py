@@ -0,0 +1,60 @@
+"""
+Worker cold start: wall time and peak RSS to import the app, with and
+without loading spaCy up front.
+
+  lazy   - `import app.main` only (what a worker now pays before /health)
+  eager  - import + model load, i.e. the old import-time behaviour
+
+Run from backend/:
+    python -m benchmarks.cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app.main
+if sys.argv[1] == "eager":
+    from app.nlp.model import warmup
+    warmup()
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "rss_mb": rss_kb / 1024}))
+"""
+
+
+def run_once(mode: str) -> dict:
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "benchmark"),
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'median s':>10}{'median RSS MB':>16}")
+    for mode in ("eager", "lazy"):
+        runs = [run_once(mode) for _ in range(args.runs)]
+        seconds = statistics.median(r["seconds"] for r in runs)
+        rss = statistics.median(r["rss_mb"] for r in runs)
+        print(f"{mode:<8}{seconds:>10.2f}{rss:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
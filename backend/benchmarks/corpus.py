@@ -0,0 +1,104 @@
+"""
+Deterministic synthetic resume / JD corpus shared by the benchmarks.
+"""
+import random
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "node.js",
+    "django", "fastapi", "flask", "postgresql", "mysql", "mongodb",
+    "redis", "docker", "kubernetes", "aws", "gcp", "azure", "terraform",
+    "machine learning", "deep learning", "data analysis", "pandas",
+    "numpy", "tensorflow", "pytorch", "spark", "kafka", "graphql",
+    "rest apis", "ci/cd", "git", "linux", "microservices", "sql",
+]
+
+ROLES = [
+    "Backend Engineer", "Data Scientist", "Full Stack Developer",
+    "DevOps Engineer", "Machine Learning Engineer",
+]
+
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli"]
+
+BULLETS = [
+    "- Built {a} services using {b} serving 2M requests per day",
+    "- Migrated legacy {a} stack to {b}, cutting costs by 30%",
+    "- Designed data pipelines with {a} and {b} for analytics teams",
+    "- Led a team of 4 engineers delivering {a} features on {b}",
+    "- Improved {a} query latency by 45% through {b} caching",
+]
+
+JD_LINES = [
+    "We are looking for a {role} with strong {a} experience.",
+    "Experience with {a} and {b} is required.",
+    "Must have hands-on knowledge of {a}.",
+    "Familiarity with {a} is a plus.",
+    "You will build and maintain {a} systems deployed on {b}.",
+    "Mandatory: {a}, {b}.",
+    "Nice to have: exposure to {a} or {b}.",
+]
+
+
+def make_resume(rng: random.Random) -> tuple[str, set[str]]:
+    skills = rng.sample(SKILLS, 8)
+    lines = [
+        "John Doe",
+        "john.doe@example.com | +1 555 010 0000 | linkedin.com/in/johndoe",
+        "",
+        "SUMMARY",
+        f"{rng.choice(ROLES)} with {rng.randint(2, 10)} years of experience.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+    ]
+
+    for company in rng.sample(COMPANIES, 2):
+        lines.append(f"{rng.choice(ROLES)} - {company}")
+        for _ in range(3):
+            a, b = rng.sample(skills, 2)
+            lines.append(rng.choice(BULLETS).format(a=a, b=b))
+
+    lines += [
+        "",
+        "PROJECTS",
+        f"- Open source {skills[0]} library with {skills[1]} integration",
+        "",
+        "EDUCATION",
+        "B.Tech in Computer Science, 2018",
+    ]
+
+    return "\n".join(lines), set(skills)
+
+
+def make_jd(rng: random.Random) -> tuple[str, set[str]]:
+    skills = rng.sample(SKILLS, 6)
+    role = rng.choice(ROLES)
+    lines = [f"{role} at {rng.choice(COMPANIES)}", ""]
+
+    for _ in range(10):
+        a, b = rng.sample(skills, 2)
+        lines.append(rng.choice(JD_LINES).format(role=role, a=a, b=b))
+
+    lines += [
+        "",
+        "We are an equal opportunity employer and value diversity.",
+    ]
+
+    return "\n".join(lines), set(skills)
+
+
+def build_corpus(n: int = 200, seed: int = 7) -> list[dict]:
+    """
+    Returns n documents alternating resume / JD:
+    {"kind": "resume" | "jd", "text": str, "skills": set[str]}
+    """
+    rng = random.Random(seed)
+    corpus = []
+
+    for i in range(n):
+        kind = "resume" if i % 2 == 0 else "jd"
+        text, skills = make_resume(rng) if kind == "resume" else make_jd(rng)
+        corpus.append({"kind": kind, "text": text, "skills": skills})
+
+    return corpus
@@ -0,0 +1,88 @@
+"""
+Latency and precision/recall of the skill extraction modes on the
+labelled synthetic corpus, for both the resume and the JD pipeline.
+
+Run from backend/:
+    python -m benchmarks.extraction_modes --docs 200
+"""
+import argparse
+import statistics
+import time
+
+from app.jobs.jd_skill_pipeline import extract_jd_skills
+from app.nlp.candidate_extractor import EXTRACTION_MODES
+from app.nlp.normalizer import normalize
+from app.nlp.resume_skill_pipeline import extract_resume_skills_nlp
+from app.nlp.taxonomy import get_taxonomy
+from app.utils.resume_parser import clean_text
+from benchmarks.corpus import build_corpus
+
+SECTIONS = {
+    "skills": True,
+    "experience": True,
+    "projects": True,
+    "education": True,
+    "certifications": False,
+}
+
+
+def canonical(names) -> set[str]:
+    taxonomy = get_taxonomy()
+    return {taxonomy.canonicalize(normalize(n)) for n in names}
+
+
+def run(mode: str, docs: list[dict]) -> dict:
+    rows = {"resume": [], "jd": []}
+
+    for doc in docs:
+        start = time.perf_counter()
+        if doc["kind"] == "resume":
+            found = extract_resume_skills_nlp(
+                clean_text(doc["text"]), SECTIONS, mode=mode
+            )
+        else:
+            found = extract_jd_skills(doc["text"], mode=mode)
+        elapsed = time.perf_counter() - start
+
+        predicted = canonical(s["name"] for s in found)
+        gold = canonical(doc["skills"])
+        hits = len(predicted & gold)
+
+        rows[doc["kind"]].append({
+            "ms": elapsed * 1000,
+            "precision": hits / len(predicted) if predicted else 0.0,
+            "recall": hits / len(gold) if gold else 0.0,
+        })
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--modes", default=",".join(EXTRACTION_MODES))
+    args = parser.parse_args()
+
+    docs = build_corpus(args.docs)
+
+    print(
+        f"{'mode':<14}{'pipeline':<10}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'precision':>11}{'recall':>9}"
+    )
+    for mode in args.modes.split(","):
+        # first call pays for model / taxonomy loading
+        run(mode, docs[:2])
+
+        for kind, rows in run(mode, docs).items():
+            ms = sorted(r["ms"] for r in rows)
+            p95 = ms[int(len(ms) * 0.95) - 1]
+            precision = statistics.mean(r["precision"] for r in rows)
+            recall = statistics.mean(r["recall"] for r in rows)
+            print(
+                f"{mode:<14}{kind:<10}{statistics.median(ms):>9.2f}"
+                f"{p95:>9.2f}{precision:>11.2f}{recall:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Local stand-in for the Gemini generateContent API, so the whole scoring
+stack can be load-tested offline.
+
+Answers :generateContent and :streamGenerateContent (SSE) with
+schema-valid ATS JSON derived from the resume / JD in the prompt (only
+the blocks the request's responseSchema asks for), after a lognormal
+latency plus a per-input-token prefill and per-output-token decode
+time, and fails a configurable share of calls with 503 / 429 like the
+real service does.
+
+Also implements cachedContents create: a request that references a
+cached prefix skips its prefill time and reports it in
+usageMetadata.cachedContentTokenCount.
+
+Run from backend/:
+    python -m benchmarks.fake_gemini --port 8089 --median 0.6 --sigma 0.5 \\
+        --ms-per-token 5 --ms-per-input-token 0.2 --error-rate 0.02 --rate-limit-rate 0.01
+
+and point the app at it:
+    GEMINI_BASE_URL=http://127.0.0.1:8089 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.nlp.taxonomy import get_taxonomy
+
+SECTIONS = ("skills", "experience", "projects", "education", "certifications")
+
+settings = {
+    "median": 1.2,
+    "sigma": 0.5,
+    "ms_per_token": 0.0,
+    "ms_per_input_token": 0.0,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "stream_chunks": 8,
+    "seed": None,
+}
+
+# headings that end a document in the ATS prompts
+DOCUMENT_ENDS = ("Resume:", "Skills the job weights most:", "Skill check for this resume:")
+
+rng = random.Random()
+app = FastAPI(title="Fake Gemini")
+
+# cachedContents name -> cached prompt text
+cached_contents: dict[str, str] = {}
+
+
+def tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def latency(output: str, uncached_input: str = "") -> float:
+    # time to first token + prefill for the uncached input + decode time
+    # for the output
+    work = (
+        settings["ms_per_input_token"] * tokens(uncached_input)
+        + settings["ms_per_token"] * tokens(output)
+    ) / 1000
+    if settings["median"] <= 0:
+        return work
+    return rng.lognormvariate(math.log(settings["median"]), settings["sigma"]) + work
+
+
+def _section(text: str, start: str) -> str:
+    at = text.find(start)
+    if at == -1:
+        return ""
+    body = text[at + len(start):]
+
+    ends = [body.find(end) for end in DOCUMENT_ENDS if end != start]
+    ends = [end for end in ends if end != -1]
+    return body[:min(ends)] if ends else body
+
+
+def ats_json(prompt: str) -> dict:
+    """
+    Deterministic for a given prompt: skills found in both documents are
+    matched, JD-only skills missing.
+    """
+    resume = _section(prompt, "Resume:")
+    jd = _section(prompt, "Job Description:")
+
+    taxonomy = get_taxonomy()
+    resume_skills = {name for _, name in taxonomy.match(resume)}
+    jd_skills = {name for _, name in taxonomy.match(jd)}
+
+    matched = sorted(resume_skills & jd_skills)
+    missing = sorted(jd_skills - resume_skills)
+    match_percent = round(100 * len(matched) / len(jd_skills), 1) if jd_skills else 0
+
+    lowered = resume.lower()
+    has_numbers = bool(re.search(r"\d+%|\d+x\b|\$\d", resume))
+
+    return {
+        "skills": {
+            "match_percent": match_percent,
+            "matched": matched,
+            "missing": missing,
+            "weak": [],
+        },
+        "experience": {
+            "relevance_score": min(100, 40 + 10 * len(matched)),
+            "experience_suggestion": [] if has_numbers else [
+                "Quantify the impact of your work with numbers."
+            ],
+        },
+        "keywords": {
+            "matched": matched,
+            "weak": [],
+            "missing": missing,
+        },
+        "formatting": {
+            "score": 80,
+            "feedback": [],
+        },
+        "sections": {name: name in lowered for name in SECTIONS},
+        "suggestions": [f"Add experience with {skill}." for skill in missing[:3]],
+    }
+
+
+def _requested_blocks(body: dict, analysis: dict) -> dict:
+    schema = body.get("generationConfig", {}).get("responseSchema") or {}
+    wanted = schema.get("properties")
+    if not wanted:
+        return analysis
+    return {key: value for key, value in analysis.items() if key in wanted}
+
+
+def _text(contents: list | None) -> str:
+    return "".join(
+        part.get("text", "")
+        for content in contents or []
+        for part in content.get("parts", [])
+    )
+
+
+def _candidate(text: str, finish: bool = True, usage: dict | None = None) -> dict:
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finish:
+        candidate["finishReason"] = "STOP"
+    response = {"candidates": [candidate], "modelVersion": "fake-gemini"}
+    if usage:
+        response["usageMetadata"] = usage
+    return response
+
+
+def _injected_error() -> JSONResponse | None:
+    roll = rng.random()
+    if roll < settings["rate_limit_rate"]:
+        code, status = 429, "RESOURCE_EXHAUSTED"
+    elif roll < settings["rate_limit_rate"] + settings["error_rate"]:
+        code, status = 503, "UNAVAILABLE"
+    else:
+        return None
+
+    return JSONResponse(
+        {"error": {"code": code, "message": "fake-gemini injected error", "status": status}},
+        status_code=code
+    )
+
+
+@app.post("/{api_version}/cachedContents")
+async def create_cached_content(api_version: str, request: Request):
+    body = await request.json()
+    name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+    text = _text(body.get("contents"))
+    cached_contents[name] = text
+
+    return {
+        "name": name,
+        "model": body.get("model"),
+        "displayName": body.get("displayName"),
+        "usageMetadata": {"totalTokenCount": tokens(text)},
+    }
+
+
+@app.post("/{api_version}/models/{model_method}")
+async def generate(api_version: str, model_method: str, request: Request):
+    body = await request.json()
+    suffix = _text(body.get("contents"))
+
+    cache_name = body.get("cachedContent")
+    if cache_name and cache_name not in cached_contents:
+        return JSONResponse(
+            {"error": {"code": 404, "message": "CachedContent not found", "status": "NOT_FOUND"}},
+            status_code=404
+        )
+    cached = cached_contents.get(cache_name, "")
+
+    text = json.dumps(_requested_blocks(body, ats_json(cached + suffix)))
+    delay = latency(text, uncached_input=suffix)
+    usage = {
+        "promptTokenCount": tokens(cached + suffix),
+        "cachedContentTokenCount": tokens(cached),
+        "candidatesTokenCount": tokens(text),
+    }
+
+    if model_method.endswith(":streamGenerateContent"):
+        error = _injected_error()
+        if error:
+            await asyncio.sleep(delay / 4)
+            return error
+
+        async def events():
+            n = settings["stream_chunks"]
+            size = -(-len(text) // n)
+            for i in range(n):
+                await asyncio.sleep(delay / n)
+                chunk = text[i * size:(i + 1) * size]
+                last = i == n - 1
+                payload = _candidate(chunk, finish=last, usage=usage if last else None)
+                yield f"data: {json.dumps(payload)}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(delay)
+    return _injected_error() or _candidate(text, usage=usage)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--median", type=float, default=1.2, help="median latency, seconds")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal sigma (tail weight)")
+    parser.add_argument("--ms-per-token", type=float, default=0.0, help="decode time per output token")
+    parser.add_argument("--ms-per-input-token", type=float, default=0.0, help="prefill time per uncached input token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 503s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429s")
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    settings.update(
+        median=args.median,
+        sigma=args.sigma,
+        ms_per_token=args.ms_per_token,
+        ms_per_input_token=args.ms_per_input_token,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        stream_chunks=args.stream_chunks,
+        seed=args.seed,
+    )
+    rng.seed(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
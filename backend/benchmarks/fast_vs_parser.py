@@ -0,0 +1,73 @@
+"""
+Side-by-side of parser-based (noun_chunks) and tagger-only (fast)
+candidate extraction: latency, and recall of the fast mode against the
+parser output on the fixture corpus, after the usual normalize /
+is_valid_candidate filtering.
+
+Run from backend/:
+    python -m benchmarks.fast_vs_parser --docs 200
+"""
+import argparse
+import statistics
+import time
+
+from app.nlp.candidate_extractor import (
+    MODE_FAST,
+    MODE_NOUN_CHUNKS,
+    extract_candidates,
+    extract_candidates_batch
+)
+from app.nlp.normalizer import is_valid_candidate, normalize
+from benchmarks.corpus import build_corpus
+
+
+def filtered(candidates: set[str]) -> set[str]:
+    return {
+        n for n in (normalize(c) for c in candidates) if is_valid_candidate(n)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=200)
+    args = parser.parse_args()
+
+    docs = build_corpus(args.docs)
+    texts = [d["text"] for d in docs]
+
+    # load the model before timing
+    extract_candidates(texts[0])
+
+    results = {}
+    print(f"{'mode':<12}{'p50 ms/doc':>12}{'batch docs/sec':>16}")
+    for mode in (MODE_NOUN_CHUNKS, MODE_FAST):
+        timings, outputs = [], []
+        for text in texts:
+            start = time.perf_counter()
+            outputs.append(filtered(extract_candidates(text, mode=mode)))
+            timings.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        extract_candidates_batch(texts, mode=mode)
+        rate = len(texts) / (time.perf_counter() - start)
+
+        results[mode] = outputs
+        print(f"{mode:<12}{statistics.median(timings):>12.2f}{rate:>16.1f}")
+
+    print()
+    for kind in ("resume", "jd"):
+        recalls, extras = [], []
+        for doc, ref, fast in zip(docs, results[MODE_NOUN_CHUNKS], results[MODE_FAST]):
+            if doc["kind"] != kind or not ref:
+                continue
+            recalls.append(len(ref & fast) / len(ref))
+            extras.append(len(fast - ref))
+
+        print(
+            f"{kind:<8} fast recall vs parser: {statistics.mean(recalls):.2f}"
+            f"  (avg {statistics.mean(extras):.1f} extra candidates/doc)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Full LLM analysis vs. the hybrid pipeline (local skills / keywords /
+sections / formatting + LLM judgment only): input and output tokens per
+score, and, against a running fake Gemini server, latency per score.
+
+Run from backend/:
+    python -m benchmarks.hybrid_prompt --pairs 100
+    python -m benchmarks.fake_gemini --port 8089 --median 0.6 --ms-per-token 5 &
+    python -m benchmarks.hybrid_prompt --pairs 100 --fake-url http://127.0.0.1:8089
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import ats_json
+
+# app.llm modules are imported inside the functions: the backend reads
+# GEMINI_BASE_URL at import time, after main() has set it
+
+
+def fixtures(n: int) -> list[tuple[dict, dict, str]]:
+    corpus = build_corpus(n * 2)
+    resumes = [d for d in corpus if d["kind"] == "resume"]
+    jds = [d for d in corpus if d["kind"] == "jd"]
+
+    pairs = []
+    for resume, jd in zip(resumes, jds):
+        parsed = {
+            "raw_text": resume["text"],
+            "cleaned_text": resume["text"].lower(),
+            "skills": sorted(resume["skills"]),
+            "formatting_violations": [],
+            "sections_detected": {},
+        }
+        analyzed = {
+            "skills": [{"name": s, "confidence": 0.8} for s in sorted(jd["skills"])]
+        }
+        pairs.append((parsed, analyzed, jd["text"]))
+    return pairs
+
+
+def token_report(pairs):
+    from app.llm.gemini import _build_ats_prompt, _build_judgment_prompt
+    from app.llm.prompt_builder import estimate_tokens
+    from app.llm.schema import ATSJudgment
+    from app.scoring.local_engine import local_ats_analysis
+
+    rows = {"full": ([], []), "hybrid": ([], [])}
+    for parsed, analyzed, jd_text in pairs:
+        local = local_ats_analysis(parsed, analyzed)
+
+        full_prompt, _ = _build_ats_prompt(parsed["raw_text"], jd_text)
+        full_out = json.dumps(ats_json(full_prompt))
+        rows["full"][0].append(estimate_tokens(full_prompt))
+        rows["full"][1].append(estimate_tokens(full_out))
+
+        judgment_prompt, _ = _build_judgment_prompt(parsed["raw_text"], jd_text, local["skills"])
+        judgment_out = json.dumps({
+            k: v for k, v in ats_json(judgment_prompt).items()
+            if k in ATSJudgment.model_fields
+        })
+        rows["hybrid"][0].append(estimate_tokens(judgment_prompt))
+        rows["hybrid"][1].append(estimate_tokens(judgment_out))
+
+    for name, (inputs, outputs) in rows.items():
+        print(
+            f"  {name:<7} input tokens {statistics.mean(inputs):7.0f}"
+            f"  output tokens {statistics.mean(outputs):6.0f}"
+        )
+
+
+async def latency_report(pairs, concurrency: int):
+    from app.llm.gemini import gemini_ats_judgment_async, gemini_full_ats_analysis_async
+    from app.scoring.local_engine import local_ats_analysis
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def full(parsed, analyzed, jd_text):
+        await gemini_full_ats_analysis_async(parsed["raw_text"], jd_text)
+
+    async def hybrid(parsed, analyzed, jd_text):
+        local = local_ats_analysis(parsed, analyzed)
+        await gemini_ats_judgment_async(parsed["raw_text"], jd_text, local["skills"])
+
+    for name, fn in (("full", full), ("hybrid", hybrid)):
+        latencies = []
+
+        async def one(pair):
+            async with slots:
+                started = time.perf_counter()
+                await fn(*pair)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(pair) for pair in pairs))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        print(
+            f"  {name:<7} p50 {latencies[len(latencies) // 2] * 1000:6.0f} ms"
+            f"  p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.0f} ms"
+            f"  {len(pairs) / elapsed:6.1f} scores/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--fake-url", default=None)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.fake_url:
+        os.environ["GEMINI_BASE_URL"] = args.fake_url
+
+    pairs = fixtures(args.pairs)
+
+    print(f"[tokens] {len(pairs)} resume / JD pairs (output tokens as the fake server answers)")
+    token_report(pairs)
+
+    if args.fake_url:
+        print(f"[latency] against {args.fake_url}, concurrency {args.concurrency}")
+        asyncio.run(latency_report(pairs, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
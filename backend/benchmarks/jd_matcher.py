@@ -0,0 +1,74 @@
+"""
+Per-candidate regex scoring vs. the single-pass scan_skills matcher on
+long JDs with many candidates. Also checks both agree exactly.
+
+Run from backend/:
+    python -m benchmarks.jd_matcher --jds 50
+"""
+import argparse
+import random
+import time
+
+from app.jobs.jd_skill_pipeline import (
+    count_occurrences,
+    is_required_skill,
+    scan_skills
+)
+from app.nlp.normalizer import is_valid_candidate, normalize
+from benchmarks.corpus import build_corpus
+
+
+def candidates_for(text: str, rng: random.Random, n: int) -> list[str]:
+    # stand-in for noun chunks: up to n random 1-3 word windows of the JD
+    words = text.split()
+    cands = set()
+    for _ in range(n):
+        i = rng.randrange(len(words))
+        cands.add(normalize(" ".join(words[i:i + rng.randint(1, 3)])))
+    return [c for c in cands if is_valid_candidate(c)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jds", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    docs = [d for d in build_corpus(args.jds * 2) if d["kind"] == "jd"]
+    jobs = []
+    for doc in docs:
+        # concatenate postings to get realistically long JDs
+        text = "\n".join([doc["text"]] * args.repeat).lower()
+        jobs.append((text, candidates_for(text, rng, args.candidates)))
+
+    start = time.perf_counter()
+    legacy = [
+        {
+            c: (count_occurrences(text, c), is_required_skill(text, c))
+            for c in cands
+        }
+        for text, cands in jobs
+    ]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanned = [scan_skills(text, cands) for text, cands in jobs]
+    scan_s = time.perf_counter() - start
+
+    for old, new in zip(legacy, scanned):
+        for cand, (count, required) in old.items():
+            assert new[cand]["count"] == count, cand
+            assert new[cand]["required"] == required, cand
+
+    avg_len = sum(len(t) for t, _ in jobs) / len(jobs)
+    avg_cands = sum(len(c) for _, c in jobs) / len(jobs)
+    print(f"{len(jobs)} JDs, avg {avg_len:.0f} chars, {avg_cands:.0f} candidates")
+    print(f"per-candidate regex: {legacy_s * 1000 / len(jobs):8.2f} ms/JD")
+    print(f"single-pass scan:    {scan_s * 1000 / len(jobs):8.2f} ms/JD")
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Many resumes against one JD: the per-call JD work and prompt tokens with
+and without the JD profile + prompt prefix cache.
+
+  baseline  JD compacted for every resume, whole prompt sent every call
+  cached    JD profile built once, JD prefix sent once and referenced by
+            its context cache handle afterwards
+
+Reports JD-side prep time per resume, uncached input tokens per call and,
+against a running fake Gemini server, latency per score.
+
+Run from backend/:
+    python -m benchmarks.fake_gemini --port 8089 --median 0.3 --ms-per-token 5 --ms-per-input-token 0.5 &
+    python -m benchmarks.jd_prefix_cache --resumes 200 --fake-url http://127.0.0.1:8089
+
+--min-tokens 0 because the synthetic JDs are shorter than Gemini's
+1024-token minimum for explicit caches.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+from benchmarks.corpus import build_corpus
+
+# app.llm modules are imported inside the functions: the backend reads
+# GEMINI_BASE_URL at import time, after main() has set it
+
+
+def fixtures(n: int, glue: int):
+    corpus = build_corpus(n * 2 + glue * 2)
+    resumes = [d for d in corpus if d["kind"] == "resume"][:n]
+    jds = [d for d in corpus if d["kind"] == "jd"][:glue]
+
+    jd_text = "\n\n".join(d["text"] for d in jds)
+    jd_skills = sorted(set().union(*(d["skills"] for d in jds)))
+    jd = SimpleNamespace(
+        id=uuid.uuid4(),
+        content=jd_text,
+        analyzed_data={"skills": [{"name": s, "confidence": 0.8} for s in jd_skills]},
+    )
+
+    parsed = [
+        {
+            "raw_text": r["text"],
+            "cleaned_text": r["text"].lower(),
+            "skills": sorted(r["skills"]),
+            "formatting_violations": [],
+            "sections_detected": {},
+        }
+        for r in resumes
+    ]
+    return jd, parsed
+
+
+def prep_report(jd, parsed):
+    from app.jobs.jd_profile import build_jd_profile, get_jd_profile, keyword_weights
+    from app.llm.gemini import _build_judgment_prompt
+    from app.scoring.local_engine import local_ats_analysis
+
+    def baseline(resume):
+        local = local_ats_analysis(resume, jd.analyzed_data)
+        return _build_judgment_prompt(resume["raw_text"], jd.content, local["skills"])
+
+    def cached(resume):
+        profile = get_jd_profile(jd)
+        local = local_ats_analysis(resume, jd.analyzed_data, keyword_weights(profile))
+        return _build_judgment_prompt(resume["raw_text"], jd.content, local["skills"], profile)
+
+    for name, fn in (("baseline", baseline), ("cached", cached)):
+        started = time.perf_counter()
+        prompts = [fn(resume) for resume in parsed]
+        per_resume = (time.perf_counter() - started) * 1000 / len(parsed)
+
+        prefix_tokens = statistics.mean(len(prefix) / 4 for _, prefix in prompts)
+        prompt_tokens = statistics.mean(len(prompt) / 4 for prompt, _ in prompts)
+        print(
+            f"  {name:<9} prep {per_resume:6.2f} ms/resume"
+            f"  prompt {prompt_tokens:5.0f} tokens, JD prefix {prefix_tokens:5.0f}"
+        )
+
+    started = time.perf_counter()
+    build_jd_profile(jd.content, jd.analyzed_data)
+    print(f"  profile build (once per JD) {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+async def latency_report(jd, parsed, concurrency: int):
+    from app.jobs.jd_profile import get_jd_profile, keyword_weights
+    from app.llm.context_cache import prefix_cache
+    from app.llm.gemini import gemini_ats_judgment_async
+    from app.metrics.registry import _histograms
+    from app.scoring.local_engine import local_ats_analysis
+
+    slots = asyncio.Semaphore(concurrency)
+
+    for name, use_cache in (("baseline", False), ("cached", True)):
+        prefix_cache.enabled = use_cache
+        for metric in ("llm.input_tokens", "llm.cached_input_tokens"):
+            _histograms.pop(metric, None)
+        latencies = []
+
+        async def one(resume):
+            async with slots:
+                started = time.perf_counter()
+                if use_cache:
+                    profile = get_jd_profile(jd)
+                    local = local_ats_analysis(resume, jd.analyzed_data, keyword_weights(profile))
+                else:
+                    profile = None
+                    local = local_ats_analysis(resume, jd.analyzed_data)
+                await gemini_ats_judgment_async(
+                    resume["raw_text"], jd.content, local["skills"], profile
+                )
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(resume) for resume in parsed))
+        elapsed = time.perf_counter() - started
+
+        sent = statistics.mean(_histograms["llm.input_tokens"])
+        cached = statistics.mean(_histograms["llm.cached_input_tokens"])
+        latencies.sort()
+        print(
+            f"  {name:<9} p50 {latencies[len(latencies) // 2] * 1000:6.0f} ms"
+            f"  p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.0f} ms"
+            f"  {len(parsed) / elapsed:6.1f} scores/s"
+            f"  uncached input {sent - cached:5.0f} of {sent:5.0f} tokens"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--glue", type=int, default=3, help="JDs glued into one long posting")
+    parser.add_argument("--fake-url", default=None)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--min-tokens", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.fake_url:
+        os.environ["GEMINI_BASE_URL"] = args.fake_url
+
+    from app.llm.context_cache import prefix_cache
+    prefix_cache.min_tokens = args.min_tokens
+
+    jd, parsed = fixtures(args.resumes, args.glue)
+
+    print(f"[prep] {len(parsed)} resumes against one JD")
+    prep_report(jd, parsed)
+
+    if args.fake_url:
+        print(f"[latency] against {args.fake_url}, concurrency {args.concurrency}")
+        asyncio.run(latency_report(jd, parsed, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
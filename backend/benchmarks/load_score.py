@@ -0,0 +1,124 @@
+"""
+End-to-end load test for POST /ats/score: N concurrent clients for a
+fixed number of requests (or seconds), reporting throughput, latency
+percentiles, status codes and how each score was produced
+(llm / cached / fallback / fast).
+
+Start the stack against the fake model first:
+    python -m benchmarks.fake_gemini --port 8089 --median 1.2 --sigma 0.6
+    GEMINI_BASE_URL=http://127.0.0.1:8089 uvicorn app.main:app --port 8000
+
+then, from backend/ (user ids need a parsed resume and an analyzed JD;
+tokens are minted with the app's SECRET_KEY / ALGORITHM):
+    python -m benchmarks.load_score --user-id <uuid> --concurrency 32 --requests 2000
+
+Repeat requests for one user hit the per-user score cache; pass several
+--user-id values (or --mode fast) to shape the mix.
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from collections import Counter
+
+import httpx
+
+from app.auth.jwt import create_access_token
+from app.metrics.registry import _pick
+
+
+def _bearer(args, users) -> str:
+    if args.token:
+        return args.token
+    # access tokens are short-lived, mint one per request
+    return create_access_token({"sub": next(users)})
+
+
+async def main_async(args):
+    users = itertools.cycle(args.user_id or [""])
+    latencies = []
+    statuses = Counter()
+    sources = Counter()
+    issued = 0
+    stop_at = time.monotonic() + args.seconds if args.seconds else None
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+
+        async def worker():
+            nonlocal issued
+            while True:
+                if stop_at is not None:
+                    if time.monotonic() >= stop_at:
+                        return
+                elif issued >= args.requests:
+                    return
+                issued += 1
+
+                headers = {"Authorization": f"Bearer {_bearer(args, users)}"}
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/ats/score",
+                        params={"mode": args.mode},
+                        headers=headers
+                    )
+                    statuses[response.status_code] += 1
+                    if response.status_code == 200:
+                        body = response.json()
+                        sources["cached" if body.get("cached") else body.get("mode", "llm")] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        try:
+            metrics = (await client.get("/metrics")).json()
+        except (httpx.HTTPError, ValueError):
+            metrics = None
+
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.2f}s, concurrency {args.concurrency}")
+    print(f"  throughput   {len(latencies) / elapsed:.1f} req/s")
+    print(
+        "  latency ms   "
+        + "  ".join(
+            f"{label} {_pick(latencies, q) * 1000:.0f}"
+            for label, q in (("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99))
+        )
+        + f"  max {latencies[-1] * 1000:.0f}"
+    )
+    print(f"  status       {dict(statuses)}")
+    print(f"  source       {dict(sources)}")
+
+    if metrics:
+        histograms = metrics.get("histograms", {})
+        for name in ("llm.call_seconds", "llm.queue_wait_seconds"):
+            if name in histograms:
+                print(f"  {name:<24} {histograms[name]}")
+        gauges = metrics.get("gauges", {})
+        print(f"  breaker state {gauges.get('llm.breaker.state')}  hedge win rate {gauges.get('llm.hedge.win_rate')}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user-id", action="append", help="repeatable")
+    parser.add_argument("--token", help="use a fixed bearer token instead of minting")
+    parser.add_argument("--mode", choices=("llm", "fast"), default="llm")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=None, help="run for a duration instead")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    if not args.token and not args.user_id:
+        parser.error("pass --user-id (one or more) or --token")
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
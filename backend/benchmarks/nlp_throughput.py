@@ -0,0 +1,53 @@
+"""
+Throughput of candidate extraction (docs/sec) vs. batch size and
+process count.
+
+Run from backend/:
+    python -m benchmarks.nlp_throughput --docs 400
+"""
+import argparse
+import time
+
+from app.nlp.candidate_extractor import (
+    extract_candidates,
+    extract_candidates_batch
+)
+from benchmarks.corpus import build_corpus
+
+
+def bench_sequential(texts: list[str]) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        extract_candidates(text)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def bench_batch(texts: list[str], n_process: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    extract_candidates_batch(texts, n_process=n_process, batch_size=batch_size)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=400)
+    parser.add_argument("--batch-sizes", default="1,8,32,128")
+    parser.add_argument("--processes", default="1,2,4")
+    args = parser.parse_args()
+
+    texts = [doc["text"] for doc in build_corpus(args.docs)]
+
+    # warm the model so the first row doesn't pay for lazy init
+    extract_candidates(texts[0])
+
+    print(f"{'mode':<12}{'n_process':>10}{'batch':>8}{'docs/sec':>12}")
+    print(f"{'sequential':<12}{1:>10}{1:>8}{bench_sequential(texts):>12.1f}")
+
+    for n_process in [int(p) for p in args.processes.split(",")]:
+        for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+            rate = bench_batch(texts, n_process, batch_size)
+            print(f"{'pipe':<12}{n_process:>10}{batch_size:>8}{rate:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
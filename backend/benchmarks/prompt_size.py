@@ -0,0 +1,92 @@
+"""
+Prompt size with the legacy [:5000] truncation vs. the section-aware
+prompt builder, on short and long (several postings / resumes glued
+together) documents. Also reports how many of the gold skills survive
+in the text actually sent to the model.
+
+Run from backend/:
+    python -m benchmarks.prompt_size --pairs 100 --long 4
+"""
+import argparse
+import statistics
+import time
+
+from app.llm.prompt_builder import build_prompt, estimate_tokens
+from app.llm.prompts import ATS_ANALYSIS_PROMPT
+from benchmarks.corpus import build_corpus
+
+
+def legacy_prompt(resume_text: str, jd_text: str) -> str:
+    return ATS_ANALYSIS_PROMPT \
+        .replace("<<<RESUME_TEXT>>>", resume_text[:5000]) \
+        .replace("<<<JD_TEXT>>>", jd_text[:5000])
+
+
+def skill_recall(prompt: str, skills: set[str]) -> float:
+    lowered = prompt.lower()
+    return sum(1 for s in skills if s in lowered) / len(skills)
+
+
+def pairs_for(corpus: list[dict], n: int, glue: int) -> list[tuple]:
+    resumes = [d for d in corpus if d["kind"] == "resume"]
+    jds = [d for d in corpus if d["kind"] == "jd"]
+    pairs = []
+
+    for i in range(n):
+        r = [resumes[(i + k) % len(resumes)] for k in range(glue)]
+        j = [jds[(i + k) % len(jds)] for k in range(glue)]
+        pairs.append((
+            "\n\n".join(d["text"] for d in r),
+            "\n\n".join(d["text"] for d in j),
+            set().union(*(d["skills"] for d in r)),
+        ))
+
+    return pairs
+
+
+def report(label: str, pairs: list[tuple]):
+    legacy_tokens, new_tokens = [], []
+    legacy_recall, new_recall = [], []
+
+    start = time.perf_counter()
+    for resume, jd, skills in pairs:
+        prompt, _ = build_prompt(ATS_ANALYSIS_PROMPT, resume, jd)
+        new_tokens.append(estimate_tokens(prompt))
+        new_recall.append(skill_recall(prompt, skills))
+    build_ms = (time.perf_counter() - start) * 1000 / len(pairs)
+
+    for resume, jd, skills in pairs:
+        prompt = legacy_prompt(resume, jd)
+        legacy_tokens.append(estimate_tokens(prompt))
+        legacy_recall.append(skill_recall(prompt, skills))
+
+    legacy_mean = statistics.mean(legacy_tokens)
+    new_mean = statistics.mean(new_tokens)
+
+    print(f"[{label}] {len(pairs)} pairs")
+    print(
+        f"  legacy   tokens mean {legacy_mean:7.0f}  max {max(legacy_tokens):6d}"
+        f"  skill recall {statistics.mean(legacy_recall):.2%}"
+    )
+    print(
+        f"  compact  tokens mean {new_mean:7.0f}  max {max(new_tokens):6d}"
+        f"  skill recall {statistics.mean(new_recall):.2%}"
+        f"  build {build_ms:.2f} ms/prompt"
+    )
+    print(f"  reduction {1 - new_mean / legacy_mean:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--long", type=int, default=4)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.pairs * 2 + args.long * 2)
+
+    report("short", pairs_for(corpus, args.pairs, 1))
+    report(f"long x{args.long}", pairs_for(corpus, args.pairs, args.long))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Load test for single-flight scoring: fires N concurrent identical
+score_with_llm calls, spread over simulated workers, against a fake
+model backend, and asserts that exactly one LLM call was made.
+
+Each simulated worker has its own in-process flight table; they share
+the score cache and lock in the Redis from REDIS_URL / REDIS_HOST.
+Without a reachable Redis only the in-process path is exercised (one
+worker). No database is used: the analysis store lookup is a miss.
+
+Run from backend/:
+    python -m benchmarks.score_coalescing --requests 200 --workers 4
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import time
+import uuid
+from types import SimpleNamespace
+from typing import AsyncIterator
+
+import redis
+
+from app.cache.redis import get_async_redis
+from app.cache.single_flight import SingleFlight
+from app.llm.backends import LLMBackend, set_backend
+from app.scoring import service
+
+RESUME_TEXT = """Jane Doe
+Experience
+Built python services and kafka pipelines on docker at Acme.
+Skills
+Python, Kafka, Docker
+"""
+
+JD_TEXT = "Backend engineer. Requirements: python, kafka, docker, kubernetes."
+
+# a complete analysis; in hybrid mode the judgment schema keeps only
+# the experience and suggestions blocks
+LLM_OUTPUT = {
+    "skills": {"match_percent": 75, "matched": ["python", "kafka", "docker"], "missing": ["kubernetes"], "weak": []},
+    "experience": {"relevance_score": 80, "experience_suggestion": ["Quantify the pipeline work"]},
+    "keywords": {"matched": ["python", "kafka", "docker"], "weak": [], "missing": ["kubernetes"]},
+    "formatting": {"score": 90, "feedback": []},
+    "sections": {"skills": True, "experience": True, "projects": False, "education": False, "certifications": False},
+    "suggestions": ["Mention kubernetes if you have used it"],
+}
+
+
+class CountingBackend(LLMBackend):
+    """
+    Answers every prompt with LLM_OUTPUT after llm_seconds and counts
+    the calls.
+    """
+
+    name = "counting"
+
+    def __init__(self, llm_seconds: float):
+        self.llm_seconds = llm_seconds
+        self.calls = 0
+
+    def generate(self, prompt, timeout=None, schema=None, prefix=None) -> str:
+        self.calls += 1
+        time.sleep(self.llm_seconds)
+        return json.dumps(LLM_OUTPUT)
+
+    async def generate_async(self, prompt, schema=None, prefix=None) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.llm_seconds)
+        return json.dumps(LLM_OUTPUT)
+
+    async def generate_stream(self, prompt, schema=None, prefix=None) -> AsyncIterator[str]:
+        yield await self.generate_async(prompt, schema, prefix)
+
+
+current_worker: contextvars.ContextVar[int] = contextvars.ContextVar("current_worker")
+
+
+class WorkerFlights:
+    """
+    Stands in for service.score_flight: routes each call to the flight
+    table of the simulated worker it runs on.
+    """
+
+    def __init__(self, workers: int):
+        # same name -> same Redis lock, separate in-process flight tables
+        self.flights = [SingleFlight("score") for _ in range(workers)]
+
+    def do(self, key, fn, lookup):
+        return self.flights[current_worker.get()].do(key, fn, lookup)
+
+
+def make_pair():
+    # fresh content hashes, so the first request is a cache miss
+    run = uuid.uuid4().hex
+    resume = SimpleNamespace(
+        id=uuid.uuid4(),
+        content_hash=f"bench-resume-{run}",
+        parsed_data={
+            "raw_text": RESUME_TEXT,
+            "cleaned_text": " ".join(RESUME_TEXT.split()).lower(),
+            "skills": ["python", "kafka", "docker"],
+            "formatting_violations": [],
+            "sections_detected": {},
+        },
+    )
+    jd = SimpleNamespace(
+        id=uuid.uuid4(),
+        content=JD_TEXT,
+        content_hash=f"bench-jd-{run}",
+        analyzed_data={"skills": [
+            {"name": s, "confidence": 0.9} for s in ("python", "kafka", "docker", "kubernetes")
+        ]},
+    )
+    return resume, jd
+
+
+async def main_async(args):
+    try:
+        await get_async_redis().ping()
+        workers = args.workers
+    except (redis.RedisError, OSError):
+        print("Redis unreachable, testing the in-process path only")
+        workers = 1
+
+    backend = CountingBackend(args.llm_seconds)
+    set_backend(backend)
+    service.score_flight = WorkerFlights(workers)
+
+    resume, jd = make_pair()
+    user_id = str(uuid.uuid4())
+
+    async def one(i: int) -> dict:
+        current_worker.set(i % workers)
+        return await service.score_with_llm(resume, jd, user_id, None)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[one(i) for i in range(args.requests)])
+    elapsed = time.perf_counter() - start
+
+    assert all(r["mode"] == "llm" for r in results), "some requests fell back to the local engine"
+    assert len({r["final_ats_score"] for r in results}) == 1
+    assert backend.calls == 1, f"expected 1 LLM call, got {backend.calls}"
+
+    print(
+        f"{args.requests} requests over {workers} worker(s): "
+        f"{backend.calls} LLM call, {elapsed:.2f}s total"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--llm-seconds", type=float, default=0.5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Cached score payloads under each serializer setting: stored size and
+encode / decode time per entry, against the old json.dumps(default=str)
+text format.
+
+Payloads are full /ats/score responses (local blocks plus the fake
+model's judgment) for synthetic resume / JD pairs. msgpack and zstd rows
+are skipped unless those packages are installed.
+
+Run from backend/:
+    python -m benchmarks.score_payload_codec --pairs 200
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_gemini import ats_json
+
+SETTINGS = [
+    ("orjson", "none"),
+    ("orjson", "zlib"),
+    ("orjson", "zstd"),
+    ("msgpack", "none"),
+    ("msgpack", "zlib"),
+    ("msgpack", "zstd"),
+]
+
+
+def payloads(n: int) -> list[dict]:
+    from app.llm.gemini import _build_ats_prompt
+    from app.scoring.local_engine import local_ats_analysis
+    from app.scoring.service import _hybrid_result, _llm_result_response
+
+    corpus = build_corpus(n * 2)
+    resumes = [d for d in corpus if d["kind"] == "resume"]
+    jds = [d for d in corpus if d["kind"] == "jd"]
+
+    out = []
+    for resume, jd in zip(resumes, jds):
+        parsed = {
+            "raw_text": resume["text"],
+            "cleaned_text": resume["text"].lower(),
+            "skills": sorted(resume["skills"]),
+            "formatting_violations": [],
+            "sections_detected": {},
+        }
+        analyzed = {
+            "skills": [{"name": s, "confidence": 0.8} for s in sorted(jd["skills"])]
+        }
+
+        local = local_ats_analysis(parsed, analyzed)
+        prompt, _ = _build_ats_prompt(resume["text"], jd["text"])
+        out.append(_llm_result_response(
+            SimpleNamespace(id=uuid.uuid4()),
+            SimpleNamespace(id=uuid.uuid4()),
+            _hybrid_result(local, ats_json(prompt))
+        ))
+    return out
+
+
+def measure(name: str, dumps, loads, values: list[dict], rounds: int, baseline: float | None):
+    encoded = [dumps(value) for value in values]
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for value in values:
+            dumps(value)
+    encode_us = (time.perf_counter() - started) * 1e6 / (rounds * len(values))
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for data in encoded:
+            loads(data)
+    decode_us = (time.perf_counter() - started) * 1e6 / (rounds * len(values))
+
+    size = statistics.mean(len(data) for data in encoded)
+    saved = f"{100 * (1 - size / baseline):5.1f}%" if baseline else "    -"
+    print(
+        f"  {name:<16} {size:7.0f} B  ({saved} smaller)"
+        f"  encode {encode_us:6.1f} us  decode {decode_us:6.1f} us"
+        f"  {size * 100_000 / 2**20:6.1f} MiB per 100k entries"
+    )
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    from app.cache import serializer as codecs
+    from app.cache.serializer import Serializer
+
+    values = payloads(args.pairs)
+    # decode is measured on what Redis returns: bytes
+    for value in values:
+        assert Serializer().loads(Serializer().dumps(value)) == json.loads(json.dumps(value, default=str))
+
+    print(f"[codec] {len(values)} score payloads, {args.rounds} rounds")
+    baseline = measure(
+        "json (legacy)",
+        lambda value: json.dumps(value, default=str).encode("utf-8"),
+        json.loads,
+        values,
+        args.rounds,
+        None
+    )
+
+    for codec, compression in SETTINGS:
+        if codec == "msgpack" and codecs.msgpack is None:
+            continue
+        if compression == "zstd" and codecs.zstandard is None:
+            continue
+
+        serializer = Serializer(codec, compression, compress_min_bytes=0)
+        measure(
+            f"{codec}+{compression}",
+            serializer.dumps,
+            serializer.loads,
+            values,
+            args.rounds,
+            baseline
+        )
+
+
+if __name__ == "__main__":
+    main()
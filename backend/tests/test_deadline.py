@@ -0,0 +1,20 @@
+import pytest
+
+from app.utils.deadline import REQUEST_DEADLINE_SECONDS, _requested_timeout
+
+
+def _scope(path="/ats/score", timeout=None):
+    headers = [(b"x-request-timeout", timeout)] if timeout is not None else []
+    return {"path": path, "headers": headers}
+
+
+@pytest.mark.parametrize("value", [b"nan", b"inf", b"-inf", b"-5", b"0", b"soon"])
+def test_invalid_timeout_header_is_ignored(value):
+    assert _requested_timeout(_scope(timeout=value)) == REQUEST_DEADLINE_SECONDS
+    assert _requested_timeout(_scope("/ats/score/batch", value)) is None
+
+
+def test_timeout_header_is_clamped():
+    assert _requested_timeout(_scope(timeout=b"5")) == 5
+    assert _requested_timeout(_scope(timeout=b"1e9")) == REQUEST_DEADLINE_SECONDS
+    assert _requested_timeout(_scope("/ats/score/batch", b"1e9")) == REQUEST_DEADLINE_SECONDS
@@ -0,0 +1,82 @@
+from app.nlp.document_index import DocumentIndex, tokenize
+from app.scoring.local_engine import local_ats_analysis
+
+
+def test_slash_and_hyphen_compounds_are_split():
+    assert tokenize("python/django react-native") == ["python", "django", "react", "native"]
+
+
+def test_compound_parts_and_joined_form_are_counted():
+    index = DocumentIndex("Built python/django services and react-native apps with CI/CD")
+
+    assert index.count("python") == 1
+    assert index.count("django") == 1
+    assert index.count("react") == 1
+    assert index.count("ci cd") == 1
+    # names normalized with the separator dropped still match
+    assert index.count("cicd") == 1
+    assert index.count("pythondjango") == 1
+
+
+def test_local_engine_matches_skills_inside_compounds():
+    parsed = {
+        "cleaned_text": "experience built python/django apis and react-native apps",
+        "skills": [],
+        "formatting_violations": [],
+        "sections_detected": {},
+    }
+    analyzed = {"skills": [{"name": "python", "confidence": 0.9}, {"name": "react", "confidence": 0.9}]}
+
+    skills = local_ats_analysis(parsed, analyzed)["skills"]
+
+    # mentioned in the text, not in the parsed skill list
+    assert set(skills["weak"]) == {"python", "react"}
+    assert skills["missing"] == []
+
+
+RAW_RESUME = """Jane Doe
+Summary
+Backend engineer who gained experience in kafka while studying.
+Skills
+Python, Kafka, Docker
+Work Experience
+Built python services on docker at Acme.
+Education
+BSc Computer Science
+"""
+
+
+def _cleaned(raw):
+    return " ".join(line.strip() for line in raw.splitlines() if line.strip()).lower()
+
+
+def test_heading_words_in_sentences_do_not_open_sections():
+    index = DocumentIndex(_cleaned(RAW_RESUME), RAW_RESUME)
+
+    assert set(index.section_spans) == {"skills", "experience", "education"}
+    # the summary sentence mentioning "experience" is not the section
+    assert index.count_in_section("kafka", "experience") == 0
+    assert index.count_in_section("python", "experience") == 1
+    assert index.count_in_section("kafka", "skills") == 1
+
+
+def test_flattened_text_has_no_sections_without_layout():
+    assert DocumentIndex(_cleaned(RAW_RESUME)).section_spans == {}
+
+
+def test_local_engine_finds_sections_from_raw_text():
+    parsed = {
+        "raw_text": RAW_RESUME,
+        "cleaned_text": _cleaned(RAW_RESUME),
+        "skills": ["python", "kafka", "docker"],
+        "formatting_violations": [],
+        "sections_detected": {},
+    }
+    analyzed = {"skills": [{"name": "kafka", "confidence": 0.9}, {"name": "docker", "confidence": 0.9}]}
+
+    analysis = local_ats_analysis(parsed, analyzed)
+
+    assert analysis["sections"]["experience"] is True
+    assert analysis["sections"]["projects"] is False
+    # kafka is only in the summary and skills list, not in experience
+    assert analysis["experience"]["relevance_score"] == 50
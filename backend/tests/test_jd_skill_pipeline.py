@@ -0,0 +1,44 @@
+from app.jobs.jd_skill_pipeline import _score_jd_candidates
+from app.nlp.candidate_extractor import MODE_GAZETTEER, extract_candidates
+
+
+def _score(text):
+    candidates = extract_candidates(text, mode=MODE_GAZETTEER)
+    return {
+        skill["name"]: skill["confidence"]
+        for skill in _score_jd_candidates(candidates, text, MODE_GAZETTEER)
+    }
+
+
+def test_gazetteer_scores_dotted_and_slashed_skills():
+    skills = _score(
+        "We need Node.js and React.js experience. Node.js is required. "
+        "We ship with CI/CD, CI/CD is a must. Python required. Kubernetes (k8s) mandatory"
+    )
+
+    assert set(skills) == {"nodejs", "react", "cicd", "python", "kubernetes"}
+    # repeated and required
+    assert skills["nodejs"] == 0.9
+    assert skills["cicd"] == 0.9
+    # alias counts under the canonical name
+    assert skills["kubernetes"] == 0.9
+
+
+def test_gazetteer_drops_single_optional_mention():
+    skills = _score(
+        "Familiarity with Node.js is a plus for this role on our platform team. "
+        "Python required."
+    )
+
+    assert "nodejs" not in skills
+    assert skills["python"] == 0.6
+
+
+def test_gazetteer_required_keywords_match_whole_words():
+    skills = _score(
+        "Python for our mustard sauce analytics, requirement-free and essentially optional. "
+        "Kubernetes experience is a must."
+    )
+
+    assert "python" not in skills
+    assert skills["kubernetes"] == 0.6
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from app.llm.gemini import _parse_ats_output
+from app.llm.schema import ATSJudgment
+
+ANALYSIS = {
+    "skills": {"match_percent": 60, "matched": ["python"], "missing": [], "weak": []},
+    "experience": {"relevance_score": 7, "experience_suggestion": []},
+    "keywords": {"matched": ["python"], "weak": [], "missing": []},
+    "sections": {"skills": True, "experience": True},
+    "suggestions": ["Quantify results"],
+}
+
+
+def test_missing_fields_are_repaired():
+    data = {**ANALYSIS, "keywords": {"matched": ["python"]}}
+
+    analysis = _parse_ats_output(json.dumps(data))
+
+    assert analysis["keywords"] == {"matched": ["python"], "weak": [], "missing": []}
+    assert analysis["skills"]["match_percent"] == 60
+
+
+@pytest.mark.parametrize("block", ["skills", "experience", "keywords", "sections", "suggestions"])
+def test_missing_block_is_a_parse_failure(block):
+    data = {key: value for key, value in ANALYSIS.items() if key != block}
+
+    with pytest.raises(ValueError, match=block):
+        _parse_ats_output(json.dumps(data))
+
+
+def test_judgment_missing_block_is_a_parse_failure():
+    with pytest.raises(ValueError, match="experience"):
+        _parse_ats_output(json.dumps({"suggestions": ["x"]}), schema=ATSJudgment)
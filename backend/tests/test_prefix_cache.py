@@ -0,0 +1,61 @@
+import asyncio
+
+from app.llm.context_cache import PrefixCache
+
+
+class SlowRedis:
+    """
+    Empty cache whose writes never finish.
+    """
+
+    def __init__(self):
+        self.writing = asyncio.Event()
+
+    def pipeline(self, transaction=True):
+        return SlowPipeline()
+
+    async def setex(self, key, ttl, value):
+        self.writing.set()
+        await asyncio.Event().wait()
+
+
+class SlowPipeline:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        pass
+
+    def ttl(self, key):
+        pass
+
+    async def execute(self):
+        return [None, -2]
+
+
+def test_followers_get_the_handle_when_the_leader_is_cancelled_while_storing():
+    async def run():
+        redis = SlowRedis()
+        cache = PrefixCache(enabled=True, min_tokens=0, async_client=redis)
+        created = asyncio.Event()
+
+        async def create(prefix, ttl):
+            await created.wait()
+            return "cachedContents/abc"
+
+        leader = asyncio.create_task(cache.handle("model", "shared prefix", create))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.handle("model", "shared prefix", create))
+        await asyncio.sleep(0)
+
+        created.set()
+        await redis.writing.wait()
+        leader.cancel()
+
+        assert await asyncio.wait_for(follower, timeout=1) == "cachedContents/abc"
+        assert cache._creating == {}
+
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+import pytest
+
+from app.llm import resilience
+from app.llm.resilience import CircuitBreaker, DeadlineExceededError, call_with_resilience
+from app.utils.deadline import deadline_scope
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("test_llm", window=2, min_calls=2, open_seconds=0.05)
+    monkeypatch.setattr(resilience, "llm_breaker", breaker)
+    return breaker
+
+
+def test_expired_deadline_does_not_take_the_half_open_probe(breaker):
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == resilience.OPEN
+
+    time.sleep(0.06)
+    assert breaker.state == resilience.HALF_OPEN
+
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        return "ok"
+
+    async def expired():
+        with deadline_scope(0):
+            return await call_with_resilience(call)
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(expired())
+    assert calls == 0
+
+    # the next call is still let through as the probe, and closes the breaker
+    assert asyncio.run(call_with_resilience(call)) == "ok"
+    assert breaker.state == resilience.CLOSED
@@ -0,0 +1,90 @@
+import asyncio
+
+from app.cache.single_flight import SingleFlight
+
+
+class FakeRedis:
+    """
+    Lock calls only: every set(nx=True) wins, nothing is held remotely.
+    """
+
+    async def set(self, *args, **kwargs):
+        return True
+
+    async def eval(self, *args):
+        return 1
+
+    async def exists(self, *args):
+        return 0
+
+
+async def _nothing():
+    return None
+
+
+def test_follower_takes_over_when_leader_is_cancelled():
+    flight = SingleFlight("test", client=FakeRedis())
+    calls = []
+
+    async def fn():
+        calls.append(asyncio.current_task())
+        await asyncio.sleep(0.05)
+        return {"score": 1}
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", fn, _nothing))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do("key", fn, _nothing))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        result = await follower
+
+        assert leader.cancelled()
+        assert result == {"score": 1}
+        assert calls == [leader, follower]
+
+    asyncio.run(main())
+
+
+def test_cancelled_follower_does_not_cancel_leader():
+    flight = SingleFlight("test", client=FakeRedis())
+
+    async def fn():
+        await asyncio.sleep(0.05)
+        return {"score": 2}
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", fn, _nothing))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do("key", fn, _nothing))
+        await asyncio.sleep(0.01)
+
+        follower.cancel()
+
+        assert await leader == {"score": 2}
+        assert follower.cancelled()
+
+    asyncio.run(main())
+
+
+class DownRedis(FakeRedis):
+    async def set(self, *args, **kwargs):
+        raise ConnectionResetError("connection reset by peer")
+
+
+def test_socket_errors_degrade_to_in_process_coalescing():
+    flight = SingleFlight("test", client=DownRedis())
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"score": 3}
+
+    async def main():
+        return await asyncio.gather(*[flight.do("key", fn, _nothing) for _ in range(5)])
+
+    assert asyncio.run(main()) == [{"score": 3}] * 5
+    assert calls == 1
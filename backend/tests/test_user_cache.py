@@ -0,0 +1,60 @@
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.auth import user_cache
+from app.db.model import User
+
+
+class FakePipeline:
+    def __init__(self, commands):
+        self.commands = commands
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def delete(self, *keys):
+        self.commands.append(("delete", keys))
+
+    def publish(self, channel, message):
+        self.commands.append(("publish", channel))
+
+    def execute(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.commands = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.commands)
+
+
+def test_deleting_a_user_through_a_sync_session_clears_the_cache(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(user_cache, "redis_client", redis)
+
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+
+    user_id = uuid.uuid4()
+    with Session(engine) as session:
+        session.add(User(id=user_id, email="jane@example.com"))
+        session.commit()
+
+    user_cache._users.set(str(user_id), True)
+
+    # no event loop here; the commit must not fail after the row is gone
+    with Session(engine) as session:
+        session.delete(session.get(User, user_id))
+        session.commit()
+
+    assert user_cache._users.get(str(user_id)) is None
+    assert ("delete", (f"user:exists:{user_id}",)) in redis.commands
+    with Session(engine) as session:
+        assert session.get(User, user_id) is None